@@ -9,4 +9,4 @@ from app.modules.plans.models import Plan
 from app.modules.storage.models import Image
 from app.modules.users.models import User
 from app.modules.transport_route.models import TransportRoute
-from app.modules.transport_service.models import TransportService, TransportServiceRouteSegment
+from app.modules.transport_service.models import TransportService, TransportServiceCityCoverage, TransportServiceRouteSegment
@@ -1,12 +1,34 @@
 from celery import Celery
+from celery.signals import worker_process_init, worker_process_shutdown
+from app.core.all_models import *
+from app.core.worker_loop import worker_loop
 from app.modules.email.service import MailService
 from asgiref.sync import async_to_sync
 
 c_app = Celery()
 c_app.config_from_object("app.core.config")
 
+@worker_process_init.connect
+def start_worker_loop(**kwargs):
+    worker_loop.start()
+
+@worker_process_shutdown.connect
+def stop_worker_loop(**kwargs):
+    worker_loop.stop()
+
 @c_app.task()
 def send_email(recipients: list[str], subject: str, body: str):
     message = MailService.create_message(recipients=recipients, subject=subject, body=body)
     async_to_sync(MailService().mail.send_message)(message)
-    print("Email sent")
\ No newline at end of file
+    print("Email sent")
+
+@c_app.task()
+def generate_ai_plan(job_id: str):
+    from app.modules.ai.jobs import run_ai_job  # To avoid circular import
+    worker_loop.run(run_ai_job(job_id))
+    print(f"AI plan job {job_id} finished")
+
+@c_app.task()
+def reembed_content(place_ids: list[int] = None, city_ids: list[int] = None):
+    from app.utils.embedding_sync import run_reembed  # To avoid circular import
+    worker_loop.run(run_reembed(place_ids, city_ids))
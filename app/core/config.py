@@ -46,6 +46,16 @@ class Settings(BaseSettings):
     GEMINI_MODEL: str = "gemini-2.0-flash"
     GEMINI_API_KEY: str
     GROQ_API_KEY: str
+    LLM_MAX_CONCURRENCY: int = 8
+    LLM_HTTP_MAX_CONNECTIONS: int = 20
+    LLM_HTTP_KEEPALIVE_SECONDS: float = 60
+    AI_CITY_PLAN_CONCURRENCY: int = 3
+
+    EMBEDDING_MODEL: str = "all-MiniLM-L6-v2"
+    EMBEDDING_BATCH_SIZE: int = 32
+    EMBEDDING_BATCH_WAIT_MS: float = 5
+    EMBEDDING_CACHE_SIZE: int = 2048
+    EMBEDDING_REDIS_TTL: int = 30 * 24 * 3600
 
     DEV_TOKEN: str = ''
     class Config:
@@ -1,3 +1,4 @@
+import asyncio
 from typing import Any, Dict, Optional, Tuple, Type, List, TypeVar, Generic, ClassVar, Set
 from neo4j import AsyncSession
 from pydantic import BaseModel
@@ -6,6 +7,9 @@ from app.core.graph_schemas import BaseEdge, BaseNode
 
 NodeType = TypeVar("NodeType", bound=BaseNode)
 
+# Background re-projections in flight, keyed by projection name
+_projection_tasks: Dict[str, asyncio.Task] = {}
+
 class BaseGraphRepository(Generic[NodeType]):
     def __init__(self, session: AsyncSession, model: Type[NodeType]):
         self.session = session
@@ -87,11 +91,7 @@ class BaseGraphRepository(Generic[NodeType]):
 
     async def _delete_simple(self, obj_id: int) -> bool:
         """Delete a node and all its relationships"""
-        query = f"""
-        MATCH (n:{self.label} {{id: $obj_id}})
-        DETACH DELETE n
-        """
-        await self.session.run(query, obj_id=obj_id)
+        await self._delete_node_by_id_and_label(obj_id, self.label)
         return True
 
 
@@ -157,12 +157,18 @@ class BaseGraphRepository(Generic[NodeType]):
         return label_to_model(label)
 
     async def _delete_node_by_id_and_label(self, node_id: int, label: str) -> None:
-        """Delete a node by ID and label"""
+        """Delete a node by ID and label, projections of the edge types it had are marked stale"""
         query = f"""
         MATCH (n:{label} {{id: $node_id}})
+        OPTIONAL MATCH (n)-[r]-()
+        WITH n, collect(DISTINCT type(r)) AS edge_labels
         DETACH DELETE n
+        RETURN edge_labels
         """
-        await self.session.run(query, node_id=node_id)
+        result = await self.session.run(query, node_id=node_id)
+        record = await result.single()
+        for edge_label in (record["edge_labels"] if record else []):
+            await self._bump_projection_version(edge_label)
 
     async def get_children(self, node_id: int, child_type: Optional[str] = None) -> List[Tuple[int, str]]:
         """Get direct children of a node
@@ -243,6 +249,7 @@ class BaseGraphRepository(Generic[NodeType]):
             edge_id=edge_id,
             **edge_props
         )
+        await self._bump_projection_version(edge_label)
 
     async def delete_edge(self, edge_type: Type[BaseEdge], edge_id: str) -> bool:
         """Delete an edge by its ID"""
@@ -256,7 +263,10 @@ class BaseGraphRepository(Generic[NodeType]):
         
         result = await self.session.run(query, edge_id=edge_id)
         record = await result.single()
-        return record["deleted_count"] > 0 if record else False
+        deleted = record["deleted_count"] > 0 if record else False
+        if deleted:
+            await self._bump_projection_version(edge_label)
+        return deleted
 
     async def update_edge(self, edge_instance: BaseEdge) -> bool:
         """Update an edge's properties and potentially its connections"""
@@ -302,7 +312,10 @@ class BaseGraphRepository(Generic[NodeType]):
                 """
                 
                 result = await self.session.run(query, edge_id=edge_instance.id, **update_props)
-                return (await result.single()) is not None
+                updated = (await result.single()) is not None
+                if updated:
+                    await self._bump_projection_version(edge_label)
+                return updated
         
         return True
 
@@ -361,22 +374,22 @@ class BaseGraphRepository(Generic[NodeType]):
         rel_pattern = f"[r:{edge_label}]" if edge_type else "[r]"
 
         if direction == "outgoing":
-            query = f"""
-            MATCH (n:{self.label} {{id: $node_id}})-{rel_pattern}->()
-            DELETE r
-            """
+            match = f"MATCH (n:{self.label} {{id: $node_id}})-{rel_pattern}->()"
         elif direction == "incoming":
-            query = f"""
-            MATCH ()-{rel_pattern}->(n:{self.label} {{id: $node_id}})
-            DELETE r
-            """
+            match = f"MATCH ()-{rel_pattern}->(n:{self.label} {{id: $node_id}})"
         else:  # both
-            query = f"""
-            MATCH (n:{self.label} {{id: $node_id}})-{rel_pattern}-()
-            DELETE r
-            """
+            match = f"MATCH (n:{self.label} {{id: $node_id}})-{rel_pattern}-()"
 
-        await self.session.run(query, node_id=node_id)
+        query = f"""
+        {match}
+        WITH r, type(r) AS edge_label
+        DELETE r
+        RETURN collect(DISTINCT edge_label) AS edge_labels
+        """
+        result = await self.session.run(query, node_id=node_id)
+        record = await result.single()
+        for cleared_label in (record["edge_labels"] if record else []):
+            await self._bump_projection_version(cleared_label)
    
     async def shortest_path(
         self, 
@@ -393,14 +406,14 @@ class BaseGraphRepository(Generic[NodeType]):
         edge_label = edge_type.label
         orientation = "NATURAL" if directed else "UNDIRECTED"
 
-        # Ensure default in-memory graph exists (once per session)
-        await self.ensure_graph_exists(edge_label, weight_property, orientation)
+        # Use the newest projection for this edge type, weight and orientation
+        graph_name = await self.ensure_graph_exists(edge_label, weight_property, orientation)
 
         # Step 1: Run GDS Dijkstra to get node path
         query = f"""
         MATCH (start:{self.label} {{id: $start_node_id}}), (end:{self.label} {{id: $end_node_id}})
         CALL gds.shortestPath.dijkstra.stream(
-            'defaultGraph',
+            $graph_name,
             {{
                 sourceNode: id(start),
                 targetNode: id(end),
@@ -413,6 +426,7 @@ class BaseGraphRepository(Generic[NodeType]):
 
         result = await self.session.run(
             query,
+            graph_name=graph_name,
             start_node_id=start_node_id,
             end_node_id=end_node_id,
         )
@@ -433,26 +447,109 @@ class BaseGraphRepository(Generic[NodeType]):
         result_edges = await self.session.run(query_edges, nodes=node_path)
         return [(record["edgeId"], record["nodeId"]) async for record in result_edges]
 
-    async def ensure_graph_exists(self, edge_label: str, weight_property: str, orientation: str):
-        check_query = "CALL gds.graph.exists('defaultGraph') YIELD exists RETURN exists"
-        result = await self.session.run(check_query)
+    async def ensure_graph_exists(self, edge_label: str, weight_property: str, orientation: str) -> str:
+        """
+        Get the name of the GDS projection to query for the given edge type, weight and orientation.
+        Projections are versioned, edge mutations bump the version. If only an older projection exists
+        it is returned right away and the current version is projected in the background, so queries
+        never wait on a rebuild. Only the very first projection is built inline.
+        """
+        prefix = self._projection_prefix(edge_label, weight_property, orientation)
+        version = await self._get_projection_version(edge_label)
+        graph_name = f"{prefix}{version}"
+
+        existing = await self._list_projections(self.session, prefix)
+        if graph_name in existing:
+            return graph_name
+
+        if not existing:
+            await self._project_graph(self.session, graph_name, edge_label, weight_property, orientation)
+            return graph_name
+
+        if graph_name not in _projection_tasks:
+            task = asyncio.create_task(self._reproject_in_background(graph_name, prefix, version, edge_label, weight_property, orientation))
+            _projection_tasks[graph_name] = task
+            task.add_done_callback(lambda _: _projection_tasks.pop(graph_name, None))
+
+        return max(existing, key=lambda name: int(name[len(prefix):]))
+
+    def _projection_prefix(self, edge_label: str, weight_property: str, orientation: str) -> str:
+        return f"{self.label}_{edge_label}_{weight_property}_{orientation}_v"
+
+    async def _get_projection_version(self, edge_label: str) -> int:
+        query = "MATCH (v:GraphVersion {edge_label: $edge_label}) RETURN v.version AS version"
+        result = await self.session.run(query, edge_label=edge_label)
         record = await result.single()
-        if not record["exists"]:
-            # Project all nodes and edges of the given type with the weight
-            project_query = f"""
-            CALL gds.graph.project(
-                'defaultGraph',
-                '{self.label}',
-                {{
-                    {edge_label}: {{
-                        type: '{edge_label}',
-                        properties: ['{weight_property}'],
-                        orientation: '{orientation}'
-                    }}
-                }}
-            )
+        return record["version"] if record else 0
+
+    async def _bump_projection_version(self, edge_label: Optional[str] = None) -> None:
+        """Mark projections of an edge type (or of every edge type if not given) as stale"""
+        if edge_label:
+            query = """
+            MERGE (v:GraphVersion {edge_label: $edge_label})
+            SET v.version = coalesce(v.version, 0) + 1
+            """
+            await self.session.run(query, edge_label=edge_label)
+        else:
+            # Edge types still at the implicit version 0 have no GraphVersion node yet, create one for
+            # every edge type projected for this label
+            query = """
+            CALL gds.graph.list() YIELD graphName, schema
+            WHERE graphName STARTS WITH $prefix
+            UNWIND keys(schema.relationships) AS edge_label
+            WITH DISTINCT edge_label
+            MERGE (v:GraphVersion {edge_label: edge_label})
+            SET v.version = coalesce(v.version, 0) + 1
             """
-            await self.session.run(project_query)
+            await self.session.run(query, prefix=f"{self.label}_")
+
+    @staticmethod
+    async def _list_projections(session: AsyncSession, prefix: str) -> List[str]:
+        query = """
+        CALL gds.graph.list() YIELD graphName
+        WHERE graphName STARTS WITH $prefix
+        RETURN graphName
+        """
+        result = await session.run(query, prefix=prefix)
+        return [record["graphName"] async for record in result]
+
+    async def _project_graph(self, session: AsyncSession, graph_name: str, edge_label: str, weight_property: str, orientation: str) -> None:
+        # Another worker may have projected the same version already
+        result = await session.run("CALL gds.graph.exists($graph_name) YIELD exists RETURN exists", graph_name=graph_name)
+        record = await result.single()
+        if record["exists"]:
+            return
+
+        project_query = f"""
+        CALL gds.graph.project(
+            $graph_name,
+            '{self.label}',
+            {{
+                {edge_label}: {{
+                    type: '{edge_label}',
+                    properties: {{
+                        {weight_property}: {{property: '{weight_property}', defaultValue: 0.0}}
+                    }},
+                    orientation: '{orientation}'
+                }}
+            }}
+        )
+        """
+        await session.run(project_query, graph_name=graph_name)
+
+    async def _reproject_in_background(self, graph_name: str, prefix: str, version: int, edge_label: str, weight_property: str, orientation: str) -> None:
+        # The request session may be closed before this finishes, use a dedicated one
+        from app.database.graph_database import graph_db
+
+        try:
+            async with graph_db.get_session() as session:
+                await self._project_graph(session, graph_name, edge_label, weight_property, orientation)
+                # Keep the previous version around for queries that already picked it
+                for name in await self._list_projections(session, prefix):
+                    if int(name[len(prefix):]) < version - 1:
+                        await session.run("CALL gds.graph.drop($graph_name, false)", graph_name=name)
+        except Exception as e:
+            print(f"Failed to re-project graph {graph_name}: {e}")
 
 
     async def _ensure_edge_constraint(self, edge_type: Type[BaseEdge]):
@@ -0,0 +1,211 @@
+import json
+import re
+from dataclasses import dataclass
+from typing import Any, Iterable, List, Optional, Tuple, Union
+
+PathKey = Union[str, int]
+Path = Tuple[PathKey, ...]
+
+WILDCARD = "*"
+
+_STRING_SPECIAL = re.compile(r'["\\]')
+_SCALAR_END = re.compile(r'[\s,\]}]')
+_VALUE_START = re.compile(r'[{\[]')
+_TRAILING_COMMA = re.compile(r',\s*([}\]])')
+
+
+@dataclass
+class _Frame:
+    kind: str  # "object" or "array"
+    start: int  # absolute offset of the opening bracket
+    path: Path
+    wanted: bool
+    state: str  # object: key / colon / value / comma, array: value / comma
+    key: Optional[PathKey] = None
+    index: int = 0
+
+    @property
+    def child_key(self) -> Optional[PathKey]:
+        return self.index if self.kind == "array" else self.key
+
+
+class IncrementalJSONParser:
+    """
+    Resumable JSON tokenizer for streamed LLM output.
+
+    Chunks are fed as they arrive, the scanner keeps its state between chunks so every character is
+    looked at once. Each value whose path matches one of `paths` is decoded once, when it completes,
+    and returned as a `(path, value)` fragment. Paths are tuples of object keys and array indexes,
+    "*" matches any key or index, e.g. `("itinerary", "*")` or `("*", "steps", "*")`.
+    By default every direct child of the root value is emitted.
+
+    Text before the first `{` or `[` (markdown fences, prose) and after the root value is ignored,
+    only the text of values still being completed is kept in memory.
+    """
+
+    def __init__(self, paths: Optional[Iterable[Path]] = None):
+        self.paths = [tuple(p) for p in paths] if paths is not None else None
+        self.buffer = ""
+        self.base = 0  # absolute offset of buffer[0]
+        self.pos = 0  # absolute offset of the next character to scan
+        self.stack: List[_Frame] = []
+        self.started = False
+        self.done = False
+        self._string_start: Optional[int] = None
+        self._string_is_key = False
+        self._scalar_start: Optional[int] = None
+
+    def wants(self, path: Path) -> bool:
+        if self.paths is None:
+            return len(path) == 1
+        for pattern in self.paths:
+            if len(pattern) == len(path) and all(p == WILDCARD or p == k for p, k in zip(pattern, path)):
+                return True
+        return False
+
+    def feed(self, chunk: str) -> List[Tuple[Path, Any]]:
+        """Scan a new chunk and return the fragments it completed, in document order"""
+        if self.done or not chunk:
+            return []
+        self.buffer += chunk
+        fragments: List[Tuple[Path, Any]] = []
+        self._scan(fragments)
+        self._trim()
+        return fragments
+
+    def _scan(self, fragments: List[Tuple[Path, Any]]):
+        buffer = self.buffer
+        base = self.base
+        end = base + len(buffer)
+        i = self.pos
+
+        while i < end and not self.done:
+            if self._string_start is not None:
+                match = _STRING_SPECIAL.search(buffer, i - base)
+                if not match:
+                    i = end
+                    break
+                j = match.start() + base
+                if match.group() == "\\":
+                    if j + 1 >= end:
+                        i = j
+                        break
+                    i = j + 2
+                    continue
+                self._end_string(j + 1, fragments)
+                i = j + 1
+                continue
+
+            if self._scalar_start is not None:
+                match = _SCALAR_END.search(buffer, i - base)
+                if not match:
+                    i = end
+                    break
+                j = match.start() + base
+                start, self._scalar_start = self._scalar_start, None
+                self._complete(start, j, fragments)
+                i = j
+                continue
+
+            if not self.started:
+                match = _VALUE_START.search(buffer, i - base)
+                if not match:
+                    i = end
+                    break
+                i = match.start() + base
+                self.started = True
+                continue
+
+            ch = buffer[i - base]
+            if ch in " \t\r\n":
+                i += 1
+                continue
+
+            top = self.stack[-1] if self.stack else None
+            if ch in "{[":
+                path = self._child_path()
+                self.stack.append(_Frame(
+                    kind="object" if ch == "{" else "array",
+                    start=i,
+                    path=path,
+                    wanted=self.wants(path),
+                    state="key" if ch == "{" else "value",
+                ))
+            elif ch in "}]":
+                if top is None:
+                    self.done = True
+                    break
+                self.stack.pop()
+                self._complete(top.start, i + 1, fragments, path=top.path, wanted=top.wanted)
+            elif ch == '"':
+                self._string_start = i
+                self._string_is_key = top is not None and top.kind == "object" and top.state == "key"
+            elif ch == ":":
+                if top is not None and top.kind == "object":
+                    top.state = "value"
+            elif ch == ",":
+                if top is not None:
+                    if top.kind == "object":
+                        top.state, top.key = "key", None
+                    else:
+                        top.state = "value"
+                        top.index += 1
+            elif top is not None and top.state == "value":
+                self._scalar_start = i
+            i += 1
+
+        self.pos = i
+
+    def _child_path(self) -> Path:
+        if not self.stack:
+            return ()
+        top = self.stack[-1]
+        return top.path + (top.child_key,)
+
+    def _end_string(self, end: int, fragments: List[Tuple[Path, Any]]):
+        start, self._string_start = self._string_start, None
+        if self._string_is_key:
+            top = self.stack[-1]
+            top.key = self._loads(self._text(start, end))
+            top.state = "colon"
+            return
+        self._complete(start, end, fragments)
+
+    def _complete(self, start: int, end: int, fragments: List[Tuple[Path, Any]], path: Optional[Path] = None, wanted: Optional[bool] = None):
+        if path is None:
+            path = self._child_path()
+            wanted = self.wants(path)
+        if wanted:
+            try:
+                fragments.append((path, self._loads(self._text(start, end))))
+            except ValueError:
+                pass
+        if self.stack:
+            self.stack[-1].state = "comma"
+        else:
+            self.done = True
+
+    def _text(self, start: int, end: int) -> str:
+        return self.buffer[start - self.base:end - self.base]
+
+    @staticmethod
+    def _loads(text: str) -> Any:
+        try:
+            return json.loads(text)
+        except ValueError:
+            # LLMs like trailing commas
+            return json.loads(_TRAILING_COMMA.sub(r"\1", text))
+
+    def _trim(self):
+        """Drop text that no pending value can need anymore"""
+        keep = self.pos
+        for frame in self.stack:
+            if frame.wanted:
+                keep = min(keep, frame.start)
+                break
+        for start in (self._string_start, self._scalar_start):
+            if start is not None:
+                keep = min(keep, start)
+        if keep > self.base:
+            self.buffer = self.buffer[keep - self.base:]
+            self.base = keep
@@ -1,12 +1,18 @@
 import os
 import re
 import json
-from typing import AsyncGenerator, List, Type, Union, Optional, Literal, TypedDict
+import time
+import asyncio
+import threading
+import weakref
+from contextlib import asynccontextmanager, suppress
+from dataclasses import dataclass, field
+from typing import Any, AsyncGenerator, AsyncIterator, Callable, Dict, List, Tuple, Type, Union, Optional, Literal, TypedDict
 from pydantic import BaseModel
 from dotenv import load_dotenv
 
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_groq import ChatGroq
+from app.core.config import settings
+from app.core.json_stream import IncrementalJSONParser, Path
 
 load_dotenv()
 
@@ -14,38 +20,214 @@ load_dotenv()
 LLMType = Literal["gemini", "groq"]
 DEFAULT_LLM = "groq"
 
-class LLM:
-    MODEL_MAP: dict[LLMType, dict] = {
-        "gemini": {
-            "class": ChatGoogleGenerativeAI,
-            "model": "gemini-2.5-flash",
-            "key_env": "GEMINI_API_KEY"
-        },
-        "groq": {
-            "class": ChatGroq,
-            "model": "llama-3.3-70b-versatile",
-            "key_env": "GROQ_API_KEY"
+
+def _gemini_factory(model: str, api_key: Optional[str]):
+    from langchain_google_genai import ChatGoogleGenerativeAI
+    # The google client keeps its own transport, reusing the instance reuses its connections
+    return ChatGoogleGenerativeAI(model=model, api_key=api_key)
+
+
+def _groq_factory(model: str, api_key: Optional[str]):
+    import httpx
+    from langchain_groq import ChatGroq
+    http_async_client = httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=settings.LLM_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.LLM_HTTP_MAX_CONNECTIONS,
+            keepalive_expiry=settings.LLM_HTTP_KEEPALIVE_SECONDS,
+        )
+    )
+    return ChatGroq(model=model, api_key=api_key, http_async_client=http_async_client)
+
+
+@dataclass
+class ProviderConfig:
+    factory: Callable[[str, Optional[str]], Any]
+    model: str
+    key_env: Optional[str] = None
+    max_concurrency: Optional[int] = None
+
+
+@dataclass
+class ProviderMetrics:
+    requests: int = 0
+    errors: int = 0
+    in_flight: int = 0
+    queued: int = 0
+    max_queued: int = 0
+    total_queue_wait: float = 0.0
+    total_latency: float = 0.0
+    max_latency: float = 0.0
+    total_first_token_latency: float = 0.0
+    streams: int = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        finished = max(self.requests - self.in_flight, 1)
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "max_queued": self.max_queued,
+            "avg_queue_wait_ms": self.total_queue_wait / max(self.requests, 1) * 1000,
+            "avg_latency_ms": self.total_latency / finished * 1000,
+            "max_latency_ms": self.max_latency * 1000,
+            "avg_first_token_ms": self.total_first_token_latency / max(self.streams, 1) * 1000,
         }
+
+
+@dataclass
+class _LoopClients:
+    """Clients and limiters of one event loop, HTTP connections can't be shared across loops"""
+    models: Dict[Tuple[str, str], Any] = field(default_factory=dict)
+    semaphores: Dict[str, asyncio.Semaphore] = field(default_factory=dict)
+
+
+class LLM:
+    MODEL_MAP: dict[str, ProviderConfig] = {
+        "gemini": ProviderConfig(factory=_gemini_factory, model="gemini-2.5-flash", key_env="GEMINI_API_KEY"),
+        "groq": ProviderConfig(factory=_groq_factory, model="llama-3.3-70b-versatile", key_env="GROQ_API_KEY"),
     }
 
+    _clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopClients]" = weakref.WeakKeyDictionary()
+    _clients_lock = threading.Lock()
+    _metrics: Dict[str, ProviderMetrics] = {}
+
+    @staticmethod
+    def register_provider(
+        name: str,
+        factory: Callable[[str, Optional[str]], Any],
+        model: str,
+        key_env: Optional[str] = None,
+        max_concurrency: Optional[int] = None
+    ):
+        """
+        Register or replace a provider. `factory(model, api_key)` must return a langchain style chat model
+        (`ainvoke` and `astream`), it is called once per model and event loop and then reused.
+        """
+        LLM.MODEL_MAP[name] = ProviderConfig(factory=factory, model=model, key_env=key_env, max_concurrency=max_concurrency)
+        LLM.reset_clients(name)
+
     @staticmethod
-    def _get_model_instance(llm: LLMType):
+    def reset_clients(llm: Optional[str] = None):
+        """Drop pooled clients (of one provider, or all) so the next call builds new ones"""
+        with LLM._clients_lock:
+            for loop_clients in LLM._clients.values():
+                for key in [k for k in loop_clients.models if llm is None or k[0] == llm]:
+                    del loop_clients.models[key]
+                for key in [k for k in loop_clients.semaphores if llm is None or k == llm]:
+                    del loop_clients.semaphores[key]
+
+    @staticmethod
+    async def close_clients():
+        """Close the clients pooled for the running event loop, call it before the loop is discarded"""
+        with LLM._clients_lock:
+            loop_clients = LLM._clients.pop(asyncio.get_running_loop(), None)
+        if not loop_clients:
+            return
+        for model in loop_clients.models.values():
+            http_client = getattr(model, "http_async_client", None)
+            if http_client is not None and hasattr(http_client, "aclose"):
+                with suppress(Exception):
+                    await http_client.aclose()
+
+    @staticmethod
+    def get_metrics(llm: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        names = [llm] if llm else list(LLM._metrics)
+        return {name: LLM._metrics[name].snapshot() for name in names if name in LLM._metrics}
+
+    @staticmethod
+    def reset_metrics():
+        LLM._metrics.clear()
+
+    @staticmethod
+    def _loop_clients() -> _LoopClients:
+        loop = asyncio.get_running_loop()
+        with LLM._clients_lock:
+            loop_clients = LLM._clients.get(loop)
+            if loop_clients is None:
+                loop_clients = LLM._clients[loop] = _LoopClients()
+            return loop_clients
+
+    @staticmethod
+    def _get_model_instance(llm: str):
         config = LLM.MODEL_MAP[llm]
-        api_key = os.getenv(config["key_env"])
-        return config["class"](model=config["model"], api_key=api_key)
+        loop_clients = LLM._loop_clients()
+        key = (llm, config.model)
+        model = loop_clients.models.get(key)
+        if model is None:
+            api_key = os.getenv(config.key_env) if config.key_env else None
+            model = loop_clients.models[key] = config.factory(config.model, api_key)
+        return model
+
+    @staticmethod
+    def _get_semaphore(llm: str) -> asyncio.Semaphore:
+        loop_clients = LLM._loop_clients()
+        semaphore = loop_clients.semaphores.get(llm)
+        if semaphore is None:
+            limit = LLM.MODEL_MAP[llm].max_concurrency or settings.LLM_MAX_CONCURRENCY
+            semaphore = loop_clients.semaphores[llm] = asyncio.Semaphore(limit)
+        return semaphore
+
+    @staticmethod
+    @asynccontextmanager
+    async def _acquire(llm: str) -> AsyncIterator[Any]:
+        """Pooled model for `llm`, waits while the provider is at its in-flight cap and records metrics"""
+        metrics = LLM._metrics.setdefault(llm, ProviderMetrics())
+        semaphore = LLM._get_semaphore(llm)
+
+        metrics.queued += 1
+        metrics.max_queued = max(metrics.max_queued, metrics.queued)
+        queued_at = time.perf_counter()
+        try:
+            await semaphore.acquire()
+        finally:
+            metrics.queued -= 1
+        started_at = time.perf_counter()
+        metrics.total_queue_wait += started_at - queued_at
+        metrics.requests += 1
+        metrics.in_flight += 1
+        try:
+            yield LLM._get_model_instance(llm)
+        except Exception:
+            metrics.errors += 1
+            raise
+        finally:
+            latency = time.perf_counter() - started_at
+            metrics.in_flight -= 1
+            metrics.total_latency += latency
+            metrics.max_latency = max(metrics.max_latency, latency)
+            semaphore.release()
+
+    @staticmethod
+    def _record_first_token(llm: str, started_at: float):
+        metrics = LLM._metrics.setdefault(llm, ProviderMetrics())
+        metrics.streams += 1
+        metrics.total_first_token_latency += time.perf_counter() - started_at
 
     @staticmethod
     async def get_response(prompt: str, llm: LLMType = DEFAULT_LLM) -> str:
-        model = LLM._get_model_instance(llm)
-        resp = await model.ainvoke(prompt)
+        async with LLM._acquire(llm) as model:
+            resp = await model.ainvoke(prompt)
         return resp.content
     
         
     @staticmethod
     async def get_stream(prompt: str, llm=DEFAULT_LLM):
-        model = LLM._get_model_instance(llm)
-        async for chunk in model.astream([prompt]):
-            if chunk.content:
+        async for content in LLM._stream_content(prompt, llm):
+            yield content
+
+    @staticmethod
+    async def _stream_content(prompt: str, llm: str) -> AsyncIterator[str]:
+        async with LLM._acquire(llm) as model:
+            started_at = time.perf_counter()
+            first = True
+            async for chunk in model.astream([prompt]):
+                if not chunk.content:
+                    continue
+                if first:
+                    LLM._record_first_token(llm, started_at)
+                    first = False
                 yield chunk.content
     
 
@@ -73,90 +255,46 @@ class LLM:
     ) -> AsyncGenerator[dict, None]:
         """
         Stream structured JSON progressively.
-        Instead of token-by-token, yield partial valid dicts/lists.
+        For an array response the list of completed items is yielded every time an item completes,
+        each item is parsed and validated once. An object response is yielded once it is complete.
         """
-
-        model = LLM._get_model_instance(llm)
-        buffer = ""
-        last_yielded = None
-
-        async for chunk in model.astream([prompt]):
-            if not chunk.content:
+        items = []
+        async for path, value in LLM.get_structured_fragments(prompt, paths=[(), ("*",)], llm=llm):
+            if path == ():
+                if isinstance(value, dict):
+                    yield schema.model_validate(value) if schema else value
                 continue
-            buffer += chunk.content
-
-            # Try to close brackets/quotes and parse progressively
-            partial_json = LLM._try_make_valid_json(buffer)
-
-            if partial_json is not None and partial_json != last_yielded:
-                # Validate with schema if given
-                if schema:
-                    try:
-                        if isinstance(partial_json, list):
-                            parsed = [
-                                schema.model_validate(item) for item in partial_json
-                            ]
-                        else:
-                            parsed = schema.model_validate(partial_json)
-                    except Exception:
-                        continue
-                    yield parsed
-                else:
-                    yield partial_json
-
-                last_yielded = partial_json
-
+            if not isinstance(path[0], int):
+                continue
+            if schema:
+                try:
+                    value = schema.model_validate(value)
+                except Exception:
+                    continue
+            items.append(value)
+            yield list(items)
 
     @staticmethod
-    def _try_make_valid_json(buffer: str):
+    async def get_structured_fragments(
+        prompt: str,
+        paths: Optional[List[Path]] = None,
+        llm: LLMType = DEFAULT_LLM
+    ) -> AsyncIterator[Tuple[Path, Any]]:
         """
-        Coerce incomplete/midstream LLM output into valid JSON.
-        Steps:
-        1. Strip junk fences/explanations
-        2. Auto-close unbalanced braces/brackets
-        3. Trim dangling quotes/colons
-        4. Extract largest JSON-like block
-        5. Parse
+        Stream `(path, value)` for every JSON value matching `paths` as soon as it is complete,
+        see IncrementalJSONParser. The response is scanned once, whatever its length.
         """
-        if not buffer:
-            return None
-
-        # 1. Strip markdown fences
-        buffer = re.sub(r"^```(?:json)?", "", buffer, flags=re.IGNORECASE|re.MULTILINE)
-        buffer = re.sub(r"```$", "", buffer, flags=re.MULTILINE)
-        buffer = buffer.strip()
-
-        if not buffer:
-            return None
-
-        # 2. Auto-close braces/brackets
-        stack = []
-        open_to_close = {"{": "}", "[": "]"}
-        for ch in buffer:
-            if ch in open_to_close:
-                stack.append(open_to_close[ch])
-            elif stack and ch == stack[-1]:
-                stack.pop()
-        if stack:
-            buffer += "".join(reversed(stack))
-
-        # 3. Patch dangling colon (`{"a":`)
-        buffer = re.sub(r':\s*$', ': null', buffer)
-
-        # 3b. Trim unfinished string (dangling quote at end)
-        buffer = re.sub(r'"\s*$', '""', buffer)
-
-        # 4. Extract largest JSON-like block
-        blocks = LLM._extract_json_like_blocks(buffer)
-        if not blocks:
-            return None
-        candidate = blocks[-1]
-
-        # 5. Parse
+        parser = IncrementalJSONParser(paths)
+        stream = LLM._stream_content(prompt, llm)
         try:
-            return json.loads(candidate)
-        except Exception:
-            return None
+            async for content in stream:
+                for fragment in parser.feed(content):
+                    yield fragment
+                if parser.done:
+                    break
+        finally:
+            # Give the provider slot back right away when the caller stops early
+            await stream.aclose()
 
 
     @staticmethod
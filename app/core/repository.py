@@ -1,27 +1,45 @@
-from typing import Generic, List, Type, TypeVar, Optional , Dict, Any
+from typing import Generic, List, Tuple, Type, TypeVar, Optional , Dict, Any
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.orm import DeclarativeMeta , selectinload , joinedload
 from fastapi_pagination import Params, Page
-from rapidfuzz import process, fuzz
+from rapidfuzz import fuzz
 from sqlalchemy.sql.expression import or_
-from sqlalchemy import asc, desc
+from sqlalchemy import asc, desc, func
 from fastapi_pagination.ext.sqlalchemy import paginate
+from app.database.unit_of_work import commit
+from app.utils.embeddings import embedding_service
 
 # Type variables for generic typing
 ModelType = TypeVar("ModelType", bound=DeclarativeMeta)
 SchemaType = TypeVar("SchemaType")
 
+# get_similar pulls this many nearest rows per requested result from the trigram index before scoring
+SIMILAR_CANDIDATE_FACTOR = 10
+SIMILAR_MIN_CANDIDATES = 50
+
+# vector_search scans a filtered set exactly when it has at most this many rows, bigger sets go through the HNSW index
+VECTOR_EXACT_MAX_ROWS = 2000
+# Post-filtered index searches fetch this many candidates per requested result before filtering
+VECTOR_CANDIDATE_FACTOR = 4
+# pgvector's default and maximum hnsw.ef_search
+VECTOR_DEFAULT_EF_SEARCH = 40
+VECTOR_MAX_EF_SEARCH = 1000
+
 class BaseRepository(Generic[ModelType, SchemaType]):
     def __init__(self, model: Type[ModelType], db: AsyncSession):
         self.model = model
         self.db = db
 
+    async def _commit(self):
+        """Commit the session, or only flush when running inside a unit of work."""
+        await commit(self.db)
+
     async def create(self, schema: SchemaType) -> ModelType:
         """Create a new record."""
         new_record = self.model(**schema.model_dump())
         self.db.add(new_record)
-        await self.db.commit()
+        await self._commit()
         await self.db.refresh(new_record)
         return new_record
 
@@ -128,7 +146,7 @@ class BaseRepository(Generic[ModelType, SchemaType]):
             return None
         for key, value in schema.model_dump().items():
             setattr(record, key, value)
-        await self.db.commit()
+        await self._commit()
         await self.db.refresh(record)
         return record
     
@@ -141,7 +159,7 @@ class BaseRepository(Generic[ModelType, SchemaType]):
         for key, value in data.items():
             if hasattr(record, key):
                 setattr(record, key, value)
-        await self.db.commit()
+        await self._commit()
         await self.db.refresh(record)
         return record
 
@@ -152,7 +170,7 @@ class BaseRepository(Generic[ModelType, SchemaType]):
         if not record:
             return False
         await self.db.delete(record)
-        await self.db.commit()
+        await self._commit()
         return True
 
     async def index(
@@ -246,33 +264,149 @@ class BaseRepository(Generic[ModelType, SchemaType]):
         extra_conditions: Optional[List[Any]] = None,
         load_relations: list[str] = None
     ) -> List[ModelType]:
-        all_data = await self.get_all(
-            load_relations=load_relations, 
-            extra_conditions=extra_conditions
+        scored = await self.get_similar_scored(
+            query_string,
+            column_name=column_name,
+            limit=limit,
+            min_score=min_score,
+            extra_conditions=extra_conditions,
+            load_relations=load_relations
         )
-        
-        # Only include objects that have the specified column and it's a string
-        choices: Dict[str, ModelType] = {}
-        for obj in all_data:
-            column_value = getattr(obj, column_name, None)
-            if isinstance(column_value, str) and column_value.strip():  # Ensure non-empty string
-                choices[column_value] = obj
-        
-        if not choices:
+        return [record for record, _ in scored]
+
+    async def get_similar_scored(
+        self,
+        query_string: str,
+        column_name: str = "name",
+        limit: int = 5,
+        min_score: int = 0,
+        extra_conditions: Optional[List[Any]] = None,
+        load_relations: list[str] = None
+    ) -> List[Tuple[ModelType, float]]:
+        """
+        Fuzzy match on a text column, best match first, with scores from 0 to 100.
+        Postgres returns the nearest rows by trigram distance (pg_trgm, served by the GiST index),
+        only those are scored with rapidfuzz so `min_score` keeps the fuzz.ratio scale.
+        """
+        column = getattr(self.model, column_name, None)
+        if column is None or not query_string:
             return []
-        
-        # Perform fuzzy matching
-        matches = process.extract(
-            query_string,
-            choices.keys(),  # Pass the strings, not the choices dict
-            scorer=fuzz.ratio,
-            limit=limit
+
+        query = select(self.model).filter(column.isnot(None), func.trim(column) != "")
+        if load_relations:
+            for relation in load_relations:
+                if '.' in relation:
+                    parts = relation.split('.')
+                    current_model = self.model
+                    option = None
+                    for part in parts:
+                        attr = getattr(current_model, part)
+                        current_model = attr.property.mapper.class_
+                        option = joinedload(attr) if option is None else option.joinedload(attr)
+                    query = query.options(option)
+                else:
+                    query = query.options(selectinload(getattr(self.model, relation)))
+        if extra_conditions:
+            for condition in extra_conditions:
+                query = query.filter(condition)
+
+        candidate_limit = max(limit * SIMILAR_CANDIDATE_FACTOR, SIMILAR_MIN_CANDIDATES)
+        query = query.order_by(column.op("<->")(query_string), self.model.id).limit(candidate_limit)
+        result = await self.db.execute(query)
+        candidates = result.unique().scalars().all()
+
+        scored = [
+            (record, fuzz.ratio(query_string, getattr(record, column_name)))
+            for record in candidates
+        ]
+        scored.sort(key=lambda item: item[1], reverse=True)
+        return [(record, score) for record, score in scored if score >= min_score][:limit]
+
+    async def vector_search(
+        self,
+        query: str,
+        limit: int = 10,
+        load_relations: list[str] = None,
+        extra_conditions: Optional[List[Any]] = None,
+        ef_search: Optional[int] = None,
+        exact: bool = False,
+    ) -> List[ModelType]:
+        """Rows whose embedding is closest to the embedding of `query`, see `nearest_by_embedding`"""
+        embedding = await embedding_service.embed(query)
+        return await self.nearest_by_embedding(embedding, limit, load_relations, extra_conditions, ef_search, exact)
+
+    async def nearest_by_embedding(
+        self,
+        embedding: List[float],
+        limit: int = 10,
+        load_relations: list[str] = None,
+        extra_conditions: Optional[List[Any]] = None,
+        ef_search: Optional[int] = None,
+        exact: bool = False,
+    ) -> List[ModelType]:
+        """
+        Nearest rows by cosine distance, closest first.
+
+        Without filters the HNSW index answers directly, `ef_search` trades recall for latency.
+        Filters small enough to match at most VECTOR_EXACT_MAX_ROWS rows (the places of a city) are applied
+        first and the matching rows are scanned exactly. Bigger filtered sets are filtered after the index
+        search, on `limit * VECTOR_CANDIDATE_FACTOR` candidates, falling back to the exact scan when fewer
+        than `limit` candidates pass. `exact` always scans, for ground truth.
+        """
+        column = self.model.embedding
+        conditions = [column.isnot(None), *(extra_conditions or [])]
+        distance = column.cosine_distance(embedding)
+
+        if not exact and extra_conditions:
+            matching = await self.db.scalar(
+                select(func.count()).select_from(
+                    select(self.model.id).filter(*conditions).limit(VECTOR_EXACT_MAX_ROWS + 1).subquery()
+                )
+            )
+            exact = matching <= VECTOR_EXACT_MAX_ROWS
+
+        if exact:
+            # `+ 0` keeps the planner from walking the HNSW index, which would apply the filters after the fact
+            query = select(self.model).filter(*conditions).order_by(distance + 0, self.model.id).limit(limit)
+            return await self._execute_with_relations(query, load_relations)
+
+        candidate_limit = min(limit * VECTOR_CANDIDATE_FACTOR if extra_conditions else limit, VECTOR_MAX_EF_SEARCH)
+        ef_search = min(max(ef_search or VECTOR_DEFAULT_EF_SEARCH, candidate_limit), VECTOR_MAX_EF_SEARCH)
+        # Transaction local, like SET LOCAL
+        await self.db.execute(select(func.set_config("hnsw.ef_search", str(ef_search), True)))
+
+        candidates = (
+            select(self.model.id.label("id"), distance.label("distance"))
+            .filter(column.isnot(None))
+            .order_by(distance)
+            .limit(candidate_limit)
+            .subquery()
         )
-        
-        # Extract objects in order of similarity score (highest first)
-        result = []
-        for match_string, score, _ in matches:
-            if score >= min_score and match_string in choices:  # Filter by minimum score
-                result.append(choices[match_string])
-        
-        return result
\ No newline at end of file
+        query = (
+            select(self.model)
+            .join(candidates, candidates.c.id == self.model.id)
+            .filter(*(extra_conditions or []))
+            .order_by(candidates.c.distance, self.model.id)
+            .limit(limit)
+        )
+        records = await self._execute_with_relations(query, load_relations)
+        if extra_conditions and len(records) < limit:
+            return await self.nearest_by_embedding(embedding, limit, load_relations, extra_conditions, exact=True)
+        return records
+
+    async def _execute_with_relations(self, query, load_relations: list[str] = None) -> List[ModelType]:
+        if load_relations:
+            for relation in load_relations:
+                if '.' in relation:
+                    parts = relation.split('.')
+                    current_model = self.model
+                    option = None
+                    for part in parts:
+                        attr = getattr(current_model, part)
+                        current_model = attr.property.mapper.class_
+                        option = joinedload(attr) if option is None else option.joinedload(attr)
+                    query = query.options(option)
+                else:
+                    query = query.options(selectinload(getattr(self.model, relation)))
+        result = await self.db.execute(query)
+        return result.unique().scalars().all()
@@ -0,0 +1,90 @@
+import asyncio
+import threading
+import traceback
+from contextlib import AsyncExitStack
+from typing import Any, Coroutine, Optional
+
+
+class WorkerLoop:
+    """
+    One long-lived event loop per celery worker process, running on a background thread.
+
+    Tasks submit their coroutines to it instead of starting a new loop each time, so everything
+    bound to a loop is reused across tasks: the database pool, the Redis client, the Neo4j driver,
+    the pooled LLM clients with their concurrency caps and the embedding batch worker.
+    """
+
+    def __init__(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._resources: Optional[AsyncExitStack] = None
+        self._open_lock = asyncio.Lock()
+
+    def start(self):
+        """Start the loop, called from `worker_process_init` so each forked process gets its own"""
+        with self._lock:
+            if self._loop is not None:
+                return
+            from app.database.database import engine
+
+            # Connections inherited from the parent process can't be shared, drop them without closing
+            engine.sync_engine.dispose(close=False)
+            self._loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(target=self._loop.run_forever, name="worker-loop", daemon=True)
+            self._thread.start()
+
+    def run(self, coro: Coroutine) -> Any:
+        """Run a coroutine on the worker loop and wait for its result"""
+        self.start()
+        return asyncio.run_coroutine_threadsafe(self._run(coro), self._loop).result()
+
+    def stop(self):
+        """Close the shared connections and stop the loop, called from `worker_process_shutdown`"""
+        with self._lock:
+            if self._loop is None:
+                return
+            try:
+                asyncio.run_coroutine_threadsafe(self._close(), self._loop).result(timeout=30)
+            except Exception:
+                print(traceback.format_exc())
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=5)
+            self._loop.close()
+            self._loop, self._thread = None, None
+
+    async def _run(self, coro: Coroutine) -> Any:
+        try:
+            await self._open()
+        except Exception:
+            coro.close()
+            raise
+        return await coro
+
+    async def _open(self):
+        """Connect Redis once, retried by the next task if it fails"""
+        async with self._open_lock:
+            if self._resources is not None:
+                return
+            from app.database.redis_cache import redis_lifespan
+
+            resources = AsyncExitStack()
+            await resources.enter_async_context(redis_lifespan(None))
+            self._resources = resources
+
+    async def _close(self):
+        from app.core.llm import LLM
+        from app.database.database import engine
+        from app.database.graph_database import graph_db
+        from app.utils.embeddings import embedding_service
+
+        await LLM.close_clients()
+        await embedding_service.stop()
+        await graph_db.close()
+        if self._resources is not None:
+            await self._resources.aclose()
+            self._resources = None
+        await engine.dispose()
+
+
+worker_loop = WorkerLoop()
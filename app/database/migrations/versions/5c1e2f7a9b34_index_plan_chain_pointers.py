@@ -0,0 +1,33 @@
+"""index plan chain pointers
+
+Revision ID: 5c1e2f7a9b34
+Revises: ddfff452d5ea
+Create Date: 2026-10-18 10:12:41.503217
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c1e2f7a9b34'
+down_revision: Union[str, None] = 'ddfff452d5ea'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Existing chains are kept as they are, these indexes back the recursive ordering query
+    op.create_index(op.f('ix_plan_days_plan_id'), 'plan_days', ['plan_id'], unique=False)
+    op.create_index(op.f('ix_plan_days_next_plan_day_id'), 'plan_days', ['next_plan_day_id'], unique=False)
+    op.create_index(op.f('ix_plan_day_steps_plan_day_id'), 'plan_day_steps', ['plan_day_id'], unique=False)
+    op.create_index(op.f('ix_plan_day_steps_next_plan_day_step_id'), 'plan_day_steps', ['next_plan_day_step_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_plan_day_steps_next_plan_day_step_id'), table_name='plan_day_steps')
+    op.drop_index(op.f('ix_plan_day_steps_plan_day_id'), table_name='plan_day_steps')
+    op.drop_index(op.f('ix_plan_days_next_plan_day_id'), table_name='plan_days')
+    op.drop_index(op.f('ix_plan_days_plan_id'), table_name='plan_days')
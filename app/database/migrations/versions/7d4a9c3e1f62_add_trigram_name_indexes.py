@@ -0,0 +1,44 @@
+"""add trigram name indexes
+
+Revision ID: 7d4a9c3e1f62
+Revises: 5c1e2f7a9b34
+Create Date: 2026-10-18 14:03:27.118904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7d4a9c3e1f62'
+down_revision: Union[str, None] = '5c1e2f7a9b34'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TRIGRAM_INDEXES = [
+    ('ix_places_name_trgm', 'places'),
+    ('ix_cities_name_trgm', 'cities'),
+    ('ix_activities_name_trgm', 'activities'),
+]
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm;")
+
+    # GiST rather than GIN: get_similar orders by `name <-> :query`, which only GiST can serve
+    for index_name, table_name in TRIGRAM_INDEXES:
+        op.create_index(
+            index_name,
+            table_name,
+            ['name'],
+            unique=False,
+            postgresql_using='gist',
+            postgresql_ops={'name': 'gist_trgm_ops'},
+        )
+
+
+def downgrade() -> None:
+    for index_name, table_name in reversed(TRIGRAM_INDEXES):
+        op.drop_index(index_name, table_name=table_name, postgresql_using='gist')
@@ -0,0 +1,61 @@
+"""add transport service city coverage
+
+Revision ID: a3f8e61b2c47
+Revises: 7d4a9c3e1f62
+Create Date: 2026-10-18 15:21:09.447310
+
+"""
+from itertools import groupby
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.modules.transport_service.utils import get_service_path_cities
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3f8e61b2c47'
+down_revision: Union[str, None] = '7d4a9c3e1f62'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    coverage = op.create_table(
+        'transport_service_city_coverage',
+        sa.Column('service_id', sa.Integer(), sa.ForeignKey('transport_services.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('position', sa.Integer(), primary_key=True),
+        sa.Column('city_id', sa.Integer(), sa.ForeignKey('cities.id'), nullable=False),
+    )
+    op.create_index(
+        'ix_transport_service_city_coverage_city_service',
+        'transport_service_city_coverage',
+        ['city_id', 'service_id', 'position'],
+        unique=False,
+    )
+
+    # Backfill from the existing route segments
+    rows = op.get_bind().execute(sa.text("""
+        SELECT s.service_id, r.start_city_id, r.end_city_id
+        FROM transport_service_route_segments s
+        JOIN transport_routes r ON r.id = s.route_id
+        ORDER BY s.service_id, s.index
+    """)).all()
+
+    values = []
+    for service_id, service_rows in groupby(rows, key=lambda row: row.service_id):
+        try:
+            path = get_service_path_cities([(row.start_city_id, row.end_city_id) for row in service_rows])
+        except ValueError:
+            print(f"Skipping transport service {service_id}: route segments are not connected")
+            continue
+        values.extend({"service_id": service_id, "position": i, "city_id": city_id} for i, city_id in enumerate(path))
+
+    if values:
+        op.bulk_insert(coverage, values)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_transport_service_city_coverage_city_service', table_name='transport_service_city_coverage')
+    op.drop_table('transport_service_city_coverage')
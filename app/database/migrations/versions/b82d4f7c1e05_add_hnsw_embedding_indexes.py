@@ -0,0 +1,46 @@
+"""add hnsw embedding indexes
+
+Revision ID: b82d4f7c1e05
+Revises: a3f8e61b2c47
+Create Date: 2026-10-18 17:42:09.516230
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b82d4f7c1e05'
+down_revision: Union[str, None] = 'a3f8e61b2c47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+HNSW_INDEXES = [
+    ('ix_places_embedding_hnsw', 'places'),
+    ('ix_cities_embedding_hnsw', 'cities'),
+]
+
+
+def upgrade() -> None:
+    # HNSW needs pgvector >= 0.5.0, cosine ops to match the cosine_distance used by vector_search
+    for index_name, table_name in HNSW_INDEXES:
+        op.create_index(
+            index_name,
+            table_name,
+            ['embedding'],
+            unique=False,
+            postgresql_using='hnsw',
+            postgresql_with={'m': 16, 'ef_construction': 64},
+            postgresql_ops={'embedding': 'vector_cosine_ops'},
+        )
+
+    # Filtered searches count and scan the places of a city
+    op.create_index('ix_places_city_id', 'places', ['city_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_places_city_id', table_name='places')
+    for index_name, table_name in reversed(HNSW_INDEXES):
+        op.drop_index(index_name, table_name=table_name, postgresql_using='hnsw')
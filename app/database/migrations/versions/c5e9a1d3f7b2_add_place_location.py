@@ -0,0 +1,37 @@
+"""add place location
+
+Revision ID: c5e9a1d3f7b2
+Revises: b82d4f7c1e05
+Create Date: 2026-10-18 18:25:41.093317
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from geoalchemy2 import Geography
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5e9a1d3f7b2'
+down_revision: Union[str, None] = 'b82d4f7c1e05'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('places', sa.Column('location', Geography(geometry_type='POINT', srid=4326, spatial_index=False), nullable=True))
+
+    # New and updated places get their location from the ORM listeners, backfill the existing ones
+    op.execute("""
+        UPDATE places
+        SET location = ST_SetSRID(ST_MakePoint(longitude, latitude), 4326)::geography
+        WHERE latitude IS NOT NULL AND longitude IS NOT NULL
+    """)
+
+    op.create_index('ix_places_location', 'places', ['location'], unique=False, postgresql_using='gist')
+
+
+def downgrade() -> None:
+    op.drop_index('ix_places_location', table_name='places', postgresql_using='gist')
+    op.drop_column('places', 'location')
@@ -0,0 +1,29 @@
+"""add embedding hash
+
+Revision ID: d7f2b9e4a1c6
+Revises: c5e9a1d3f7b2
+Create Date: 2026-10-18 19:42:10.518204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd7f2b9e4a1c6'
+down_revision: Union[str, None] = 'c5e9a1d3f7b2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Hash of the content an embedding was computed from, NULL until the re-embed task has seen the row
+    op.add_column('places', sa.Column('embedding_hash', sa.String(length=64), nullable=True))
+    op.add_column('cities', sa.Column('embedding_hash', sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('cities', 'embedding_hash')
+    op.drop_column('places', 'embedding_hash')
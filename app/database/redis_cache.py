@@ -96,6 +96,19 @@ class RedisCache:
             await self.client.expire(key, ex)
         return await self.set(key, new_value)
 
+    async def incr(self, key: str, ex: Optional[int] = None) -> int:
+        """
+        Atomically increment an integer counter, creating it at 1 if missing.
+        Args:
+            key: The key of the counter.
+            ex: Optional expiration time in seconds. Counters don't expire if not provided.
+        """
+        full_key = f"{self.namespace}{key}"
+        value = await self.client.incr(full_key)
+        if ex:
+            await self.client.expire(full_key, ex)
+        return value
+
     async def clear_all(self):
         """
         Clear all keys in the Redis cache under the current namespace.
@@ -148,3 +161,9 @@ def get_redis_cache(sub_namespace: Optional[str] = None) -> Callable[[redis.Redi
     ) -> RedisCache:
         return RedisCache(client=client, sub_namespace=sub_namespace)
     return _get_cache_instance
+
+def get_redis_cache_instance(sub_namespace: Optional[str] = None) -> Optional[RedisCache]:
+    """RedisCache for code running outside of a request (repositories, background tasks), None if Redis isn't connected."""
+    if _shared_redis_client is None:
+        return None
+    return RedisCache(client=_shared_redis_client, sub_namespace=sub_namespace)
@@ -4,6 +4,7 @@ from sqlalchemy import insert
 from sqlalchemy.future import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.utils.embeddings import get_embedding
+from app.utils.embedding_sync import place_content_hash
 from neo4j import AsyncSession as Neo4jSession
 from app.database.seeder.utils import get_file_path, load_data
 from app.modules.places.schema import PlaceCategoryEnum
@@ -51,7 +52,8 @@ async def seed_default_places(db: AsyncSession, graph_db: Neo4jSession):
             city_id=mun.id,
             average_visit_duration=entry.get("average_visit_duration"),
             average_visit_cost=entry.get("average_visit_cost"),
-            embedding=embedding
+            embedding=embedding,
+            embedding_hash=place_content_hash(entry.get("description"))
         )
         db.add(place)
         await db.flush()  # get place.id
@@ -1,8 +1,9 @@
 from sqlalchemy import insert, select
-from app.core.all_models import TransportService, TransportServiceRouteSegment, City, TransportRoute, Image
+from app.core.all_models import TransportService, TransportServiceCityCoverage, TransportServiceRouteSegment, City, TransportRoute, Image
 from app.modules.transport_service.models import transport_service_images
 from app.database.seeder.utils import get_file_path, load_data
 from app.modules.transport_service.schema import TransportServiceCategoryEnum
+from app.modules.transport_service.utils import get_service_path_cities
 from app.modules.transport_route.schema import RouteCategoryEnum
 from app.modules.storage.schema import ImageCategoryEnum
 
@@ -16,6 +17,7 @@ async def seed_default_transport_services(db):
     transport_services = load_data("files/default_transport_services.json")
     for entry in transport_services:
         route_ids = []
+        route_cities = []
         total_distance = 0
         total_time = 0
 
@@ -41,6 +43,7 @@ async def seed_default_transport_services(db):
                     continue
 
             route_ids.append(route.id)
+            route_cities.append((route.start_city_id, route.end_city_id))
             total_distance += route.distance
             total_time += route.average_duration or 0
 
@@ -75,6 +78,13 @@ async def seed_default_transport_services(db):
             await db.flush()
             segments.append(segment)
 
+        try:
+            path = get_service_path_cities(route_cities)
+        except ValueError:
+            print(f"Invalid segments for transport service: {entry['description']}")
+            path = []
+        for position, city_id in enumerate(path):
+            db.add(TransportServiceCityCoverage(service_id=new_service.id, city_id=city_id, position=position))
 
         # Handle images
         transport_images = []
@@ -0,0 +1,86 @@
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+# Nesting depth of the unit of work a session is in, kept in `session.info`
+UNIT_OF_WORK_DEPTH = "unit_of_work_depth"
+# Callbacks waiting for the unit of work to commit, kept in `session.info`
+AFTER_COMMIT_CALLBACKS = "after_commit_callbacks"
+
+
+def in_unit_of_work(db: AsyncSession) -> bool:
+    return db.info.get(UNIT_OF_WORK_DEPTH, 0) > 0
+
+
+async def commit(db: AsyncSession):
+    """Commit, or only flush when a unit of work owns the transaction"""
+    if in_unit_of_work(db):
+        await db.flush()
+    else:
+        await db.commit()
+
+
+def run_after_commit(db: AsyncSession, callback: Callable[[], None]):
+    """
+    Run `callback` once the writes made so far are committed, e.g. to queue a task that reads them.
+    Outside a unit of work repositories have already committed, so it runs right away.
+    Inside one it runs after the outermost commit and is dropped if the transaction, or the nested
+    unit of work it was registered in, rolls back.
+    """
+    if in_unit_of_work(db):
+        db.info.setdefault(AFTER_COMMIT_CALLBACKS, []).append(callback)
+    else:
+        callback()
+
+
+@event.listens_for(Session, "after_commit")
+def _run_after_commit_callbacks(session: Session):
+    for callback in session.info.pop(AFTER_COMMIT_CALLBACKS, []):
+        callback()
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _drop_after_commit_callbacks(session: Session, previous_transaction):
+    # A SAVEPOINT rollback keeps the outer transaction, `unit_of_work` drops the callbacks it registered
+    if not previous_transaction.nested:
+        session.info.pop(AFTER_COMMIT_CALLBACKS, None)
+
+
+@asynccontextmanager
+async def unit_of_work(db: AsyncSession) -> AsyncIterator[AsyncSession]:
+    """
+    Group repository writes into one transaction.
+
+    Inside the block repositories flush instead of committing, the outermost block commits once
+    on success and rolls everything back on error. Nested blocks run in a SAVEPOINT so a failing
+    inner operation can be caught without losing the outer work.
+    """
+    depth = db.info.get(UNIT_OF_WORK_DEPTH, 0)
+    if depth:
+        callbacks = db.info.setdefault(AFTER_COMMIT_CALLBACKS, [])
+        pending = len(callbacks)
+        try:
+            async with db.begin_nested():
+                db.info[UNIT_OF_WORK_DEPTH] = depth + 1
+                try:
+                    yield db
+                finally:
+                    db.info[UNIT_OF_WORK_DEPTH] = depth
+        except BaseException:
+            # The SAVEPOINT rolled back, so did the writes the callbacks registered in it wait for
+            del callbacks[pending:]
+            raise
+        return
+
+    db.info[UNIT_OF_WORK_DEPTH] = 1
+    try:
+        yield db
+        await db.commit()
+    except BaseException:
+        await db.rollback()
+        raise
+    finally:
+        db.info.pop(UNIT_OF_WORK_DEPTH, None)
@@ -1,3 +1,4 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.responses import HTMLResponse
 from fastapi.security import HTTPBearer
@@ -7,6 +8,7 @@ from app.core.all_models import *
 from app.middlerware.auth import AuthMiddleware
 from app.middlerware.cors import add_cors_middleware
 from app.database.redis_cache import redis_lifespan
+from app.utils.embeddings import embedding_service
 
 from app.utils.homeage_router import router as homeage_router
 from app.modules.auth.routes import router as auth_router
@@ -24,7 +26,18 @@ from app.modules.plan_day.routes import router as plan_day_router
 from app.modules.plan_day_steps.routes import router as plan_day_step_router
 from app.modules.ai.routes import router as ai_router
 
-app = FastAPI(lifespan=redis_lifespan)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    async with redis_lifespan(app):
+        print("Application startup: Loading embedding model...")
+        await embedding_service.start()
+        print("Embedding model loaded.")
+        try:
+            yield
+        finally:
+            await embedding_service.stop()
+
+app = FastAPI(lifespan=lifespan)
 
 security = HTTPBearer()
 app.add_middleware(AuthMiddleware)
@@ -1,24 +1,73 @@
 from sqlite3 import IntegrityError
-from typing import List
+from typing import Dict, Iterable, List, Optional
 from fastapi_pagination import Params
-from sqlalchemy import insert, delete
+from sqlalchemy import func, insert, delete, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.repository import BaseRepository
+from app.database.redis_cache import get_redis_cache_instance
 from app.modules.accommodation_services.models import AccomodationService, accommodation_service_images
 from app.modules.accommodation_services.schema import AccomodationServiceBase, AccomodationServiceFilter
 
+CITY_AVERAGE_TTL = 600
+DEFAULT_CITY_AVERAGE = 1000
+# Cached in place of the average of a city without accommodations
+_NO_AVERAGE = "none"
+
+
+def _city_average_key(namespace: str, city_id: int) -> str:
+    return f"{namespace}{city_id}"
+
+
+async def invalidate_city_averages(city_ids: Iterable[Optional[int]]):
+    """Drop the shared cached averages of cities whose accommodations changed"""
+    cache = get_redis_cache_instance("city_average")
+    keys = [_city_average_key(cache.namespace, city_id) for city_id in set(city_ids) if city_id is not None] if cache else []
+    if keys:
+        await cache.client.delete(*keys)
+
+
 class AccomodationServiceRepository(BaseRepository[AccomodationService, AccomodationServiceBase]):
     def __init__(self, db: AsyncSession):
         super().__init__(AccomodationService, db)
 
+    async def create(self, schema: AccomodationServiceBase) -> AccomodationService:
+        record = await super().create(schema)
+        await invalidate_city_averages([record.city_id])
+        return record
+
+    async def update(self, record_id: int, schema: AccomodationServiceBase) -> Optional[AccomodationService]:
+        old_city_id = await self._get_city_id(record_id)
+        record = await super().update(record_id, schema)
+        if record:
+            await invalidate_city_averages([old_city_id, record.city_id])
+        return record
+
+    async def update_from_dict(self, record_id: int, data: dict) -> Optional[AccomodationService]:
+        old_city_id = await self._get_city_id(record_id)
+        record = await super().update_from_dict(record_id, data)
+        if record:
+            await invalidate_city_averages([old_city_id, record.city_id])
+        return record
+
+    async def delete(self, record_id: int) -> bool:
+        city_id = await self._get_city_id(record_id)
+        deleted = await super().delete(record_id)
+        if deleted:
+            await invalidate_city_averages([city_id])
+        return deleted
+
+    async def _get_city_id(self, record_id: int) -> Optional[int]:
+        result = await self.db.execute(select(AccomodationService.city_id).filter_by(id=record_id))
+        return result.scalar_one_or_none()
+
     async def add_images(self, accommodation_service_id: int, image_ids: List[int]):
         values = [{"accommodation_service_id": accommodation_service_id, "image_id": image_id} for image_id in image_ids]
         
         stmt = insert(accommodation_service_images).values(values)
         try:
             await self.db.execute(stmt)
-            await self.db.commit()
+            await self._commit()
         except IntegrityError:
             await self.db.rollback()
             raise
@@ -32,19 +81,55 @@ class AccomodationServiceRepository(BaseRepository[AccomodationService, Accomoda
             values = [{"accommodation_service_id": accommodation_service_id, "image_id": image_id} for image_id in image_ids]
             await self.db.execute(insert(accommodation_service_images).values(values))
 
-        await self.db.commit()
+        await self._commit()
 
     async def recommand(self, user_id: int, city_id: int, load_relations: List[str] = []):
         data = await self.index(params = Params(page=1, size=10), filters=AccomodationServiceFilter(city_id=city_id), load_relations=load_relations)
         return data.items
     
     async def get_city_average(self, city_id, use_default=True):
-        data = await self.get_all_filtered(filters={"city_id": city_id})
-        total = 0
-        for d in data:
-            total += d.cost_per_night
-
-        if len(data) > 0:
-            return total / len(data)
-        else:
-            return 1000 if use_default else None
\ No newline at end of file
+        averages = await self.get_city_averages([city_id])
+        if city_id in averages:
+            return averages[city_id]
+        return DEFAULT_CITY_AVERAGE if use_default else None
+
+    async def get_city_averages(self, city_ids: List[int]) -> Dict[int, float]:
+        """
+        Average cost per night of many cities, cities without accommodations are left out.
+        Averages are cached per city in Redis so every worker sees an invalidation, only the cities
+        missing from the cache are aggregated in SQL (one query).
+        """
+        city_ids = list(set(city_ids))
+        cache = get_redis_cache_instance("city_average")
+        averages: Dict[int, float] = {}
+        missing = set(city_ids)
+        if cache and city_ids:
+            cached = await cache.client.mget([_city_average_key(cache.namespace, city_id) for city_id in city_ids])
+            missing = set()
+            for city_id, value in zip(city_ids, cached):
+                if value is None:
+                    missing.add(city_id)
+                elif value != _NO_AVERAGE:
+                    averages[city_id] = float(value)
+        if not missing:
+            return averages
+
+        stmt = (
+            select(AccomodationService.city_id, func.avg(AccomodationService.cost_per_night))
+            .where(AccomodationService.city_id.in_(missing))
+            .group_by(AccomodationService.city_id)
+        )
+        result = await self.db.execute(stmt)
+        fetched = {city_id: float(average) for city_id, average in result.all()}
+        if cache:
+            async with cache.client.pipeline(transaction=False) as pipe:
+                for city_id in missing:
+                    value = fetched.get(city_id)
+                    pipe.set(
+                        _city_average_key(cache.namespace, city_id),
+                        repr(value) if value is not None else _NO_AVERAGE,
+                        ex=CITY_AVERAGE_TTL,
+                    )
+                await pipe.execute()
+        averages.update(fetched)
+        return averages
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import Column, Index, Integer, String, ForeignKey
 from pgvector.sqlalchemy import Vector
 from sqlalchemy.orm import relationship
 
@@ -6,6 +6,9 @@ from app.database.database import Base
 
 class Activity(Base):
     __tablename__ = "activities"
+    __table_args__ = (
+        Index("ix_activities_name_trgm", "name", postgresql_using="gist", postgresql_ops={"name": "gist_trgm_ops"}),
+    )
 
     id = Column(Integer, primary_key=True)
     name = Column(String, unique=True, index=True)
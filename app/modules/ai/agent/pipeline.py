@@ -0,0 +1,118 @@
+import asyncio
+from typing import AsyncIterator, List, Optional, Union
+
+from app.core.config import settings
+from app.database.database import SessionLocal
+from app.modules.ai.agent.planner import TripPlannerAgent
+from app.modules.ai.agent.resolver import PlaceResolver
+from app.modules.ai.agent.schema import AgentOverallTrip, AgentOverallTripItineraryItem, AgentPlanDay
+
+_DONE = object()
+
+
+class CityPlan:
+    """
+    One itinerary item of a trip. For `travel_around` items the city plan is generated in the background
+    as soon as the item is known, `days()` replays what it produced so far and waits for the rest.
+    """
+
+    def __init__(self, itinerary: AgentOverallTripItineraryItem, no_of_days: int):
+        self.itinerary = itinerary
+        self.no_of_days = no_of_days
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.task: Optional[asyncio.Task] = None
+
+    async def days(self) -> AsyncIterator[List[AgentPlanDay]]:
+        if self.task is None:
+            return
+        while True:
+            item = await self.queue.get()
+            if item is _DONE:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+
+
+class CityPlanPipeline:
+    """
+    Runs the overview stream of a trip and the single city plans of its itinerary concurrently.
+
+    Every city plan starts (place retrieval + LLM stream) as soon as its itinerary item is parsed, at most
+    `max_concurrency` at a time, in itinerary order. Background work uses its own sessions, the caller's
+    session is left for writing the plan. Items are yielded in itinerary order with their output
+    buffered, so the caller can commit them one after another while later cities are still generating.
+    `aclose` cancels everything that is still running.
+    """
+
+    def __init__(self, resolver: PlaceResolver, max_concurrency: Optional[int] = None):
+        self.resolver = resolver
+        # Semaphore wakes waiters in FIFO order, the city that is committed next is never starved
+        self.semaphore = asyncio.Semaphore(max_concurrency or settings.AI_CITY_PLAN_CONCURRENCY)
+        self.tasks: List[asyncio.Task] = []
+
+    async def stream(self, prompt: str, user_id: int) -> AsyncIterator[Union[AgentOverallTrip, CityPlan]]:
+        """Yields the trip once its title and description are known, then a CityPlan per itinerary item"""
+        events: asyncio.Queue = asyncio.Queue()
+        self.tasks.append(asyncio.create_task(self._read_overview(prompt, user_id, events)))
+        while True:
+            event = await events.get()
+            if event is _DONE:
+                return
+            if isinstance(event, BaseException):
+                raise event
+            yield event
+
+    async def aclose(self):
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks.clear()
+
+    def submit(self, itinerary: AgentOverallTripItineraryItem) -> CityPlan:
+        # Fallback no_of_days calculation
+        no_of_days = 5
+        if itinerary.departure:
+            arrival_day = itinerary.arrival.day if itinerary.arrival else 0
+            no_of_days = max(1, itinerary.departure.day - arrival_day)
+
+        city_plan = CityPlan(itinerary, no_of_days)
+        if itinerary.travel_around:
+            city_plan.task = asyncio.create_task(self._generate_city_plan(city_plan))
+            self.tasks.append(city_plan.task)
+        return city_plan
+
+    async def _read_overview(self, prompt: str, user_id: int, events: asyncio.Queue):
+        try:
+            async with SessionLocal() as db:
+                agent = TripPlannerAgent(db)
+                city_plans: List[CityPlan] = []
+                announced = -1  # city plans handed to the caller, -1 until the trip itself was
+                async for trip in agent.generate_overall_plan(prompt, user_id):
+                    for itinerary in trip.itinerary[len(city_plans):]:
+                        city_plans.append(self.submit(itinerary))
+                    if announced < 0:
+                        if not (trip.title and trip.description):
+                            # Cities parsed before the trip are already running, they are announced after it
+                            continue
+                        events.put_nowait(trip)
+                        announced = 0
+                    for city_plan in city_plans[announced:]:
+                        events.put_nowait(city_plan)
+                    announced = len(city_plans)
+        except Exception as e:
+            events.put_nowait(e)
+            return
+        events.put_nowait(_DONE)
+
+    async def _generate_city_plan(self, city_plan: CityPlan):
+        try:
+            async with self.semaphore:
+                async with SessionLocal() as db:
+                    agent = TripPlannerAgent(db)
+                    async for days in agent.generate_single_city_plan(city_plan.itinerary, city_plan.no_of_days, self.resolver):
+                        city_plan.queue.put_nowait(days)
+        except Exception as e:
+            city_plan.queue.put_nowait(e)
+            return
+        city_plan.queue.put_nowait(_DONE)
@@ -1,10 +1,12 @@
 from pprint import pprint
 from typing import AsyncIterator, List, Dict, Any
+from pydantic import ValidationError
 from sqlalchemy import and_, func, not_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.llm import LLM
 from app.modules.ai.agent.prompts import get_prompt, PLAN_JSON_GENERATION_PROMPT, PLAN_OVERVIEW_GENERATION_PROMPT, CITY_ITINERARY_PROMPT
-from app.modules.ai.agent.schema import AgentOverallTrip, AgentOverallTripItineraryItem, AgentPlanDay, AgentRetrievedPlace
+from app.modules.ai.agent.resolver import PlaceResolver
+from app.modules.ai.agent.schema import AgentOverallTrip, AgentOverallTripItineraryItem, AgentPlanDay, AgentPlanDayStep, AgentRetrievedPlace
 from app.modules.ai.agent.utils import combine_user_pref_and_prompt_json
 from app.modules.cities.models import City
 from app.modules.cities.repository import CityRepository
@@ -12,6 +14,9 @@ from app.modules.places.models import Place
 from app.modules.places.repository import PlaceRepository
 from app.modules.users.repository import UserRepository
 
+OVERALL_TRIP_PATHS = [("title",), ("description",), ("itinerary", "*")]
+CITY_PLAN_PATHS = [("*", "day"), ("*", "title"), ("*", "steps", "*")]
+
 class TripPlannerAgent:
     def __init__(self, db: AsyncSession):  
         self.db = db
@@ -43,22 +48,30 @@ class TripPlannerAgent:
         prompt += f". Plan should start at {final_user_preference.get('start_city')} and end at {final_user_preference.get('end_city')}"
 
         generation_prompt = get_prompt(PLAN_OVERVIEW_GENERATION_PROMPT, user_prompt=prompt, prompt_metadata=prompt_dict, user_preferences=final_user_preference, candidate_cities=candidate_city_names)
-        async for r in LLM.get_structured_stream(generation_prompt, schema=AgentOverallTrip):
-            r.start_city = final_user_preference.get('start_city')
-            yield r
+        # Only completed fields and itinerary items are parsed and validated, once each
+        trip = AgentOverallTrip.model_construct(title=None, description=None, start_city=final_user_preference.get('start_city'), itinerary=[])
+        async for path, value in LLM.get_structured_fragments(generation_prompt, paths=OVERALL_TRIP_PATHS):
+            if path[0] == "itinerary":
+                try:
+                    trip.itinerary.append(AgentOverallTripItineraryItem.model_validate(value))
+                except ValidationError:
+                    continue
+            else:
+                setattr(trip, path[0], value)
+            yield trip
 
 
-    async def generate_single_city_plan(self, itinerary: AgentOverallTripItineraryItem, no_of_days: int) -> AsyncIterator[List[AgentPlanDay]]:
+    async def generate_single_city_plan(self, itinerary: AgentOverallTripItineraryItem, no_of_days: int, resolver: PlaceResolver = None) -> AsyncIterator[List[AgentPlanDay]]:
         similar_cities = await self.city_repository.get_similar(itinerary.city, limit=1)
         city_id = similar_cities[0].id if similar_cities else None
         relevent_places = await self.place_repository.vector_search(
             query=itinerary.description,
-            extra_conditions=[
-                Place.city_id == city_id
-            ],
+            city_id=city_id,
             limit=(no_of_days  * 5),
             load_relations=["place_activities.activity"]
         )
+        if resolver is not None:
+            resolver.add(relevent_places)
         place_items = [AgentRetrievedPlace.model_validate(place) for place in relevent_places]
         retrieved_places = []
         for item in place_items:
@@ -75,6 +88,22 @@ class TripPlannerAgent:
         }
         prompt = get_prompt(CITY_ITINERARY_PROMPT, city=itinerary.city, places=retrieved_places, itinerary=iter_dict)
 
-        async for r in LLM.get_structured_stream(prompt, AgentPlanDay):
-            yield r
+        # Days are yielded as soon as their number and title are known, steps are appended as they complete
+        days: Dict[int, AgentPlanDay] = {}
+        pending: Dict[int, Dict[str, Any]] = {}
+        async for (day_index, field, *_), value in LLM.get_structured_fragments(prompt, paths=CITY_PLAN_PATHS):
+            entry = pending.setdefault(day_index, {"steps": []})
+            try:
+                if field == "steps":
+                    step = AgentPlanDayStep.model_validate(value)
+                    (days[day_index].steps if day_index in days else entry["steps"]).append(step)
+                else:
+                    entry[field] = value
+                    if day_index in days or "day" not in entry or "title" not in entry:
+                        continue
+                    days[day_index] = AgentPlanDay.model_validate(entry)
+            except ValidationError:
+                continue
+            if days:
+                yield [days[i] for i in sorted(days)]
         
\ No newline at end of file
@@ -249,6 +249,7 @@ Your task is to create a **day-by-day itinerary** for the city `{city}`.
    - Each step must be:
      - `"category": "visit"` → for a specific place.  
      - `"category": "activity"` → for a specific activity on certain place.
+   - Always copy the `id` of the place into `place_id`, and for activities the `id` of the entry in its `place_activities` into `place_activity_id`. Never invent ids.
 
 3. **Output Requirements:**
    - Always output **valid JSON only**.  
@@ -262,7 +263,9 @@ Your task is to create a **day-by-day itinerary** for the city `{city}`.
     "steps": [
       {
         "category": "visit" | "activity",
+        "place_id": int (id of the place from Places JSON),
         "place": "string (must match a place from Places JSON, empty if not applicable)",
+        "place_activity_id": int | null (only applicable if type is activity, id of the place activity from Places JSON),
         "activity": "string (only applicable if type is activity, should match activity name from Places JSON)",
       }
     ]
@@ -0,0 +1,69 @@
+from typing import Dict, Iterable, Optional, Tuple
+
+from rapidfuzz import fuzz, process
+
+from app.modules.ai.agent.schema import AgentPlanDayStep
+from app.modules.place_activities.models import PlaceActivity
+from app.modules.places.models import Place
+
+# Minimum fuzzy scores (0-100) for a name to count as one of the retrieved places / activities,
+# below them the name is treated as unknown instead of mapped to the closest unrelated one
+PLACE_MATCH_CUTOFF = 80
+ACTIVITY_MATCH_CUTOFF = 80
+
+class PlaceResolver:
+    """
+    Maps the steps written by the LLM back to the places it was shown, for one plan generation.
+
+    Places retrieved for the city prompts are kept in memory with their activities, steps carrying
+    `place_id` / `place_activity_id` resolve with a dict lookup. Names are only fuzzy matched against
+    the retrieved places when the model left the IDs out or made them up, names that don't match
+    any of them closely resolve to None so the caller can look them up elsewhere.
+    """
+
+    def __init__(self):
+        self.places: Dict[int, Place] = {}
+        self.place_activities: Dict[int, Tuple[Place, PlaceActivity]] = {}
+
+    def add(self, places: Iterable[Place]):
+        """Register retrieved places, `place_activities.activity` must be loaded"""
+        for place in places:
+            self.places[place.id] = place
+            for place_activity in place.place_activities:
+                self.place_activities[place_activity.id] = (place, place_activity)
+
+    def resolve(self, step: AgentPlanDayStep, city_id: Optional[int] = None) -> Tuple[Optional[Place], Optional[PlaceActivity]]:
+        if step.place_activity_id in self.place_activities:
+            place, place_activity = self.place_activities[step.place_activity_id]
+            if step.category == "activity":
+                return place, place_activity
+            return place, None
+
+        place = self.places.get(step.place_id) or self._match_place(step.place, city_id)
+        if not place or step.category != "activity":
+            return place, None
+        return place, self._match_activity(place, step.activity)
+
+    def _match_place(self, name: Optional[str], city_id: Optional[int]) -> Optional[Place]:
+        if not name:
+            return None
+        choices = {
+            place.name: place for place in self.places.values()
+            if place.name and (city_id is None or place.city_id == city_id)
+        }
+        if not choices:
+            return None
+        match = process.extractOne(name, choices.keys(), scorer=fuzz.ratio, score_cutoff=PLACE_MATCH_CUTOFF)
+        if match is None:
+            return None
+        return choices[match[0]]
+
+    @staticmethod
+    def _match_activity(place: Place, name: Optional[str]) -> Optional[PlaceActivity]:
+        choices = {act.activity.name: act for act in place.place_activities if act.activity and act.activity.name}
+        if not name or not choices:
+            return None
+        match = process.extractOne(name, choices.keys(), score_cutoff=ACTIVITY_MATCH_CUTOFF)
+        if match is None:
+            return None
+        return choices[match[0]]
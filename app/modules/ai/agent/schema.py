@@ -24,7 +24,9 @@ class AgentOverallTrip(BaseModel):
 
 class AgentPlanDayStep(BaseModel):
     category: Literal['visit', 'activity']
+    place_id: Optional[int] = None
     place: str
+    place_activity_id: Optional[int] = None
     activity: Optional[str] = None
 
 class AgentPlanDay(BaseModel):
@@ -39,6 +41,7 @@ class AgentRetrievedActivity(BaseModel):
         from_attributes = True
 
 class AgentRetrievedPlaceActivity(BaseModel):
+    id: int
     name: Optional[str] = None
     title: str
     description: Optional[str]
@@ -50,6 +53,7 @@ class AgentRetrievedPlaceActivity(BaseModel):
         from_attributes = True
 
 class AgentRetrievedPlace(BaseModel):
+    id: int
     name: str
     description: str
     categories: List[PlaceCategoryEnum]
@@ -0,0 +1,226 @@
+import asyncio
+import json
+import time
+import traceback
+from contextlib import suppress
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import WebSocket, WebSocketDisconnect
+
+from app.database.redis_cache import RedisCache
+from app.modules.ai.schema import AIJobRead, AIJobStatusEnum
+from app.utils.websocket_utils import safe_json_dumps
+
+JOB_TTL = 24 * 3600
+EVENT_STREAM_MAXLEN = 5000
+# How long a subscriber blocks on the event stream before looking at the job and the client again
+EVENT_BLOCK_MS = 1000
+CANCEL_POLL_SECONDS = 1.0
+# A running job renews its lease every JOB_HEARTBEAT_SECONDS, once the lease lapses the worker is assumed dead
+JOB_HEARTBEAT_SECONDS = 10
+JOB_LEASE_SECONDS = 60
+
+TERMINAL_STATUSES = {AIJobStatusEnum.completed, AIJobStatusEnum.failed, AIJobStatusEnum.cancelled}
+TERMINAL_EVENTS = {"completed", "error", "cancelled"}
+
+
+class AIJobStore:
+    """
+    AI plan generation jobs in Redis.
+
+    A job is a JSON record with its status, listed per user in a sorted set. Its progress messages
+    (snapshot, deltas, completed / error) are appended to a Redis stream, the stream entry ID is the
+    event ID: subscribers read from the last ID they saw and can reconnect without losing anything.
+    The worker running a job holds a lease that it renews while it runs, a running job whose lease
+    lapsed is marked as failed. Everything expires `JOB_TTL` after the last write.
+    """
+
+    def __init__(self, redis: RedisCache):
+        self.redis = redis
+        self.client = redis.client
+
+    def _events_key(self, job_id: str) -> str:
+        return f"{self.redis.namespace}events:{job_id}"
+
+    def _user_key(self, user_id: int) -> str:
+        return f"{self.redis.namespace}user:{user_id}"
+
+    async def create(self, user_id: int, prompt: str, pace_ms: int) -> AIJobRead:
+        job_id = await self.redis.generate_unique_key("job_")
+        now = time.time()
+        job = AIJobRead(
+            id=job_id,
+            user_id=user_id,
+            prompt=prompt,
+            pace_ms=pace_ms,
+            status=AIJobStatusEnum.queued,
+            created_at=now,
+            updated_at=now,
+        )
+        await self.redis.set(job_id, job.model_dump(mode="json"), ex=JOB_TTL)
+        user_key = self._user_key(user_id)
+        await self.client.zadd(user_key, {job_id: now})
+        await self.client.zremrangebyscore(user_key, 0, now - JOB_TTL)
+        await self.client.expire(user_key, JOB_TTL)
+        return job
+
+    async def get(self, job_id: str) -> Optional[AIJobRead]:
+        data = await self.redis.get(job_id)
+        if not isinstance(data, dict):
+            return None
+        return AIJobRead.model_validate(data)
+
+    async def update(self, job_id: str, **fields) -> Optional[AIJobRead]:
+        job = await self.get(job_id)
+        if not job:
+            return None
+        job = job.model_copy(update={**fields, "updated_at": time.time()})
+        await self.redis.set(job_id, job.model_dump(mode="json"), ex=JOB_TTL)
+        return job
+
+    async def list_for_user(self, user_id: int, limit: int = 20) -> List[AIJobRead]:
+        job_ids = await self.client.zrevrange(self._user_key(user_id), 0, limit - 1)
+        if not job_ids:
+            return []
+        values = await self.client.mget([f"{self.redis.namespace}{job_id}" for job_id in job_ids])
+        return [AIJobRead.model_validate(json.loads(value)) for value in values if value]
+
+    async def publish(self, job_id: str, event: Dict[str, Any]) -> str:
+        key = self._events_key(job_id)
+        event_id = await self.client.xadd(key, {"data": safe_json_dumps(event)}, maxlen=EVENT_STREAM_MAXLEN, approximate=True)
+        await self.client.expire(key, JOB_TTL)
+        return event_id
+
+    async def read_events(self, job_id: str, last_event_id: str = "0", block_ms: Optional[int] = None) -> List[Tuple[str, Dict[str, Any]]]:
+        """Events after `last_event_id` ("0" for all of them), waits up to `block_ms` if there are none yet"""
+        result = await self.client.xread({self._events_key(job_id): last_event_id}, block=block_ms, count=100)
+        if not result:
+            return []
+        _, entries = result[0]
+        return [(event_id, json.loads(fields["data"])) for event_id, fields in entries]
+
+    async def request_cancel(self, job_id: str):
+        await self.redis.set(f"{job_id}:cancel", "1", ex=JOB_TTL)
+
+    async def wait_for_cancel(self, job_id: str):
+        while not await self.redis.exists(f"{job_id}:cancel"):
+            await asyncio.sleep(CANCEL_POLL_SECONDS)
+
+    async def renew_lease(self, job_id: str):
+        await self.redis.set(f"{job_id}:lease", str(time.time()), ex=JOB_LEASE_SECONDS)
+
+    async def keep_lease(self, job_id: str):
+        while True:
+            await asyncio.sleep(JOB_HEARTBEAT_SECONDS)
+            try:
+                await self.renew_lease(job_id)
+            except Exception as e:
+                print(f"Failed to renew lease of job {job_id}: {e}")
+
+    async def fail_if_stale(self, job: AIJobRead) -> AIJobRead:
+        """Mark a running job whose worker stopped renewing its lease as failed, subscribers get an error event"""
+        if job.status != AIJobStatusEnum.running or await self.redis.exists(f"{job.id}:lease"):
+            return job
+        error = "Generation worker stopped responding"
+        job = await self.update(job.id, status=AIJobStatusEnum.failed, error=error) or job
+        await self.publish(job.id, {"type": "error", "response": error})
+        return job
+
+    async def follow_websocket(self, job_id: str, websocket: WebSocket, last_event_id: str = "0"):
+        """
+        Forward the events of a job to a websocket, each with its `event_id`, until the job ends or the
+        client leaves. `{"type": "resync"}` from the client replays the job from its first snapshot.
+        """
+        resync = asyncio.Event()
+        listener = asyncio.create_task(_listen(websocket, resync))
+        try:
+            while not listener.done():
+                if resync.is_set():
+                    resync.clear()
+                    last_event_id = "0"
+
+                events = await self.read_events(job_id, last_event_id, block_ms=EVENT_BLOCK_MS)
+                if not events:
+                    job = await self.get(job_id)
+                    if not job:
+                        await websocket.send_text(safe_json_dumps({"type": "error", "response": "Job not found or expired"}))
+                        return
+                    if job.status in TERMINAL_STATUSES:
+                        return
+                    # The error event is forwarded on the next read
+                    await self.fail_if_stale(job)
+                    continue
+
+                for event_id, event in events:
+                    await websocket.send_text(safe_json_dumps({**event, "event_id": event_id}))
+                    last_event_id = event_id
+                    if event.get("type") in TERMINAL_EVENTS:
+                        return
+        finally:
+            listener.cancel()
+            with suppress(asyncio.CancelledError, WebSocketDisconnect):
+                await listener
+
+
+async def _listen(websocket: WebSocket, resync: asyncio.Event):
+    while True:
+        try:
+            data = await websocket.receive_json()
+        except ValueError:
+            continue
+        if isinstance(data, dict) and data.get("type") == "resync":
+            resync.set()
+
+
+async def run_ai_job(job_id: str):
+    """
+    Body of the `generate_ai_plan` celery task, generation events are published to the job's stream.
+    Runs on the worker's long-lived loop (app.core.worker_loop), which owns the Redis and database connections.
+    """
+    from app.database.database import SessionLocal
+    from app.database.redis_cache import get_redis_cache_instance
+    from app.modules.ai.controller import AIController  # To avoid circular import
+
+    store = AIJobStore(get_redis_cache_instance("ai_job"))
+    job = await store.get(job_id)
+    if not job or job.status != AIJobStatusEnum.queued:
+        return
+    await store.renew_lease(job_id)
+    await store.update(job_id, status=AIJobStatusEnum.running)
+    lease = asyncio.create_task(store.keep_lease(job_id))
+
+    outcome = {"status": AIJobStatusEnum.failed, "error": "Generation ended without completing"}
+
+    async def emit(message: Dict[str, Any]):
+        if message.get("type") == "snapshot" and message.get("seq") == 1:
+            await store.update(job_id, plan_id=message["response"]["id"])
+        elif message.get("type") == "completed":
+            outcome.update(status=AIJobStatusEnum.completed, error=None)
+        elif message.get("type") == "error":
+            outcome.update(status=AIJobStatusEnum.failed, error=message.get("response"))
+        await store.publish(job_id, message)
+
+    try:
+        async with SessionLocal() as db:
+            controller = AIController(db, get_redis_cache_instance("chat"), job.user_id)
+            generation = asyncio.create_task(controller.generate_plan(job.prompt, emit, job.pace_ms))
+            cancel = asyncio.create_task(store.wait_for_cancel(job_id))
+            await asyncio.wait({generation, cancel}, return_when=asyncio.FIRST_COMPLETED)
+            if not generation.done():
+                generation.cancel()
+                outcome.update(status=AIJobStatusEnum.cancelled, error=None)
+                await store.publish(job_id, {"type": "cancelled"})
+            cancel.cancel()
+            for task in (generation, cancel):
+                with suppress(asyncio.CancelledError):
+                    await task
+    except Exception as e:
+        print(traceback.format_exc())
+        outcome.update(status=AIJobStatusEnum.failed, error=str(e))
+        await store.publish(job_id, {"type": "error", "response": str(e)})
+    finally:
+        lease.cancel()
+        with suppress(asyncio.CancelledError):
+            await lease
+        # The lease is left to expire, a subscriber that saw the job running never finds it missing
+        await store.update(job_id, **outcome)
@@ -1,57 +1,142 @@
-from datetime import datetime
-import json
-from fastapi import APIRouter, Depends, HTTPException, Request, WebSocket, WebSocketDisconnect
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
 import traceback
+from pydantic import ValidationError
+from app.core.celery_tasks import generate_ai_plan
 from app.core.schemas import BaseResponse
 from app.database.redis_cache import RedisCache, get_redis_cache
-from app.modules.ai.controller import AIController
+from app.modules.ai.jobs import TERMINAL_STATUSES, AIJobStore
+from app.modules.ai.schema import AIJobCreate
 from app.utils.websocket_utils import authenticate_websocket, safe_json_dumps
-from app.database.database import get_db
-from app.database.graph_database import get_graph_db
-from app.modules.auth.service import AuthService
 
 
 router = APIRouter()
 
 @router.websocket("/generate")
 async def generate_plan_websocket(
-    websocket: WebSocket, 
-    db = Depends(get_db), 
-    graph_db = Depends(get_graph_db),
-    redis: RedisCache = Depends(get_redis_cache("chat")),
+    websocket: WebSocket,
+    redis: RedisCache = Depends(get_redis_cache("ai_job")),
 ):
+    """
+    Start a job with `{"prompt": ..., "pace_ms": ...}` or follow an existing one with
+    `{"job_id": ..., "last_event_id": ...}`. Generation runs in a celery worker, this only relays its events.
+    """
     await websocket.accept()
     try:
         user_id = await authenticate_websocket(websocket)
-        
+
         if user_id is None:
             await websocket.send_text(safe_json_dumps({
                 "type": "error",
                 "message": "Token is required"
             }))
             return
-            
+
         data = await websocket.receive_json()
-        prompt = data.get("prompt")
-        
-        if not prompt:
-            await websocket.send_text(safe_json_dumps({
-                "type": "error",
-                "message": "Missing prompt"
-            }))
-            return
-            
-        controller = AIController(db, graph_db, redis, user_id)
-        await controller.generate_plan_websocket(prompt, websocket)
-        
+        store = AIJobStore(redis)
+
+        if data.get("job_id"):
+            job = await store.get(data["job_id"])
+            if not job or job.user_id != user_id:
+                await websocket.send_text(safe_json_dumps({
+                    "type": "error",
+                    "message": "Job not found"
+                }))
+                return
+        else:
+            try:
+                job_data = AIJobCreate(prompt=data.get("prompt"), **({"pace_ms": data["pace_ms"]} if "pace_ms" in data else {}))
+            except ValidationError:
+                await websocket.send_text(safe_json_dumps({
+                    "type": "error",
+                    "message": "Missing prompt or invalid pace_ms"
+                }))
+                return
+            job = await store.create(user_id, job_data.prompt, job_data.pace_ms)
+            # Publishing to the broker is blocking I/O
+            await asyncio.to_thread(generate_ai_plan.delay, job.id)
+
+        await websocket.send_text(safe_json_dumps({"type": "job", "response": job.model_dump(mode="json")}))
+        await store.follow_websocket(job.id, websocket, data.get("last_event_id") or "0")
+
     except WebSocketDisconnect:
         print("Client disconnected")
     except Exception as e:
         traceback.print_exc()
         await websocket.send_text(safe_json_dumps({
-            "type": "error", 
+            "type": "error",
             "message": str(e)
         }))
     finally:
         await websocket.close()
 
+@router.post("/jobs")
+async def create_job(
+    request: Request,
+    job_data: AIJobCreate,
+    redis: RedisCache = Depends(get_redis_cache("ai_job")),
+):
+    try:
+        job = await AIJobStore(redis).create(request.state.user_id, job_data.prompt, job_data.pace_ms)
+        await asyncio.to_thread(generate_ai_plan.delay, job.id)
+        return BaseResponse(message="Plan generation queued", data=job)
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        print(traceback.format_exc())
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/jobs")
+async def list_jobs(
+    request: Request,
+    limit: int = Query(20, ge=1, le=100),
+    redis: RedisCache = Depends(get_redis_cache("ai_job")),
+):
+    try:
+        jobs = await AIJobStore(redis).list_for_user(request.state.user_id, limit)
+        return BaseResponse(message="Jobs fetched successfully", data=jobs)
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        print(traceback.format_exc())
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/jobs/{job_id}")
+async def get_job(
+    request: Request,
+    job_id: str,
+    redis: RedisCache = Depends(get_redis_cache("ai_job")),
+):
+    try:
+        store = AIJobStore(redis)
+        job = await store.get(job_id)
+        if not job or job.user_id != request.state.user_id:
+            raise HTTPException(status_code=404, detail="Job not found")
+        job = await store.fail_if_stale(job)
+        return BaseResponse(message="Job fetched successfully", data=job)
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        print(traceback.format_exc())
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.delete("/jobs/{job_id}")
+async def cancel_job(
+    request: Request,
+    job_id: str,
+    redis: RedisCache = Depends(get_redis_cache("ai_job")),
+):
+    try:
+        store = AIJobStore(redis)
+        job = await store.get(job_id)
+        if not job or job.user_id != request.state.user_id:
+            raise HTTPException(status_code=404, detail="Job not found")
+        if job.status in TERMINAL_STATUSES:
+            raise HTTPException(status_code=400, detail="Job already finished")
+        await store.request_cancel(job_id)
+        return BaseResponse(message="Job cancellation requested")
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        print(traceback.format_exc())
+        raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,31 @@
+from enum import Enum
+from typing import Optional
+from pydantic import BaseModel, Field
+
+# Suggested delay between rendering two deltas, clients may ignore it
+DEFAULT_PACE_MS = 750
+
+
+class AIJobStatusEnum(str, Enum):
+    queued = "queued"
+    running = "running"
+    completed = "completed"
+    failed = "failed"
+    cancelled = "cancelled"
+
+
+class AIJobCreate(BaseModel):
+    prompt: str = Field(min_length=1)
+    pace_ms: int = Field(default=DEFAULT_PACE_MS, ge=0)
+
+
+class AIJobRead(BaseModel):
+    id: str
+    user_id: int
+    prompt: str
+    pace_ms: int
+    status: AIJobStatusEnum
+    plan_id: Optional[int] = None
+    error: Optional[str] = None
+    created_at: float
+    updated_at: float
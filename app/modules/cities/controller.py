@@ -1,7 +1,10 @@
 from typing import Optional
 from fastapi import HTTPException
+from app.core.celery_tasks import reembed_content
+from app.database.unit_of_work import run_after_commit
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.modules.cities.graph import CityGraphRepository, CityNode
+from app.modules.cities.nearest_cache import NearestCityCache
 from app.modules.cities.repository import CityRepository
 from app.modules.cities.schema import CityRead, CityCreate, CityNearest
 from fastapi_pagination import Params
@@ -13,10 +16,14 @@ class CityController():
         self.db = db
         self.city_repo = CityRepository(db)
         self.graph_repository = CityGraphRepository(graph_db)
+        self.nearest_cache = NearestCityCache(db)
 
     async def add_city(self, city: CityCreate):
         res = await self.city_repo.create(city)
         await self.graph_repository.create(CityNode(id=res.id, name=res.name))
+        await self.nearest_cache.invalidate()
+        city_id = res.id
+        run_after_commit(self.db, lambda: reembed_content.delay(city_ids=[city_id]))
         return BaseResponse(message="City created successfully", data={"id": res.id, **city.model_dump()})
     
     async def update_city(self, city_id: int, city: CityCreate):
@@ -24,6 +31,8 @@ class CityController():
         if not res:
             raise HTTPException(status_code=404, detail="City not found")
         await self.graph_repository.update(CityNode(id=res.id, name=res.name))
+        await self.nearest_cache.invalidate()
+        run_after_commit(self.db, lambda: reembed_content.delay(city_ids=[city_id]))
         return BaseResponse(message="City updated successfully", data={"id": res.id, **city.model_dump()})
     
     async def delete_city(self, city_id: int):
@@ -31,6 +40,7 @@ class CityController():
         if not city:
             raise HTTPException(status_code=404, detail="City not found")
         await self.graph_repository.delete(city_id)
+        await self.nearest_cache.invalidate()
         return BaseResponse(message="City deleted successfully")
     
     async def index(self, search: str, params: Params):
@@ -44,23 +54,26 @@ class CityController():
         return BaseResponse(message="Cities fetched successfully", data=[CityRead.model_validate(m, from_attributes=True) for m in res.items])
     
 
-    async def nearest(self, city_id: int, params: Params, search: Optional[str] = None):
-        city = await self.city_repo.get(city_id)
-        if not city:
-            raise HTTPException(status_code=404, detail="City not found")
-        res = await self.city_repo.get_nearest(city.latitude, city.longitude, params, search)
+    async def nearest(
+        self,
+        params: Params,
+        city_id: Optional[int] = None,
+        lat: Optional[float] = None,
+        lng: Optional[float] = None,
+        search: Optional[str] = None,
+    ):
+        if city_id is not None:
+            city = await self.city_repo.get(city_id)
+            if not city:
+                raise HTTPException(status_code=404, detail="City not found")
+            lat, lng = city.latitude, city.longitude
+        elif lat is None or lng is None:
+            raise HTTPException(status_code=400, detail="Provide a city_id or a location (lat and lng)")
+
+        res = await self.nearest_cache.get(lat, lng, params, search, exclude_id=city_id)
         items = res["items"]
         if not items:
             raise HTTPException(status_code=404, detail="No nearby cities found")
 
-        validated = [
-            CityNearest(
-                id=row.id,
-                name=row.name,
-                longitude=row.longitude,
-                latitude=row.latitude,
-                distance=row.distance
-            )
-            for row in items
-        ]
-        return BaseResponse(message="Nearest cities fetched successfully", data=validated)
+        validated = [CityNearest(**item) for item in items]
+        return BaseResponse(message="Nearest cities fetched successfully", data=validated, page=params.page, size=params.size, total=res["total"])
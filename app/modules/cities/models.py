@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Float, event
+from sqlalchemy import Column, Index, Integer, String, ForeignKey, Float, event
 from app.database.database import Base
 from geoalchemy2 import Geography
 from  geoalchemy2.shape import from_shape
@@ -7,6 +7,13 @@ from pgvector.sqlalchemy import Vector
 
 class City(Base):
     __tablename__ = "cities"
+    __table_args__ = (
+        Index("ix_cities_name_trgm", "name", postgresql_using="gist", postgresql_ops={"name": "gist_trgm_ops"}),
+        Index(
+            "ix_cities_embedding_hnsw", "embedding",
+            postgresql_using="hnsw", postgresql_with={"m": 16, "ef_construction": 64}, postgresql_ops={"embedding": "vector_cosine_ops"},
+        ),
+    )
 
     id = Column(Integer, primary_key=True)
     name = Column(String, index=True)
@@ -14,6 +21,7 @@ class City(Base):
     longitude = Column(Float, nullable=True)
     location = Column(Geography(geometry_type="POINT", srid=4326), nullable=True)
     embedding = Column(Vector(384), nullable=True)
+    embedding_hash = Column(String(64), nullable=True)
 
 
 @event.listens_for(City, "before_insert")
@@ -0,0 +1,89 @@
+from typing import Any, Dict, Optional
+
+from fastapi_pagination import Params
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database.redis_cache import RedisCache, get_redis_cache_instance
+from app.modules.cities.repository import CityRepository
+from app.utils import geohash
+from app.utils.geo import haversine
+
+NEAREST_TTL = 3600
+# 6 characters is a ~1.2km x 0.6km tile, GPS positions from the same spot land in the same tile
+NEAREST_TILE_PRECISION = 6
+# Cities cached per tile, pages are sliced from this list
+NEAREST_TILE_ROWS = 100
+
+
+class NearestCityCache:
+    """
+    Nearest cities per geohash tile, stored in Redis.
+
+    A miss runs the KNN query once from the tile center and caches the NEAREST_TILE_ROWS nearest cities.
+    Every request in the tile re-sorts that list by great-circle distance from its own point and slices
+    its page out of it, so pages of one point never overlap or skip a city. A page is only served from
+    the list when no uncached city can be closer than its farthest city (the point is at most a tile
+    away from the center), deeper pages query the database directly.
+    Any city change bumps a version counter, which retires every cached tile.
+    """
+
+    def __init__(self, db: AsyncSession, redis_cache: Optional[RedisCache] = None):
+        self.repository = CityRepository(db)
+        self.cache = redis_cache if redis_cache is not None else get_redis_cache_instance("nearest_cities")
+
+    async def get(
+        self,
+        lat: float,
+        lng: float,
+        params: Params,
+        search: Optional[str] = None,
+        exclude_id: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        if not self.cache or params.page * params.size > NEAREST_TILE_ROWS:
+            return await self._query(lat, lng, params, search, exclude_id)
+
+        tile = geohash.encode(lat, lng, NEAREST_TILE_PRECISION)
+        tile_lat, tile_lng = geohash.decode(tile)
+        version = await self.cache.get("version")
+        key = f"v{version or 0}:{tile}:{exclude_id or ''}:{(search or '').lower()}"
+        cached = await self.cache.get(key)
+        if cached is None:
+            res = await self.repository.get_nearest(
+                tile_lat, tile_lng, Params(page=1, size=NEAREST_TILE_ROWS), search, exclude_id=exclude_id
+            )
+            cached = {"items": [self._row(row) for row in res["items"]], "total": res["total"]}
+            await self.cache.set(key, cached, ex=NEAREST_TTL)
+
+        items = [
+            {**item, "distance": haversine(lat, lng, item["latitude"], item["longitude"]) * 1000}
+            for item in cached["items"]
+        ]
+        items.sort(key=lambda item: (item["distance"], item["id"]))
+        offset = (params.page - 1) * params.size
+        page = items[offset:offset + params.size]
+
+        if len(cached["items"]) < cached["total"] and page:
+            # Uncached cities are at least as far from the center as the last cached one
+            last = cached["items"][-1]
+            bound = haversine(tile_lat, tile_lng, last["latitude"], last["longitude"]) - haversine(lat, lng, tile_lat, tile_lng)
+            if page[-1]["distance"] > bound * 1000:
+                return await self._query(lat, lng, params, search, exclude_id)
+        return {"items": page, "total": cached["total"]}
+
+    async def invalidate(self):
+        if self.cache:
+            await self.cache.incr("version")
+
+    async def _query(self, lat: float, lng: float, params: Params, search: Optional[str], exclude_id: Optional[int]) -> Dict[str, Any]:
+        res = await self.repository.get_nearest(lat, lng, params, search, exclude_id=exclude_id)
+        return {"items": [self._row(row) for row in res["items"]], "total": res["total"]}
+
+    @staticmethod
+    def _row(row) -> Dict[str, Any]:
+        return {
+            "id": row.id,
+            "name": row.name,
+            "longitude": row.longitude,
+            "latitude": row.latitude,
+            "distance": row.distance,
+        }
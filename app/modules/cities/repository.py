@@ -1,3 +1,4 @@
+import json
 from typing import Any, List, Optional
 from sqlalchemy import text, select
 from sqlalchemy.orm import selectinload , joinedload
@@ -7,80 +8,68 @@ from fastapi_pagination import Params
 
 from app.modules.cities.models import City
 from app.modules.cities.schema import CityRead
-from app.utils.embeddings import get_embedding
 
 class CityRepository(BaseRepository[City, CityRead]):
     def __init__(self, db: AsyncSession):
         super().__init__(model=City, db=db)
 
 
-    async def vector_search(self, query: str, limit: int = 10, load_relations: Optional[List[str]] = None, extra_conditions: Optional[List[Any]] = None) -> List[City]:
-        embedding = get_embedding(query)
-        stmt = select(City).where(City.embedding != None)
-        if load_relations:
-            for relation in load_relations:
-                if '.' in relation:
-                    parts = relation.split('.')
-                    current_model = City
-                    option = None
-                    for part in parts:
-                        attr = getattr(current_model, part)
-                        current_model = attr.property.mapper.class_
-                        option = joinedload(attr) if option is None else option.joinedload(attr)
-                    stmt = stmt.options(option)
-                else:
-                    stmt = stmt.options(selectinload(getattr(City, relation)))
-
-        if extra_conditions:
-            for condition in extra_conditions:
-                stmt = stmt.filter(condition)
-                
-        stmt = stmt.order_by(City.embedding.cosine_distance(embedding)).limit(limit)
-        result = await self.db.execute(stmt)
-        return result.unique().scalars().all()
-    
-    async def get_nearest(self, lat: float, lng: float, params: Params, search: str = None):
+    async def get_nearest(
+        self,
+        lat: float,
+        lng: float,
+        params: Params,
+        search: str = None,
+        exclude_id: Optional[int] = None,
+        count: Optional[str] = "exact",
+    ):
+        """
+        Cities nearest to (lat, lng) with their distance in meters, in a single query.
+        Rows are ordered by the `<->` KNN operator so the GiST index on `location` returns them nearest first.
+        Args:
+            exclude_id: City left out of the results, usually the one the point belongs to.
+            count: "exact" counts matching rows with a window function (this visits every match),
+                "estimated" uses the planner's row estimate and None skips the total.
+        """
         limit = params.size
         offset = (params.page - 1) * limit
 
-        base_query = """
+        conditions = ["location IS NOT NULL"]
+        params_dict = {"lng": lng, "lat": lat}
+        if exclude_id is not None:
+            conditions.append("id <> :exclude_id")
+            params_dict["exclude_id"] = exclude_id
+        if search:
+            conditions.append("name ILIKE :search")
+            params_dict["search"] = f"%{search}%"
+        where_clause = " AND ".join(conditions)
+
+        query = text(f"""
             SELECT id, name, longitude, latitude,
                 ST_Distance(location, ST_SetSRID(ST_MakePoint(:lng, :lat), 4326)::geography) AS distance
+                {", COUNT(*) OVER () AS total" if count == "exact" else ""}
             FROM cities
-            WHERE location IS NOT NULL
-                AND NOT (longitude = :lng AND latitude = :lat)
-                {search_clause}
-            ORDER BY distance
+            WHERE {where_clause}
+            ORDER BY location <-> ST_SetSRID(ST_MakePoint(:lng, :lat), 4326)::geography, id
             LIMIT :limit OFFSET :offset
-        """
-
-        count_query = """
-            SELECT COUNT(*)
-            FROM cities
-            WHERE location IS NOT NULL
-                AND NOT (longitude = :lng AND latitude = :lat)
-                {search_clause}
-        """
-
-        params_dict = {
-            "lng": lng,
-            "lat": lat,
-            "limit": limit,
-            "offset": offset,
-        }
-
-        if search:
-            search_clause = "AND name ILIKE :search"
-            params_dict["search"] = f"%{search}%"
-        else:
-            search_clause = ""
-
-        query = text(base_query.format(search_clause=search_clause))
-        result = await self.db.execute(query, params_dict)
+        """)
+        result = await self.db.execute(query, {**params_dict, "limit": limit, "offset": offset})
         rows = result.fetchall()
 
-        count_sql = text(count_query.format(search_clause=search_clause))
-        count_result = await self.db.execute(count_sql, params_dict if search else {"lng": lng, "lat": lat})
-        total = count_result.scalar_one()
-
+        if count == "exact":
+            total = rows[0].total if rows else 0
+        elif count == "estimated":
+            total = await self._estimate_count(where_clause, params_dict)
+        else:
+            total = None
         return {"items": rows, "total": total}
+
+    async def _estimate_count(self, where_clause: str, params_dict: dict) -> int:
+        """Row estimate from the query planner, cheap but only as good as the table statistics"""
+        result = await self.db.execute(
+            text(f"EXPLAIN (FORMAT JSON) SELECT 1 FROM cities WHERE {where_clause}"), params_dict
+        )
+        plan = result.scalar_one()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
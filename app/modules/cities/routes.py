@@ -46,7 +46,9 @@ async def index_city(
 
 @router.get("/nearest")
 async def get_nearest_cities(
-    city_id: int,
+    city_id: Optional[int] = Query(None, description="City to search around, the city itself is left out"),
+    lat: Optional[float] = Query(None, ge=-90, le=90),
+    lng: Optional[float] = Query(None, ge=-180, le=180),
     params: Params = Depends(),
     search: Optional[str] = Query(None, description="Search query for city name"),
     db: AsyncSession = Depends(get_db),
@@ -54,7 +56,7 @@ async def get_nearest_cities(
 ):
     controller = CityController(db, graph_db)
     try:
-        return await controller.nearest(city_id, params=params, search=search)
+        return await controller.nearest(params, city_id=city_id, lat=lat, lng=lng, search=search)
     except HTTPException as e:
         raise e
     except Exception as e:
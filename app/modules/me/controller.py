@@ -3,6 +3,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.schemas import BaseResponse
 from app.modules.me.schema import MeRead, MeUpdate, MeUpdateInternal
+from app.modules.plans.read_cache import PlanReadCache
 from app.modules.users.repository import UserRepository
 
 
@@ -35,6 +36,8 @@ class MeController():
             raise HTTPException(status_code=404, detail="User not found")
         if profile_info.prefer_activities:
             await self.user_repository.update_prefer_activities(self.user_id, profile_info.prefer_activities)
+        # Cached plans embed the owner's username and image
+        await PlanReadCache(self.db).invalidate_user(self.user_id)
 
         user = await self.user_repository.get(
             self.user_id,
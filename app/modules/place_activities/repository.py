@@ -14,4 +14,4 @@ class PlaceActivityRepository(BaseRepository[PlaceActivity, PlaceActivityBase]):
 
     async def clear_place_activities(self, place_id: int):
         await self.db.execute(delete(PlaceActivity).where(PlaceActivity.place_id == place_id))
-        await self.db.commit()
+        await self._commit()
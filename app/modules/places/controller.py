@@ -1,13 +1,15 @@
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 from app.modules.place_activities.repository import PlaceActivityRepository
 from fastapi import HTTPException
+from app.core.celery_tasks import reembed_content
+from app.database.unit_of_work import run_after_commit
 from fastapi_pagination import Params
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.schemas import BaseResponse
 from app.modules.place_activities.schema import PlaceActivityBase
 from app.modules.places.repository import PlaceRepository
-from app.modules.places.schema import PlaceCreate, PlaceBase, PlaceRead
+from app.modules.places.schema import PlaceCreate, PlaceBase, PlaceRead, PlaceNearby, PlaceSearchFilters, PlaceSearchResult, PlaceCategoryEnum
 
 class PlaceController():
     def __init__(self, db: AsyncSession):
@@ -27,7 +29,9 @@ class PlaceController():
                     print(e)
                     raise HTTPException(status_code=404, detail="Activity not found")
 
-        place_info = await self.repository.get(place_db.id, load_relations=["images", "place_activities.activity.image", "city"])
+        place_id = place_db.id
+        run_after_commit(self.db, lambda: reembed_content.delay(place_ids=[place_id]))
+        place_info = await self.repository.get(place_id, load_relations=["images", "place_activities.activity.image", "city"])
         return BaseResponse(message="Place created successfully", data=PlaceRead.model_validate(place_info))
     
     async def get(self, place_id: int):
@@ -37,14 +41,19 @@ class PlaceController():
         return BaseResponse(message="Place fetched successfully", data=PlaceRead.model_validate(place))
     
     async def delete(self, place_id: int):
+        place = await self.repository.get(place_id)
         delete = await self.repository.delete(place_id)
         if not delete:
             raise HTTPException(status_code=404, detail="Place not found")
+        city_id = place.city_id
+        run_after_commit(self.db, lambda: reembed_content.delay(city_ids=[city_id]))
         return BaseResponse(message="Place deleted successfully")
     
 
     async def update(self, place_id: int, place:PlaceCreate):
         place_internal = PlaceBase(**place.model_dump(exclude={"activities", "image_ids"}))
+        previous = await self.repository.get(place_id)
+        previous_city_id = previous.city_id if previous else None
         place_db = await self.repository.update(place_id, place_internal)
         if not place_db:
             raise HTTPException(status_code=404, detail="Place not found")
@@ -53,6 +62,8 @@ class PlaceController():
         for activity in place.activities:
             place_activity = PlaceActivityBase(place_id=place_id, **activity.model_dump())
             place_activity = await self.place_activity_repository.create(place_activity)
+        # The task refreshes the place's current city, the city it may have moved away from has to be named
+        run_after_commit(self.db, lambda: reembed_content.delay(place_ids=[place_id], city_ids=[previous_city_id]))
         place = await self.repository.get(place_id, load_relations=["images", "place_activities.activity.image", "city"])
         return BaseResponse(message="Place updated successfully", data=PlaceRead.model_validate(place))
     
@@ -74,3 +85,51 @@ class PlaceController():
             load_relations=["images", "place_activities.activity.image", "city"]
         )
         return BaseResponse(message="Transport services fetched successfully", data=[PlaceRead.model_validate(ts) for ts in data.items], page=data.page, size=data.size, total=data.total)
+
+    async def search(self, params: Params, filters: PlaceSearchFilters):
+        if not filters.q and (filters.lat is None or filters.lng is None):
+            raise HTTPException(status_code=400, detail="Provide a search query, a location (lat and lng) or both")
+        if filters.radius_km and (filters.lat is None or filters.lng is None):
+            raise HTTPException(status_code=400, detail="radius_km requires lat and lng")
+
+        results, total = await self.repository.hybrid_search(
+            query=filters.q,
+            lat=filters.lat,
+            lng=filters.lng,
+            radius_km=filters.radius_km,
+            city_id=filters.city_id,
+            categories=filters.categories,
+            weights={"lexical": filters.w_lexical, "semantic": filters.w_semantic, "geographic": filters.w_geographic},
+            limit=params.size,
+            offset=(params.page - 1) * params.size,
+        )
+        data = [
+            PlaceSearchResult(**PlaceRead.model_validate(place).model_dump(), score=score, distance=distance)
+            for place, score, distance in results
+        ]
+        return BaseResponse(message="Places fetched successfully", data=data, page=params.page, size=params.size, total=total)
+
+    async def nearby(
+        self,
+        params: Params,
+        lat: float,
+        lng: float,
+        radius_km: Optional[float] = None,
+        categories: Optional[List[PlaceCategoryEnum]] = None,
+        activity_ids: Optional[List[int]] = None,
+    ):
+        results = await self.repository.get_nearby(
+            lat=lat,
+            lng=lng,
+            radius_km=radius_km,
+            categories=categories,
+            activity_ids=activity_ids,
+            limit=params.size,
+            offset=(params.page - 1) * params.size,
+            load_relations=["images", "place_activities.activity.image", "city"],
+        )
+        data = [
+            PlaceNearby(**PlaceRead.model_validate(place).model_dump(), distance=distance)
+            for place, distance in results
+        ]
+        return BaseResponse(message="Nearby places fetched successfully", data=data, page=params.page, size=params.size)
@@ -1,5 +1,8 @@
-from sqlalchemy import Column, Enum, Integer, String, ForeignKey, Float, Table
+from sqlalchemy import Column, Index, Enum, Integer, String, ForeignKey, Float, Table, event
 from app.database.types import EnumList
+from geoalchemy2 import Geography
+from geoalchemy2.shape import from_shape
+from shapely.geometry import Point
 from pgvector.sqlalchemy import Vector
 from sqlalchemy.orm import relationship
 from app.database.database import Base
@@ -14,6 +17,14 @@ place_images = Table(
 
 class Place(Base):
     __tablename__ = "places"
+    __table_args__ = (
+        Index("ix_places_name_trgm", "name", postgresql_using="gist", postgresql_ops={"name": "gist_trgm_ops"}),
+        Index("ix_places_location", "location", postgresql_using="gist"),
+        Index(
+            "ix_places_embedding_hnsw", "embedding",
+            postgresql_using="hnsw", postgresql_with={"m": 16, "ef_construction": 64}, postgresql_ops={"embedding": "vector_cosine_ops"},
+        ),
+    )
 
     id = Column(Integer, primary_key=True)
     name = Column(String, index=True)
@@ -21,11 +32,24 @@ class Place(Base):
     latitude = Column(Float, nullable=False)
     longitude = Column(Float, nullable=False)
     description = Column(String, nullable=True)
-    city_id = Column(Integer, ForeignKey("cities.id"), nullable=False)
+    city_id = Column(Integer, ForeignKey("cities.id"), nullable=False, index=True)
     average_visit_duration = Column(Float, nullable=True)
     average_visit_cost = Column(Float, nullable=True)
     embedding = Column(Vector(384), nullable=True)
+    embedding_hash = Column(String(64), nullable=True)
+    location = Column(Geography(geometry_type="POINT", srid=4326, spatial_index=False), nullable=True)
 
     place_activities = relationship("PlaceActivity", back_populates="place", cascade="all, delete-orphan", uselist=True)
     images = relationship("Image", secondary=place_images, uselist=True)
-    city = relationship("City", foreign_keys=[city_id])
\ No newline at end of file
+    city = relationship("City", foreign_keys=[city_id])
+
+
+@event.listens_for(Place, "before_insert")
+def set_location_before_insert(mapper, connection, target):
+    if target.latitude is not None and target.longitude is not None:
+        target.location = from_shape(Point(target.longitude, target.latitude), srid=4326)
+
+@event.listens_for(Place, "before_update")
+def set_location_before_update(mapper, connection, target):
+    if target.latitude is not None and target.longitude is not None:
+        target.location = from_shape(Point(target.longitude, target.latitude), srid=4326)
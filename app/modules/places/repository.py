@@ -1,15 +1,102 @@
-from typing import Any, List, Optional
-from sqlalchemy import insert, delete, select
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import cast, exists, func, insert, delete, or_, select, text
+from geoalchemy2 import Geography
 from sqlalchemy.orm import selectinload , joinedload
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
-from app.core.repository import BaseRepository
+from app.core.repository import VECTOR_CANDIDATE_FACTOR, VECTOR_EXACT_MAX_ROWS, VECTOR_MAX_EF_SEARCH, BaseRepository
 from app.modules.place_activities.models import PlaceActivity
 from app.modules.place_activities.schema import PlaceActivityCreate
 from app.modules.places.models import Place, place_images
-from app.modules.places.schema import PlaceBase
-from app.utils.embeddings import get_embedding
+from app.modules.places.schema import PlaceBase, PlaceCategoryEnum
+from app.utils.embeddings import embedding_service
+
+# Reciprocal rank fusion constant, a rank r in a ranking adds weight / (HYBRID_RRF_K + r) to the score
+HYBRID_RRF_K = 60
+# Each ranking fetches at least this many candidates from its index, and never more than hnsw.ef_search allows
+HYBRID_MIN_CANDIDATES = 100
+HYBRID_MAX_CANDIDATES = 1000
+
+HYBRID_SEARCH_QUERY = """
+WITH
+{rankings}
+fused AS (
+    SELECT id, SUM(weight / (CAST(:rrf_k AS float) + rank)) AS score
+    FROM ({ranking_union}) ranked
+    GROUP BY id
+)
+SELECT f.id, f.score, {distance} AS distance, COUNT(*) OVER () AS total
+FROM fused f
+JOIN places p ON p.id = f.id
+ORDER BY f.score DESC, f.id
+LIMIT :limit OFFSET :offset
+"""
+
+# Every ranking orders by an indexed operator so the candidates come straight from an index scan
+HYBRID_RANKINGS = {
+    # GiST trigram index
+    "lexical": """
+    SELECT id, CAST(:w_lexical AS float) AS weight, ROW_NUMBER() OVER (ORDER BY name_distance, id) AS rank
+    FROM (
+        SELECT p.id, p.name <-> :query AS name_distance
+        FROM places p
+        WHERE p.name IS NOT NULL {filters}
+        ORDER BY p.name <-> :query
+        LIMIT :candidates
+    ) c
+    WHERE name_distance < 1
+""",
+    # HNSW index, filters apply to the candidates it returns, over-fetched when there are filters
+    "semantic": """
+    SELECT id, CAST(:w_semantic AS float) AS weight, ROW_NUMBER() OVER (ORDER BY embedding_distance, id) AS rank
+    FROM (
+        SELECT p.id, c.embedding_distance
+        FROM (
+            SELECT id, embedding <=> CAST(:embedding AS vector) AS embedding_distance
+            FROM places
+            WHERE embedding IS NOT NULL
+            ORDER BY embedding <=> CAST(:embedding AS vector)
+            LIMIT :semantic_candidates
+        ) c
+        JOIN places p ON p.id = c.id
+        WHERE TRUE {filters}
+        ORDER BY c.embedding_distance, p.id
+        LIMIT :candidates
+    ) r
+""",
+    # Exact scan of the rows matching selective filters, `+ 0` keeps the planner off the HNSW index
+    "semantic_exact": """
+    SELECT id, CAST(:w_semantic AS float) AS weight, ROW_NUMBER() OVER (ORDER BY embedding_distance, id) AS rank
+    FROM (
+        SELECT p.id, p.embedding <=> CAST(:embedding AS vector) AS embedding_distance
+        FROM places p
+        WHERE p.embedding IS NOT NULL {filters}
+        ORDER BY (p.embedding <=> CAST(:embedding AS vector)) + 0
+        LIMIT :candidates
+    ) c
+""",
+    # GiST index on places.location, KNN ordering
+    "geographic": """
+    SELECT id, CAST(:w_geographic AS float) AS weight, ROW_NUMBER() OVER (ORDER BY point_distance, id) AS rank
+    FROM (
+        SELECT p.id, p.location <-> {search_point} AS point_distance
+        FROM places p
+        WHERE p.location IS NOT NULL {filters}
+        ORDER BY p.location <-> {search_point}
+        LIMIT :candidates
+    ) c
+""",
+}
+
+SEARCH_POINT = "geography(ST_SetSRID(ST_MakePoint(:lng, :lat), 4326))"
+
+# Counts the rows matching the filters, up to VECTOR_EXACT_MAX_ROWS + 1
+FILTERED_ROWS_PROBE = """
+SELECT COUNT(*) FROM (
+    SELECT 1 FROM places p WHERE p.embedding IS NOT NULL {filters} LIMIT :probe_limit
+) c
+"""
 
 
 class PlaceRepository(BaseRepository[Place, PlaceBase]):
@@ -24,7 +111,7 @@ class PlaceRepository(BaseRepository[Place, PlaceBase]):
         stmt = insert(place_images).values(values)
         try:
             await self.db.execute(stmt)
-            await self.db.commit()
+            await self._commit()
         except IntegrityError:
             await self.db.rollback()
             raise
@@ -38,18 +125,145 @@ class PlaceRepository(BaseRepository[Place, PlaceBase]):
             values = [{"place_id": place_id, "image_id": image_id} for image_id in image_ids]
             await self.db.execute(insert(place_images).values(values))
 
-        await self.db.commit()
+        await self._commit()
 
     async def delete_activities(self, place_id: int):
         delete_stmt = delete(PlaceActivity).where(PlaceActivity.place_id == place_id)
         await self.db.execute(delete_stmt)
-        await self.db.commit()
+        await self._commit()
 
     
 
-    async def vector_search(self, query: str, limit: int = 10, load_relations: Optional[List[str]] = None, extra_conditions: Optional[List[Any]] = None) -> List[Place]:
-        embedding = get_embedding(query)
-        stmt = select(Place).where(Place.embedding != None)
+    async def vector_search(
+        self,
+        query: str,
+        limit: int = 10,
+        load_relations: Optional[List[str]] = None,
+        extra_conditions: Optional[List[Any]] = None,
+        ef_search: Optional[int] = None,
+        exact: bool = False,
+        city_id: Optional[int] = None,
+        categories: Optional[List[PlaceCategoryEnum]] = None,
+    ) -> List[Place]:
+        """Semantic place search, optionally limited to a city and to places having any of `categories`"""
+        conditions = list(extra_conditions or [])
+        if city_id is not None:
+            conditions.append(Place.city_id == city_id)
+        if categories:
+            conditions.append(or_(*[Place.categories.contains([category]) for category in categories]))
+        return await super().vector_search(query, limit, load_relations, conditions, ef_search, exact)
+
+    async def hybrid_search(
+        self,
+        query: Optional[str] = None,
+        lat: Optional[float] = None,
+        lng: Optional[float] = None,
+        radius_km: Optional[float] = None,
+        city_id: Optional[int] = None,
+        categories: Optional[List[PlaceCategoryEnum]] = None,
+        weights: Optional[Dict[str, float]] = None,
+        limit: int = 20,
+        offset: int = 0,
+        embedding: Optional[List[float]] = None,
+    ) -> Tuple[List[Tuple[Place, float, Optional[float]]], int]:
+        """
+        Places ranked by trigram name similarity, embedding similarity and distance from (lat, lng), fused
+        with weighted reciprocal rank fusion in a single query. Each ranking takes its nearest candidates
+        from its own index, filters (city, categories, radius) apply to all of them. As in
+        `nearest_by_embedding`, selective filters are applied before an exact embedding scan, otherwise
+        the HNSW candidates are over-fetched and filtered afterwards.
+        Returns ([(place, score, distance in meters)], number of fused candidates).
+        """
+        has_point = lat is not None and lng is not None
+        weights = {"lexical": 1.0, "semantic": 1.0, "geographic": 1.0, **(weights or {})}
+        candidates = min(max(HYBRID_MIN_CANDIDATES, offset + limit), HYBRID_MAX_CANDIDATES)
+        params: Dict[str, Any] = {"rrf_k": HYBRID_RRF_K, "candidates": candidates, "limit": limit, "offset": offset}
+
+        filters = []
+        if city_id is not None:
+            filters.append("AND p.city_id = :city_id")
+            params["city_id"] = city_id
+        if categories:
+            filters.append("AND p.categories ?| CAST(:categories AS text[])")
+            params["categories"] = [PlaceCategoryEnum(c).value for c in categories]
+        if has_point:
+            params.update(lat=lat, lng=lng)
+            if radius_km:
+                filters.append(f"AND ST_DWithin(p.location, {SEARCH_POINT}, :radius)")
+                params["radius"] = radius_km * 1000
+
+        rankings = []
+        if query:
+            params.update(query=query, w_lexical=weights["lexical"], w_semantic=weights["semantic"])
+            if embedding is None:
+                embedding = await embedding_service.embed(query)
+            params["embedding"] = str(list(embedding))
+
+            exact = False
+            if filters:
+                matching = await self.db.scalar(
+                    text(FILTERED_ROWS_PROBE.format(filters=" ".join(filters))),
+                    {**params, "probe_limit": VECTOR_EXACT_MAX_ROWS + 1},
+                )
+                exact = matching <= VECTOR_EXACT_MAX_ROWS
+            if exact:
+                rankings += ["lexical", "semantic_exact"]
+            else:
+                semantic_candidates = min(candidates * VECTOR_CANDIDATE_FACTOR if filters else candidates, VECTOR_MAX_EF_SEARCH)
+                params["semantic_candidates"] = semantic_candidates
+                rankings += ["lexical", "semantic"]
+                await self.db.execute(select(func.set_config("hnsw.ef_search", str(semantic_candidates), True)))
+        if has_point:
+            params["w_geographic"] = weights["geographic"]
+            rankings.append("geographic")
+        if not rankings:
+            return [], 0
+
+        sql = HYBRID_SEARCH_QUERY.format(
+            rankings="".join(
+                f"{name} AS ({HYBRID_RANKINGS[name].format(filters=' '.join(filters), search_point=SEARCH_POINT)}),\n"
+                for name in rankings
+            ),
+            ranking_union=" UNION ALL ".join(f"SELECT * FROM {name}" for name in rankings),
+            distance=f"ST_Distance(p.location, {SEARCH_POINT})" if has_point else "NULL",
+        )
+        rows = (await self.db.execute(text(sql), params)).all()
+        if not rows:
+            return [], 0
+
+        places = {place.id: place for place in await self.get_multiple(
+            [row.id for row in rows], load_relations=["images", "place_activities.activity.image", "city"]
+        )}
+        results = [(places[row.id], row.score, row.distance) for row in rows if row.id in places]
+        return results, rows[0].total
+
+    async def get_nearby(
+        self,
+        lat: float,
+        lng: float,
+        radius_km: Optional[float] = None,
+        categories: Optional[List[PlaceCategoryEnum]] = None,
+        activity_ids: Optional[List[int]] = None,
+        limit: int = 20,
+        offset: int = 0,
+        load_relations: Optional[List[str]] = None,
+    ) -> List[Tuple[Place, float]]:
+        """
+        Places closest to (lat, lng) with their distance in meters, nearest first.
+        Ordered with the KNN operator so the GiST index on `location` yields rows in distance order.
+        """
+        point = cast(func.ST_SetSRID(func.ST_MakePoint(lng, lat), 4326), Geography(geometry_type="POINT", srid=4326))
+        distance = func.ST_Distance(Place.location, point)
+        query = select(Place, distance.label("distance")).filter(Place.location.isnot(None))
+        if radius_km:
+            query = query.filter(func.ST_DWithin(Place.location, point, radius_km * 1000))
+        if categories:
+            query = query.filter(or_(*[Place.categories.contains([category]) for category in categories]))
+        if activity_ids:
+            query = query.filter(exists().where(
+                PlaceActivity.place_id == Place.id,
+                PlaceActivity.activity_id.in_(activity_ids),
+            ))
         if load_relations:
             for relation in load_relations:
                 if '.' in relation:
@@ -60,14 +274,10 @@ class PlaceRepository(BaseRepository[Place, PlaceBase]):
                         attr = getattr(current_model, part)
                         current_model = attr.property.mapper.class_
                         option = joinedload(attr) if option is None else option.joinedload(attr)
-                    stmt = stmt.options(option)
+                    query = query.options(option)
                 else:
-                    stmt = stmt.options(selectinload(getattr(Place, relation)))
-
-        if extra_conditions:
-            for condition in extra_conditions:
-                stmt = stmt.filter(condition)
+                    query = query.options(selectinload(getattr(Place, relation)))
 
-        stmt = stmt.order_by(Place.embedding.cosine_distance(embedding)).limit(limit)
-        result = await self.db.execute(stmt)
-        return result.unique().scalars().all()
\ No newline at end of file
+        query = query.order_by(Place.location.op("<->")(point), Place.id).limit(limit).offset(offset)
+        result = await self.db.execute(query)
+        return [(place, place_distance) for place, place_distance in result.unique().all()]
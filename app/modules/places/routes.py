@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, Query
 from app.database.graph_database import get_graph_db
 from fastapi_pagination import Params
@@ -8,7 +8,7 @@ from app.database.database import get_db
 from sqlalchemy.ext.asyncio import AsyncSession
 from neo4j import AsyncSession as Neo4jSession
 from app.modules.places.controller import PlaceController
-from app.modules.places.schema import PlaceCreate, PlaceFilters
+from app.modules.places.schema import PlaceCategoryEnum, PlaceCreate, PlaceFilters, PlaceSearchFilters
 
 router = APIRouter()
 
@@ -52,6 +52,52 @@ async def index_places(
         print(traceback.format_exc())
         raise HTTPException(status_code=500, detail=str(e))
     
+@router.get("/search")
+async def search_places(
+    q: Optional[str] = Query(None, description="Text matched against place names and descriptions"),
+    lat: Optional[float] = Query(None, ge=-90, le=90),
+    lng: Optional[float] = Query(None, ge=-180, le=180),
+    radius_km: Optional[float] = Query(None, gt=0, description="Only places within this distance of (lat, lng)"),
+    city_id: Optional[int] = Query(None),
+    categories: Optional[List[PlaceCategoryEnum]] = Query(None, description="Places having any of these categories"),
+    w_lexical: float = Query(1.0, ge=0, description="Weight of the name similarity ranking"),
+    w_semantic: float = Query(1.0, ge=0, description="Weight of the embedding similarity ranking"),
+    w_geographic: float = Query(1.0, ge=0, description="Weight of the distance ranking"),
+    params: Params = Depends(),
+    db: AsyncSession = Depends(get_db),
+):
+    try:
+        controller = PlaceController(db)
+        filters = PlaceSearchFilters(
+            q=q, lat=lat, lng=lng, radius_km=radius_km, city_id=city_id, categories=categories,
+            w_lexical=w_lexical, w_semantic=w_semantic, w_geographic=w_geographic,
+        )
+        return await controller.search(params, filters)
+    except HTTPException as e:
+        raise e
+    except Exception as e:        
+        print(traceback.format_exc())
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/nearby")
+async def nearby_places(
+    lat: float = Query(..., ge=-90, le=90),
+    lng: float = Query(..., ge=-180, le=180),
+    radius_km: Optional[float] = Query(None, gt=0, description="Only places within this distance"),
+    categories: Optional[List[PlaceCategoryEnum]] = Query(None, description="Places having any of these categories"),
+    activity_ids: Optional[List[int]] = Query(None, description="Places offering any of these activities"),
+    params: Params = Depends(),
+    db: AsyncSession = Depends(get_db),
+):
+    try:
+        controller = PlaceController(db)
+        return await controller.nearby(params, lat, lng, radius_km, categories, activity_ids)
+    except HTTPException as e:
+        raise e
+    except Exception as e:        
+        print(traceback.format_exc())
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.get("/{place_id}")
 async def get_place(
     place_id: int, 
@@ -62,4 +62,22 @@ class PlaceRead(BaseModel):
         from_attributes = True
 
 class PlaceFilters(BaseModel):
-    city_id: Optional[int] = None
\ No newline at end of file
+    city_id: Optional[int] = None
+
+class PlaceSearchFilters(BaseModel):
+    q: Optional[str] = None
+    lat: Optional[float] = None
+    lng: Optional[float] = None
+    radius_km: Optional[float] = None
+    city_id: Optional[int] = None
+    categories: Optional[List[PlaceCategoryEnum]] = None
+    w_lexical: float = 1.0
+    w_semantic: float = 1.0
+    w_geographic: float = 1.0
+
+class PlaceSearchResult(PlaceRead):
+    score: float
+    distance: Optional[float] = None
+
+class PlaceNearby(PlaceRead):
+    distance: float
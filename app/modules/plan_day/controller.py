@@ -1,7 +1,6 @@
 from typing import Dict
 from fastapi import HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
-from neo4j import AsyncSession as Neo4jSession
 from app.modules.accommodation_services.repository import AccomodationServiceRepository
 from app.modules.accommodation_services.schema import AccomodationServiceRead
 from app.modules.plan_day_steps.schema import PlanDayStepCategoryEnum
@@ -13,13 +12,13 @@ from app.modules.plan_day_steps.service import PlanDayStepService
 from app.modules.plans.repository import PlanRepository
 
 class PlanDayController:
-    def __init__(self, db: AsyncSession, graph_db: Neo4jSession, user_id: int):
+    def __init__(self, db: AsyncSession, user_id: int):
         self.db = db
         self.user_id = user_id
         self.repository = PlanDayRepository(db)
         self.accommodation_repository = AccomodationServiceRepository(db)
         self.plan_repository = PlanRepository(db)
-        self.plan_day_step_service = PlanDayStepService(db, graph_db)
+        self.plan_day_step_service = PlanDayStepService(db)
 
     async def update(self, plan_day_id: int, plan_day: PlanDayUpdate):
         plan_day_db = await self.repository.get(plan_day_id, load_relations=["plan"])
@@ -1,13 +1,14 @@
 from sqlalchemy import Column, Integer, String, ForeignKey
 from sqlalchemy.orm import relationship
 from app.database.database import Base
+from app.utils.linked_list import ordered_chain
 
 class PlanDay(Base):
     __tablename__ = "plan_days"
 
     id = Column(Integer, primary_key=True, index=True)
-    plan_id = Column(Integer, ForeignKey("plans.id", ondelete="CASCADE"), nullable=False)
-    next_plan_day_id = Column(Integer, ForeignKey("plan_days.id"), nullable=True)
+    plan_id = Column(Integer, ForeignKey("plans.id", ondelete="CASCADE"), nullable=False, index=True)
+    next_plan_day_id = Column(Integer, ForeignKey("plan_days.id"), nullable=True, index=True)
     title = Column(String, nullable=False)
     
     next_plan_day = relationship("PlanDay", remote_side=[id], foreign_keys=[next_plan_day_id], uselist=False)
@@ -16,17 +17,4 @@ class PlanDay(Base):
 
     @property
     def steps(self):
-        step_map = {step.id: step for step in self.unordered_steps}
-        next_ids = {step.next_plan_day_step_id for step in self.unordered_steps if step.next_plan_day_step_id}
-        head = next((step for step in self.unordered_steps if step.id not in next_ids), None)
-
-        ordered_steps = []
-        current = head
-        idx = 0
-        while current:
-            current.index = idx
-            ordered_steps.append(current)
-            current = step_map.get(current.next_plan_day_step_id)
-            idx += 1
-
-        return ordered_steps
\ No newline at end of file
+        return ordered_chain(self, "unordered_steps", "next_plan_day_step_id")
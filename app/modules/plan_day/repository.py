@@ -39,7 +39,7 @@ class PlanDayRepository(BaseRepository[PlanDay, PlanDayCreate]):
             await self.db.execute(update(PlanDay).where(PlanDay.id == prev.id).values(next_plan_day_id=new_day.id))
 
 
-        await self.db.commit()
+        await self._commit()
         await self.db.refresh(new_day)
         return new_day
     
@@ -51,6 +51,6 @@ class PlanDayRepository(BaseRepository[PlanDay, PlanDayCreate]):
         await self.db.execute(update(PlanDay).where(PlanDay.next_plan_day_id == plan_day.id).values(next_plan_day_id=plan_day.next_plan_day_id))
             
         await self.db.delete(plan_day)
-        await self.db.commit()
+        await self._commit()
         return True
 
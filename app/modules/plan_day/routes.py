@@ -4,8 +4,6 @@ import traceback
 from app.database.database import get_db
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.database.graph_database import get_graph_db
-from neo4j import AsyncSession as Neo4jSession
 from app.modules.plan_day.controller import PlanDayController
 from app.modules.plan_day.schema import PlanDayCreate, PlanDayUpdate
 router = APIRouter()
@@ -15,12 +13,11 @@ router = APIRouter()
 async def add_plan_day(
     request: Request, 
     plan_day: PlanDayCreate,
-    db: AsyncSession = Depends(get_db),
-    graph_db: Neo4jSession = Depends(get_graph_db)
+    db: AsyncSession = Depends(get_db)
 ):
     try:
         user_id = request.state.user_id
-        controller = PlanDayController(db, graph_db, user_id)
+        controller = PlanDayController(db, user_id)
         return await controller.add_day(plan_day)
     except HTTPException as e:
         raise e
@@ -33,12 +30,11 @@ async def update_plan_day(
     request: Request, 
     plan_day_id: int,
     plan_day: PlanDayUpdate,
-    db: AsyncSession = Depends(get_db),
-    graph_db: Neo4jSession = Depends(get_graph_db)
+    db: AsyncSession = Depends(get_db)
 ):
     try:
         user_id = request.state.user_id
-        controller = PlanDayController(db, graph_db, user_id)
+        controller = PlanDayController(db, user_id)
         return await controller.update(plan_day_id, plan_day)
     except HTTPException as e:
         raise e
@@ -51,12 +47,11 @@ async def partial_update_plan_day(
     request: Request, 
     plan_day_id: int,
     data: Dict,
-    db: AsyncSession = Depends(get_db),
-    graph_db: Neo4jSession = Depends(get_graph_db)
+    db: AsyncSession = Depends(get_db)
 ):
     try:
         user_id = request.state.user_id
-        controller = PlanDayController(db, graph_db, user_id)
+        controller = PlanDayController(db, user_id)
         return await controller.partial_update(plan_day_id, data)
     except HTTPException as e:
         raise e
@@ -69,12 +64,11 @@ async def partial_update_plan_day(
 async def delete_plan_day(
     request: Request, 
     plan_day_id: int,
-    db: AsyncSession = Depends(get_db),
-    graph_db: Neo4jSession = Depends(get_graph_db)
+    db: AsyncSession = Depends(get_db)
 ):
     try:
         user_id = request.state.user_id
-        controller = PlanDayController(db, graph_db, user_id)
+        controller = PlanDayController(db, user_id)
         return await controller.delete_day(plan_day_id)
     except HTTPException as e:
         raise e
@@ -86,12 +80,11 @@ async def delete_plan_day(
 async def get_accommodation_services(
     request: Request,
     plan_day_id: int,
-    db: AsyncSession = Depends(get_db),
-    graph_db: Neo4jSession = Depends(get_graph_db)
+    db: AsyncSession = Depends(get_db)
 ):
     try:
         user_id = request.state.user_id
-        controller = PlanDayController(db, graph_db, user_id)
+        controller = PlanDayController(db, user_id)
         return await controller.recommand_accommodation_services(plan_day_id)
     except HTTPException as e:
         raise e
@@ -5,7 +5,6 @@ from app.modules.plan_day.repository import PlanDayRepository
 from app.modules.plan_day_steps.repository import PlanDayStepRepository
 from app.modules.transport_service.repository import TransportServiceRepository
 from app.modules.transport_service.schema import TransportServiceRead, TransportServiceReadAll
-from neo4j import AsyncSession as Neo4jSession
 
 from app.core.schemas import BaseResponse
 from app.modules.plan_day_steps.schema import PlanDayStepCategoryEnum, PlanDayStepCreate
@@ -15,14 +14,13 @@ from app.modules.plans.repository import PlanRepository
 
 
 class PlanDayStepController:
-    def __init__(self, db: AsyncSession, graph_db: Neo4jSession, user_id: int):
+    def __init__(self, db: AsyncSession, user_id: int):
         self.db = db
-        self.graph_db = graph_db
         self.user_id = user_id
         self.repository = PlanDayStepRepository(db)
         self.plan_repository = PlanRepository(db)
         self.plan_day_repository = PlanDayRepository(db)
-        self.service = PlanDayStepService(db, graph_db)
+        self.service = PlanDayStepService(db)
         self.transport_service_repository = TransportServiceRepository(db)
 
     async def add_plan_day_step(self, step: PlanDayStepCreate):
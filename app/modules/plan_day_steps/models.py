@@ -8,8 +8,8 @@ from app.modules.plan_route_hops.models import PlanRouteHop
 class PlanDayStep(Base):
     __tablename__ = "plan_day_steps"
     id = Column(Integer, primary_key=True, index=True)
-    next_plan_day_step_id = Column(Integer, ForeignKey("plan_day_steps.id", ondelete="CASCADE"), nullable=True)
-    plan_day_id = Column(Integer, ForeignKey("plan_days.id", ondelete="CASCADE"), nullable=False)
+    next_plan_day_step_id = Column(Integer, ForeignKey("plan_day_steps.id", ondelete="CASCADE"), nullable=True, index=True)
+    plan_day_id = Column(Integer, ForeignKey("plan_days.id", ondelete="CASCADE"), nullable=False, index=True)
     title = Column(String, nullable=False)
     category = Column(Enum(PlanDayStepCategoryEnum, name="plandaystepcategoryenum"), nullable=True)
     duration = Column(Float, nullable=False)
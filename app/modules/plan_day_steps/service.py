@@ -6,26 +6,27 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.modules.plan_day_steps.models import PlanDayStep
 from app.modules.plans.models import Plan
 from app.modules.plans.repository import PlanRepository
-from neo4j import AsyncSession as Neo4jSession
 
-from app.modules.cities.graph import CityGraphRepository
 from app.modules.cities.repository import CityRepository
 from app.modules.place_activities.repository import PlaceActivityRepository
 from app.modules.places.repository import PlaceRepository
 from app.modules.plan_day.repository import PlanDayRepository
 from app.modules.plan_day_steps.repository import PlanDayStepRepository
 from app.modules.plan_day_steps.schema import LatLongRead, PlanDayStepCategoryEnum, PlanDayStepCreate, PlanDayStepCreateInternal, PlanDayStepRouteRead
+from app.modules.plan_route_hops.models import PlanRouteHop
 from app.modules.plan_route_hops.repository import PlanRouteHopsRepository
 from app.modules.plan_route_hops.schema import PlanRouteHopCreate, PlanRouteHopRead
-from app.modules.plan_day_steps.utils import get_step_details, get_step_title
-from app.modules.transport_route.graph import TransportRouteEdge
+from app.modules.plan_day_steps.utils import activity_step_fields, get_step_fields, transport_step_fields, visit_step_fields
+from app.modules.transport_route.service import route_graph_store
+from app.modules.transport_service.schema import TransportServiceCategoryEnum
+from app.modules.transport_service.utils import get_image_from_transport_service_category
 from app.modules.transport_route.repository import TransportRouteRepository
+from app.database.unit_of_work import commit, unit_of_work
 
 
 class PlanDayStepService:
-    def __init__(self, db: AsyncSession, graph_db: Neo4jSession):
+    def __init__(self, db: AsyncSession):
         self.db = db
-        self.graph_db = graph_db
         self.repository = PlanDayStepRepository(db)
         self.place_repository = PlaceRepository(db)
         self.plan_day_repository = PlanDayRepository(db)
@@ -34,12 +35,10 @@ class PlanDayStepService:
         self.plan_repository = PlanRepository(db)
         self.transport_route_repository = TransportRouteRepository(db)
         self.place_activity_repository = PlaceActivityRepository(db)
-        if graph_db:
-            self.city_graph_repository = CityGraphRepository(graph_db)
 
     async def add(self, step: PlanDayStepCreate):
         step = await self._refactor_step(step)        
-        plan = await self.plan_repository.get(step.plan_id, load_relations=["start_city", "unordered_days.unordered_steps"])   
+        plan = await self.plan_repository.get_ordered(step.plan_id, load_relations=["start_city", "unordered_days.unordered_steps"])   
         day_ids = [s.id for s in plan.days]
         
         previous_steps = await self.repository.get_all(extra_conditions=[
@@ -141,8 +140,7 @@ class PlanDayStepService:
         created_steps = []
 
         for i, step_to_add in enumerate(steps_to_add):
-            step_details = await get_step_details(self.db, self.graph_db, current_prev_city_id, step_to_add)
-            step_title = await get_step_title(self.db, step_to_add, current_prev_city_id)
+            step_details = await get_step_fields(self.db, current_prev_city_id, step_to_add)
             
             next_step_for_this = None
             if i == len(steps_to_add) - 1:  
@@ -152,7 +150,7 @@ class PlanDayStepService:
             
             step_internal = PlanDayStepCreateInternal(
                 plan_day_id=step_to_add.plan_day_id,
-                title=step_title,
+                title=step_details["title"],
                 category=step_to_add.category,
                 duration=step_details["duration"],
                 cost=step_details["cost"],
@@ -180,7 +178,154 @@ class PlanDayStepService:
 
         return created_steps[0] if created_steps else None
 
+    async def add_many(self, plan_id: int, steps: List[PlanDayStepCreate]) -> List[PlanDayStep]:
+        """
+        Append an ordered list of steps to the end of a plan in a single transaction.
+        Places, activities, cities, images and routes are looked up in batches, transport steps are
+        inserted between cities the same way `add` does, and the chain is wired in memory.
+        """
+        if not steps:
+            return []
+
+        plan = await self.plan_repository.get_ordered(plan_id, load_relations=["unordered_days.unordered_steps"])
+        if not plan:
+            raise HTTPException(status_code=404, detail="Plan not found")
+        days = plan.days
+        if not days:
+            raise HTTPException(status_code=400, detail="Plan has no days")
+        day_position = {day.id: i for i, day in enumerate(days)}
+
+        # Current tail of the global chain
+        tail_step, tail_day_pos = None, 0
+        for i, day in enumerate(days):
+            if day.steps:
+                tail_step, tail_day_pos = day.steps[-1], i
+
+        places = {p.id: p for p in await self.place_repository.get_multiple(
+            list({s.place_id for s in steps if s.category == PlanDayStepCategoryEnum.visit and s.place_id}),
+            load_relations=["images"]
+        )}
+        place_activities = {a.id: a for a in await self.place_activity_repository.get_multiple(
+            list({s.place_activity_id for s in steps if s.category == PlanDayStepCategoryEnum.activity and s.place_activity_id}),
+            load_relations=["place", "activity.image"]
+        )}
+
+        # Resolve the city of every step and validate like _refactor_step does
+        resolved = []
+        for step in steps:
+            step = step.model_copy()
+            if step.category == PlanDayStepCategoryEnum.transport:
+                if not step.city_id:
+                    raise HTTPException(status_code=400, detail="Transport steps require city_id")
+                step.place_id, step.place_activity_id = None, None
+            elif step.category == PlanDayStepCategoryEnum.visit:
+                place = places.get(step.place_id)
+                if not place:
+                    raise HTTPException(status_code=400, detail="Visit steps require place_id")
+                step.place_activity_id = None
+                step.city_id = place.city_id
+            elif step.category == PlanDayStepCategoryEnum.activity:
+                activity = place_activities.get(step.place_activity_id)
+                if not activity:
+                    raise HTTPException(status_code=400, detail="Activity steps require place_activity_id")
+                step.place_id = activity.place_id
+                step.city_id = activity.place.city_id
+            else:
+                raise HTTPException(status_code=400, detail="Invalid step category")
+            resolved.append(step)
+
+        prev_city_id = tail_step.city_id if tail_step else plan.start_city_id
+        if prev_city_id is None:
+            plan.start_city_id = resolved[0].city_id
+            prev_city_id = plan.start_city_id
+
+        # Expand into the rows to insert, adding transport steps between cities
+        rows = []
+        for step in resolved:
+            pos = day_position.get(step.plan_day_id)
+            if pos is None or pos < tail_day_pos:
+                pos = len(days) - 1
+            tail_day_pos = pos
+            day_id = days[pos].id
+
+            if step.category == PlanDayStepCategoryEnum.transport:
+                if step.city_id != prev_city_id:
+                    rows.append((day_id, step, prev_city_id))
+            else:
+                if step.city_id != prev_city_id:
+                    rows.append((day_id, PlanDayStepCreate(
+                        plan_id=plan_id,
+                        plan_day_id=day_id,
+                        category=PlanDayStepCategoryEnum.transport,
+                        city_id=step.city_id
+                    ), prev_city_id))
+                rows.append((day_id, step, prev_city_id))
+            prev_city_id = step.city_id
+
+        if not rows:
+            return []
+
+        transport_rows = [(step, from_city_id) for _, step, from_city_id in rows if step.category == PlanDayStepCategoryEnum.transport]
+        cities, route_graph, transport_image = {}, None, None
+        if transport_rows:
+            city_ids = {c for step, from_city_id in transport_rows for c in (step.city_id, from_city_id)}
+            cities = {c.id: c for c in await self.city_repository.get_multiple(list(city_ids))}
+            route_graph = await route_graph_store.get_paths(self.db)
+            transport_image = await get_image_from_transport_service_category(self.db, TransportServiceCategoryEnum.bus)
+
+        created = []
+        hops = []
+        for day_id, step, from_city_id in rows:
+            if step.category == PlanDayStepCategoryEnum.visit:
+                fields = visit_step_fields(places[step.place_id])
+            elif step.category == PlanDayStepCategoryEnum.activity:
+                fields = activity_step_fields(place_activities[step.place_activity_id])
+            else:
+                path = route_graph.shortest_path(from_city_id, step.city_id, weight_property="distance")
+                if not path:
+                    raise HTTPException(status_code=404, detail="No route found")
+                start_city, end_city = cities.get(from_city_id), cities.get(step.city_id)
+                if not start_city or not end_city:
+                    raise HTTPException(status_code=400, detail="Start or end city not found")
+                fields = transport_step_fields(start_city, end_city, route_graph.path_totals(path), transport_image)
+
+            step_db = PlanDayStep(
+                plan_day_id=day_id,
+                title=fields["title"],
+                category=step.category,
+                duration=fields["duration"],
+                cost=fields["cost"],
+                image_id=fields["image"].id if fields["image"] else None,
+                place_id=step.place_id,
+                place_activity_id=step.place_activity_id,
+                city_id=step.city_id,
+            )
+            if step.category == PlanDayStepCategoryEnum.transport:
+                hops.append((step_db, path))
+            created.append(step_db)
+
+        self.db.add_all(created)
+        await self.db.flush()
+
+        # Wire the chain now that ids are known
+        if tail_step:
+            tail_step.next_plan_day_step_id = created[0].id
+        for prev_step, next_step in zip(created, created[1:]):
+            prev_step.next_plan_day_step_id = next_step.id
+
+        self.db.add_all([
+            PlanRouteHop(plan_day_step_id=step_db.id, index=i, route_id=route_id, destination_city_id=destination_city_id)
+            for step_db, path in hops
+            for i, (route_id, destination_city_id) in enumerate(path)
+        ])
+        await commit(self.db)
+        return created
+
     async def delete(self, step_id: int, force=False):
+        async with unit_of_work(self.db):
+            return await self._delete(step_id, force)
+
+    async def _delete(self, step_id: int, force=False):
         step = await self.repository.get(step_id, load_relations=["plan_day.plan", "next_plan_day_step"])
         if not step:
             raise HTTPException(status_code=404, detail="Step not found")
@@ -215,13 +360,12 @@ class PlanDayStepService:
                     category=PlanDayStepCategoryEnum.transport,
                     city_id=next_step.city_id
                 )
-                details = await get_step_details(self.db, self.graph_db, prev_step_city, next_step_create)
-                title = await get_step_title(self.db, next_step_create, prev_step_city)
+                details = await get_step_fields(self.db, prev_step_city, next_step_create)
                 await self.repository.update_from_dict(next_step.id, {
                     "duration": details["duration"],
                     "cost": details["cost"],
                     "image_id": details["image"].id if details["image"] else None,
-                    "title": title
+                    "title": details["title"]
                 })
                 await self.plan_route_hop_repository.clear_all(next_step.id)
                 await self._create_transport_route_hops(next_step, prev_step_city, next_step.city_id)
@@ -268,7 +412,7 @@ class PlanDayStepService:
     
     async def handle_change_start_city(self, plan_id, start_city_id):
         """Handle when the plan's start city changes"""
-        plan = await self.plan_repository.get(plan_id, load_relations=["unordered_days.unordered_steps"])
+        plan = await self.plan_repository.get_ordered(plan_id, load_relations=["unordered_days.unordered_steps"])
         
         first_step = None
         for day in plan.days:
@@ -290,12 +434,11 @@ class PlanDayStepService:
                 next_plan_day_step_id=first_step.id
             )
             
-            step_details = await get_step_details(self.db, self.graph_db, start_city_id, transport_step)
-            step_title = await get_step_title(self.db, transport_step, start_city_id)
+            step_details = await get_step_fields(self.db, start_city_id, transport_step)
             
             step_internal = PlanDayStepCreateInternal(
                 plan_day_id=transport_step.plan_day_id,
-                title=step_title,
+                title=step_details["title"],
                 category=transport_step.category,
                 duration=step_details["duration"],
                 cost=step_details["cost"],
@@ -315,14 +458,13 @@ class PlanDayStepService:
         elif first_step.category == PlanDayStepCategoryEnum.transport:
             await self.plan_route_hop_repository.clear_all(first_step.id)
             
-            step_details = await get_step_details(self.db, self.graph_db, start_city_id, first_step)
-            title = await get_step_title(self.db, first_step, start_city_id)
+            step_details = await get_step_fields(self.db, start_city_id, first_step)
             
             await self.repository.update_from_dict(first_step.id, {
                 "duration": step_details["duration"],
                 "cost": step_details["cost"],
                 "image_id": step_details["image"].id if step_details["image"] else None,
-                "title": title
+                "title": step_details["title"]
             })
             
             await self._create_transport_route_hops(first_step, start_city_id, first_step.city_id)
@@ -363,12 +505,8 @@ class PlanDayStepService:
     
     async def _create_transport_route_hops(self, step_db, prev_city_id: int, city_id: int):
         """Create route hops for a transport step"""
-        route_to_follow = await self.city_graph_repository.shortest_path(
-            prev_city_id, 
-            city_id, 
-            edge_type=TransportRouteEdge, 
-            weight_property="distance"
-        )
+        route_graph = await route_graph_store.get_paths(self.db)
+        route_to_follow = route_graph.shortest_path(prev_city_id, city_id, weight_property="distance")
         if not route_to_follow:
             raise HTTPException(status_code=404, detail="No route found")
         
@@ -11,4 +11,4 @@ class PlanRouteHopsRepository(BaseRepository[PlanRouteHop, PlanRouteHopCreate]):
 
     async def clear_all(self, plan_day_step_id: int):
         await self.db.execute(delete(PlanRouteHop).where(PlanRouteHop.plan_day_step_id == plan_day_step_id))
-        await self.db.commit()
\ No newline at end of file
+        await self._commit()
\ No newline at end of file
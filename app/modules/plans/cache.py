@@ -1,5 +1,6 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.database.redis_cache import RedisCache
+from app.database.unit_of_work import unit_of_work
 from app.modules.plan_day.repository import PlanDayRepository
 from app.modules.plan_day.schema import PlanDayCreate
 from app.modules.plan_day_steps.repository import PlanDayStepRepository
@@ -19,7 +20,7 @@ class PlanCache:
         self.plan_route_hop_repository = PlanRouteHopsRepository(db)
 
     async def push(self, plan_id: int):
-        plan = await self.repository.get(plan_id, load_relations=["days.steps.route_hops"])
+        plan = await self.repository.get_ordered(plan_id, load_relations=["unordered_days.unordered_steps.route_hops"])
         
         days_list = []
         for day in plan.days:
@@ -74,7 +75,14 @@ class PlanCache:
         cached = await self.cache.get(f"plan:{plan_id}")
         if not cached:
             return
-        
+
+        # Restore the whole snapshot in one transaction, a failure leaves the plan untouched
+        async with unit_of_work(self.db):
+            await self._restore(plan, cached)
+        return cached
+
+    async def _restore(self, plan, cached):
+        plan_id = plan.id
         base_fields = {k: v for k, v in cached.items() if k != "days"}
         await self.repository.update_from_dict(plan_id, base_fields)
 
@@ -6,10 +6,10 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi_pagination import Params
 from app.modules.plan_day_steps.schema import PlanDayStepCategoryEnum, PlanDayStepCreate
 from app.modules.plan_day_steps.service import PlanDayStepService
-from neo4j import AsyncSession as Neo4jSession
 from app.core.schemas import BaseResponse
 from app.database.redis_cache import RedisCache
 from app.modules.plans.cache import PlanCache
+from app.modules.plans.read_cache import PlanReadCache
 from app.modules.plans.repository import PlanRepository
 from app.modules.plans.schema import PlanBase, PlanCreate, PlanFiltersInternal, PlanIndex, PlanRead
 
@@ -18,6 +18,7 @@ class PlanController():
     def __init__(self, db: AsyncSession, user_id: int):
         self.db = db
         self.repository = PlanRepository(db)
+        self.read_cache = PlanReadCache(db)
         self.user_id = user_id
 
     async def create(self, plan: PlanCreate):
@@ -27,10 +28,10 @@ class PlanController():
         return BaseResponse(message="Plan created successfully", data=plan_data)
 
     async def get(self, plan_id: int):
-        plan = await self.repository.get_updated_plan(plan_id, user_id=self.user_id)
+        plan = await self.read_cache.get(plan_id, user_id=self.user_id)
         if not plan:
             raise HTTPException(status_code=404, detail="Plan not found")
-        if plan.user.id != self.user_id and plan.is_private:
+        if plan["user"]["id"] != self.user_id and plan["is_private"]:
             raise HTTPException(status_code=403, detail="Plan is private")
         return BaseResponse(message="Plan fetched successfully", data=plan)
     
@@ -41,33 +42,34 @@ class PlanController():
         if plan.user_id != self.user_id:
             raise HTTPException(status_code=403, detail="You can only delete your plans")
         delete = await self.repository.delete(plan_id)
+        await self.read_cache.invalidate(plan_id)
         return BaseResponse(message="Plan deleted successfully")
     
-    async def partial_update(self, plan_id, data: Dict, graph_db: Neo4jSession):
+    async def partial_update(self, plan_id, data: Dict):
         plan = await self.repository.get(plan_id, load_relations=["unordered_days.unordered_steps"])
         old_start_city_id = plan.start_city_id
         if plan.user_id != self.user_id:
             raise HTTPException(status_code=403, detail="You can only update your plans")
         data['user_id'] = self.user_id
         plan_db = await self.repository.update_from_dict(plan_id, data)
-        service = PlanDayStepService(self.db, graph_db)
+        service = PlanDayStepService(self.db)
         if data.get('start_city_id') and data.get('start_city_id') != old_start_city_id:
             await service.handle_change_start_city(plan_id, data['start_city_id'])
         
         plan_data = await self.repository.get_updated_plan(plan_db.id, user_id=self.user_id)
         return BaseResponse(message="Plan updated successfully", data=plan_data)
     
-    async def update(self, plan_id: int, plan: PlanCreate, graph_db: Neo4jSession):
+    async def update(self, plan_id: int, plan: PlanCreate):
         plan_internal = PlanBase(user_id=self.user_id, **plan.model_dump())
-        past_data = await self.repository.get(plan_id, load_relations=["unordered_days.unordered_steps"])
+        past_data = await self.repository.get_ordered(plan_id, load_relations=["unordered_days.unordered_steps"])
         plan_db = await self.repository.update(plan_id, plan_internal)
         if not plan_db:
             raise HTTPException(status_code=404, detail="Plan not found")
         
         if plan.start_city_id != past_data.start_city_id:
-            await PlanDayStepService(self.db, graph_db).add(PlanDayStepCreate(plan_id=plan_id, city_id=plan.start_city_id, index=0, category=PlanDayStepCategoryEnum.transport))
+            await PlanDayStepService(self.db).add(PlanDayStepCreate(plan_id=plan_id, city_id=plan.start_city_id, index=0, category=PlanDayStepCategoryEnum.transport))
             if past_data.days and past_data.days[0].steps:
-                await PlanDayStepService(self.db, graph_db).delete(past_data.days[0].steps[0].id)
+                await PlanDayStepService(self.db).delete(past_data.days[0].steps[0].id)
         plan_data = await self.repository.get_updated_plan(plan_db.id, user_id=self.user_id)
         return BaseResponse(message="Plan updated successfully", data=plan_data)
 
@@ -96,10 +98,7 @@ class PlanController():
             load_relations=["start_city", "image", "user.image"],
             filters=filters
         )
-        data=[PlanIndex.model_validate(ts, from_attributes=True) for ts in paged_data.items]
-        for d in data:
-            d.is_saved = await self.repository.is_saved(self.user_id, d.id)
-            d.self_rating = await self.repository.get_rating(self.user_id, d.id)
+        data = await self._to_index(paged_data.items)
         return BaseResponse(message="Plans fetched successfully", data=data, page=paged_data.page, size=paged_data.size, total=paged_data.total)
     
     async def saved_plans(
@@ -120,10 +119,7 @@ class PlanController():
             load_relations=["start_city", "image", "user.image"],
             filters=filters
         )
-        data=[PlanIndex.model_validate(ts, from_attributes=True) for ts in paged_data.items]
-        for d in data:
-            d.is_saved = await self.repository.is_saved(self.user_id, d.id)
-            d.self_rating = await self.repository.get_rating(self.user_id, d.id)
+        data = await self._to_index(paged_data.items)
         return BaseResponse(message="Plans fetched successfully", data=data, page=paged_data.page, size=paged_data.size, total=paged_data.total)
     
     async def index(
@@ -148,10 +144,7 @@ class PlanController():
             filters=PlanFiltersInternal(**filters.model_dump()),
             extra_conditions=extra_condition
         )
-        data=[PlanIndex.model_validate(ts, from_attributes=True) for ts in paged_data.items]
-        for d in data:
-            d.is_saved = await self.repository.is_saved(self.user_id, d.id)
-            d.self_rating = await self.repository.get_rating(self.user_id, d.id)
+        data = await self._to_index(paged_data.items)
         return BaseResponse(message="Plans fetched successfully", data=data, page=paged_data.page, size=paged_data.size, total=paged_data.total)
     
     async def rate(self, plan_id: int, rating: int):
@@ -160,12 +153,14 @@ class PlanController():
         rating = await self.repository.rate_plan(self.user_id, plan_id, rating)
         if not rating:
             raise HTTPException(status_code=400, detail="You can't rate private plans")
+        await self.read_cache.invalidate(plan_id)
         return BaseResponse(message="Plan rated successfully", data={"rating": rating})
 
     async def delete_rate(self, plan_id: int):
         rating = await self.repository.remove_plan_rating(self.user_id, plan_id)
         if rating is None:
             raise HTTPException(status_code=404, detail="No rating found")
+        await self.read_cache.invalidate(plan_id)
         return BaseResponse(message="Plan rating removed successfully", data={"rating": rating})
 
     async def toggle_save(self, plan_id: int):
@@ -173,7 +168,7 @@ class PlanController():
         return BaseResponse(message="Plan saved successfully" if saved else "Plan unsaved successfully", data={"saved": saved})
     
     async def undo_changes(self, plan_id: int):
-        plan = await self.repository.get(plan_id, load_relations=["days.steps.route_hops"])
+        plan = await self.repository.get_ordered(plan_id, load_relations=["unordered_days.unordered_steps.route_hops"])
         if not plan:
             raise HTTPException(status_code=404, detail="Plan not found")
         if plan.user_id != self.user_id:
@@ -182,4 +177,12 @@ class PlanController():
         if not cached:
             raise HTTPException(status_code=404, detail="No changes found")
         plan_data = await self.repository.get_updated_plan(plan.id, user_id=self.user_id)
-        return BaseResponse(message="Plan duplicated successfully", data=plan_data)
\ No newline at end of file
+        return BaseResponse(message="Plan duplicated successfully", data=plan_data)
+
+    async def _to_index(self, plans) -> list[PlanIndex]:
+        """Serialize a page of plans with the viewer's is_saved/self_rating fetched in one query"""
+        data = [PlanIndex.model_validate(p, from_attributes=True) for p in plans]
+        flags = await self.repository.get_viewer_flags(self.user_id, [d.id for d in data])
+        for d in data:
+            d.is_saved, d.self_rating = flags.get(d.id, (False, None))
+        return data
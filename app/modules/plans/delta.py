@@ -0,0 +1,147 @@
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.modules.cities.models import City
+from app.modules.cities.schema import CityRead
+from app.modules.plan_day.models import PlanDay
+from app.modules.plan_day.schema import PlanDayRead
+from app.modules.plan_day_steps.models import PlanDayStep
+from app.modules.plan_day_steps.schema import PlanDayStepCategoryEnum, PlanDayStepRead
+from app.modules.plans.materializer import PlanMaterializer, day_last_city_ids, estimate_cost
+from app.modules.plans.repository import PlanRepository
+from app.modules.plans.schema import PlanRead
+
+
+class PlanDeltaStream:
+    """
+    Keeps the client's view of a plan that is being built and describes every change as JSON-Patch
+    style ops (`add` / `replace`) on the PlanRead document, numbered with `seq`.
+
+    The plan is materialized once for the first snapshot, after that only the new days and steps
+    are loaded and the totals (`estimated_cost`, `no_of_days`, `image`) are recomputed in memory.
+    A client that missed a message (gap in `seq`) asks for a new snapshot.
+
+    `pace_ms` is passed through on deltas as a hint for clients that want to animate the plan
+    growing, the server never waits.
+    """
+
+    def __init__(self, db: AsyncSession, plan_id: int, user_id: int, pace_ms: int = 0):
+        self.plan_id = plan_id
+        self.user_id = user_id
+        self.pace_ms = pace_ms
+        self.materializer = PlanMaterializer(db)
+        self.plan_repository = PlanRepository(db)
+        self.plan: Optional[PlanRead] = None
+        self.seq = 0
+
+    async def snapshot(self, reason: str) -> Dict[str, Any]:
+        """Full plan, only the first one is read from the database, resyncs send the tracked state"""
+        if self.plan is None:
+            self.plan = await self.materializer.build(self.plan_id, self.user_id)
+        return self._message("snapshot", reason=reason, response=self.plan.model_dump())
+
+    def start_city_changed(self, city: City) -> Optional[Dict[str, Any]]:
+        ops: List[Dict[str, Any]] = []
+        self._replace(ops, "/start_city", self.plan.start_city, CityRead.model_validate(city))
+        self.plan.start_city = CityRead.model_validate(city)
+        return self._delta(ops)
+
+    async def day_added(self, day: PlanDay) -> Dict[str, Any]:
+        day_read = PlanDayRead(id=day.id, index=len(self.plan.days), title=day.title, can_delete=True, steps=[])
+        self.plan.days.append(day_read)
+        ops = [{"op": "add", "path": "/days/-", "value": day_read.model_dump()}]
+        return self._delta(ops + await self._total_ops())
+
+    async def steps_added(self, steps: List[PlanDayStep]) -> Optional[Dict[str, Any]]:
+        """Steps returned by `PlanDayStepService.add_many`, they are always appended to the end of the chain"""
+        multiplier = self.plan_repository._find_cost_multiplier(self.plan.no_of_people)
+        step_reads = await self.materializer.build_steps([step.id for step in steps], multiplier)
+        if not step_reads:
+            return None
+
+        day_positions = {day.id: i for i, day in enumerate(self.plan.days)}
+        plan_day_ids = {step.id: step.plan_day_id for step in steps}
+        ops: List[Dict[str, Any]] = []
+
+        tail = self._tail()
+        if tail:
+            day_pos, step_pos, tail_step = tail
+            path = f"/days/{day_pos}/steps/{step_pos}"
+            self._replace(ops, f"{path}/next_plan_day_step_id", tail_step.next_plan_day_step_id, step_reads[0].id)
+            tail_step.next_plan_day_step_id = step_reads[0].id
+            can_delete = self._can_delete(tail_step, step_reads[0])
+            self._replace(ops, f"{path}/can_delete", tail_step.can_delete, can_delete)
+            tail_step.can_delete = can_delete
+            self._update_day(ops, day_pos)
+
+        next_index = tail[2].index + 1 if tail else 0
+        for i, step_read in enumerate(step_reads):
+            day_pos = day_positions[plan_day_ids[step_read.id]]
+            step_read.index = next_index + i
+            step_read.can_delete = self._can_delete(step_read, step_reads[i + 1] if i + 1 < len(step_reads) else None)
+            ops.append({"op": "add", "path": f"/days/{day_pos}/steps/-", "value": step_read.model_dump()})
+            self.plan.days[day_pos].steps.append(step_read)
+            self._update_day(ops, day_pos)
+
+        return self._delta(ops + await self._total_ops())
+
+    def completed(self) -> Dict[str, Any]:
+        return {"type": "completed", "seq": self.seq}
+
+    def _tail(self):
+        for day_pos in range(len(self.plan.days) - 1, -1, -1):
+            steps = self.plan.days[day_pos].steps
+            if steps:
+                return day_pos, len(steps) - 1, steps[-1]
+        return None
+
+    @staticmethod
+    def _can_delete(step: PlanDayStepRead, next_step: Optional[PlanDayStepRead]) -> bool:
+        """Same rule as PlanMaterializer._can_delete"""
+        if step.category != PlanDayStepCategoryEnum.transport or not next_step:
+            return True
+        return next_step.category == PlanDayStepCategoryEnum.transport
+
+    def _update_day(self, ops: List[Dict[str, Any]], day_pos: int):
+        day = self.plan.days[day_pos]
+        can_delete = all(step.can_delete for step in day.steps)
+        self._replace(ops, f"/days/{day_pos}/can_delete", day.can_delete, can_delete)
+        day.can_delete = can_delete
+
+    async def _total_ops(self) -> List[Dict[str, Any]]:
+        """Same totals as PlanMaterializer.build, accommodation averages come from their per-city cache"""
+        multiplier = self.plan_repository._find_cost_multiplier(self.plan.no_of_people)
+        averages = await self.materializer.accomodation_repository.get_city_averages(
+            [c for c in day_last_city_ids(self.plan) if c]
+        )
+        ops: List[Dict[str, Any]] = []
+        cost = estimate_cost(self.plan, averages, multiplier)
+        self._replace(ops, "/estimated_cost", self.plan.estimated_cost, cost)
+        self.plan.estimated_cost = cost
+        self._replace(ops, "/no_of_days", self.plan.no_of_days, len(self.plan.days))
+        self.plan.no_of_days = len(self.plan.days)
+
+        if not self.plan.image:
+            for day in self.plan.days:
+                image = next((s.image for s in day.steps if s.category == PlanDayStepCategoryEnum.visit and s.image), None)
+                if image:
+                    self._replace(ops, "/image", None, image)
+                    self.plan.image = image
+                    break
+        return ops
+
+    @staticmethod
+    def _replace(ops: List[Dict[str, Any]], path: str, old: Any, new: Any):
+        if old == new:
+            return
+        ops.append({"op": "replace", "path": path, "value": new.model_dump() if hasattr(new, "model_dump") else new})
+
+    def _delta(self, ops: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        if not ops:
+            return None
+        return self._message("delta", ops=ops, pace_ms=self.pace_ms)
+
+    def _message(self, type: str, **fields) -> Dict[str, Any]:
+        self.seq += 1
+        return {"type": type, "seq": self.seq, **fields}
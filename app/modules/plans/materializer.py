@@ -0,0 +1,179 @@
+from typing import Dict, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, selectinload
+
+from app.database.unit_of_work import commit
+from app.modules.accommodation_services.repository import DEFAULT_CITY_AVERAGE, AccomodationServiceRepository
+from app.modules.activities.models import Activity
+from app.modules.place_activities.models import PlaceActivity
+from app.modules.plan_day.models import PlanDay
+from app.modules.plan_day_steps.models import PlanDayStep
+from app.modules.plan_day_steps.schema import PlanDayStepCategoryEnum, PlanDayStepRead
+from app.modules.plan_route_hops.models import PlanRouteHop
+from app.modules.plans.models import Plan
+from app.modules.plans.ordering import apply_plan_order
+from app.modules.plans.schema import PlanRead
+from app.modules.transport_route.models import TransportRoute
+from app.modules.users.models import User
+
+# plan, days, steps, route hops, chain order, viewer flags, accommodation averages
+MAX_READ_QUERIES = 7
+
+
+def day_last_city_ids(plan_data: PlanRead) -> List[Optional[int]]:
+    """City each day ends in, a day without a city change ends where the previous one did"""
+    last_city_ids: List[Optional[int]] = []
+    last_city_id = plan_data.start_city.id if plan_data.start_city else None
+    for day in plan_data.days:
+        for step in day.steps:
+            if step.city:
+                last_city_id = step.city.id
+        last_city_ids.append(last_city_id)
+    return last_city_ids
+
+
+def estimate_cost(plan_data: PlanRead, averages: Dict[int, float], multiplier: float) -> float:
+    """Cost of the steps (already multiplied) plus one night per day in the city the day ends in"""
+    cost = 0
+    for day, last_city_id in zip(plan_data.days, day_last_city_ids(plan_data)):
+        cost += sum(step.cost for step in day.steps)
+        cost += averages.get(last_city_id, DEFAULT_CITY_AVERAGE) * multiplier
+    return cost
+
+
+class PlanMaterializer:
+    """
+    Builds the PlanRead of a plan with a fixed number of queries, independent of the number of days and steps.
+    can_delete, costs, routes and the image fallback are computed in memory from the loaded graph.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.accomodation_repository = AccomodationServiceRepository(db)
+
+    async def build(self, plan_id: int, user_id: Optional[int], write_back: bool = False) -> Optional[PlanRead]:
+        """
+        Build the PlanRead of a plan. With `write_back` the derived estimated_cost, no_of_days and image are
+        stored on the plan row, only mutation paths ask for it so reads never write to the plans table.
+        """
+        from app.modules.plan_day_steps.service import PlanDayStepService  # To avoid circular import
+        from app.modules.plans.repository import PlanRepository
+
+        plan = await self._load(plan_id)
+        if not plan:
+            return None
+        await apply_plan_order(self.db, plan)
+
+        repository = PlanRepository(self.db)
+        plan_data = PlanRead.model_validate(plan, from_attributes=True)
+        flags = await repository.get_viewer_flags(user_id, [plan_id])
+        plan_data.is_saved, plan_data.self_rating = flags.get(plan_id, (False, None))
+
+        # Whole plan is in memory, resolve the global step chain without extra queries
+        steps_by_id = {step.id: step for day in plan.unordered_days for step in day.unordered_steps}
+        multiplier = repository._find_cost_multiplier(plan.no_of_people)
+
+        step_index = 0
+        for day in plan_data.days:
+            day.can_delete = True
+            for step in day.steps:
+                step.can_delete = self._can_delete(steps_by_id.get(step.id), steps_by_id)
+                step.cost = step.cost * multiplier
+                if not step.can_delete:
+                    day.can_delete = False
+                step.index = step_index
+                step_index += 1
+                if step.route_hops:
+                    step.route = await PlanDayStepService.build_simplified_route(step.route_hops)
+                    step.route_hops = None
+
+        averages = await self.accomodation_repository.get_city_averages([c for c in day_last_city_ids(plan_data) if c])
+        cost = estimate_cost(plan_data, averages, multiplier)
+
+        n_days = len(plan_data.days)
+        image_id = plan_data.image.id if plan_data.image else None
+        if not image_id:
+            for day in plan_data.days:
+                for step in day.steps:
+                    if step.category == PlanDayStepCategoryEnum.visit and step.image:
+                        plan_data.image = step.image
+                        image_id = step.image.id
+                        break
+                if image_id:
+                    break
+
+        changed = (plan.estimated_cost, plan.no_of_days, plan.image_id) != (cost, n_days, image_id)
+        plan_data.estimated_cost = cost
+        plan_data.no_of_days = n_days
+        if write_back and changed:
+            plan.estimated_cost = cost
+            plan.no_of_days = n_days
+            plan.image_id = image_id
+            await commit(self.db)
+        return plan_data
+
+    async def build_steps(self, step_ids: List[int], multiplier: float) -> List[PlanDayStepRead]:
+        """Serialize some steps of a plan the way `build` does, without loading the rest of the plan. can_delete is left to the caller"""
+        if not step_ids:
+            return []
+        from app.modules.plan_day_steps.service import PlanDayStepService  # To avoid circular import
+
+        result = await self.db.execute(
+            select(PlanDayStep).filter(PlanDayStep.id.in_(step_ids)).options(*self._step_options())
+        )
+        steps = {step.id: step for step in result.unique().scalars().all()}
+        step_reads = []
+        for step_id in step_ids:
+            if step_id not in steps:
+                continue
+            step = steps[step_id]
+            step.index = 0
+            step_read = PlanDayStepRead.model_validate(step, from_attributes=True)
+            step_read.cost = step_read.cost * multiplier
+            if step_read.route_hops:
+                step_read.route = await PlanDayStepService.build_simplified_route(step_read.route_hops)
+                step_read.route_hops = None
+            step_reads.append(step_read)
+        return step_reads
+
+    async def _load(self, plan_id: int) -> Optional[Plan]:
+        self.db.expire_all()
+        step_options = selectinload(Plan.unordered_days).selectinload(PlanDay.unordered_steps).options(*self._step_options())
+        query = (
+            select(Plan)
+            .filter_by(id=plan_id)
+            .options(
+                joinedload(Plan.image),
+                joinedload(Plan.start_city),
+                joinedload(Plan.user).joinedload(User.image),
+                step_options,
+            )
+        )
+        result = await self.db.execute(query)
+        return result.unique().scalar_one_or_none()
+
+    @staticmethod
+    def _step_options():
+        route_options = selectinload(PlanDayStep.route_hops).joinedload(PlanRouteHop.route).options(
+            joinedload(TransportRoute.start_city),
+            joinedload(TransportRoute.end_city),
+        )
+        return (
+            joinedload(PlanDayStep.place),
+            joinedload(PlanDayStep.place_activity).joinedload(PlaceActivity.activity).joinedload(Activity.image),
+            joinedload(PlanDayStep.city),
+            joinedload(PlanDayStep.image),
+            route_options,
+        )
+
+    @staticmethod
+    def _can_delete(step: Optional[PlanDayStep], steps_by_id: Dict[int, PlanDayStep]) -> bool:
+        """Same rule as PlanDayStepService._can_delete_step: a transport step leading to a visit or activity is required"""
+        if not step or step.category != PlanDayStepCategoryEnum.transport:
+            return True
+        next_step = steps_by_id.get(step.next_plan_day_step_id)
+        if not next_step:
+            return True
+        return next_step.category == PlanDayStepCategoryEnum.transport
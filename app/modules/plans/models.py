@@ -2,6 +2,7 @@ from sqlalchemy import CheckConstraint, Column, Integer, String, ForeignKey, Flo
 from sqlalchemy.orm import relationship
 
 from app.database.database import Base
+from app.utils.linked_list import ordered_chain
 
 
 class Plan(Base):
@@ -30,19 +31,7 @@ class Plan(Base):
 
     @property
     def days(self):
-        days_map = {day.id: day for day in self.unordered_days}
-        next_ids = {day.next_plan_day_id for day in self.unordered_days if day.next_plan_day_id}
-        head = next((day for day in self.unordered_days if day.id not in next_ids), None)
-        ordered_days = []
-        current = head
-        idx = 0
-        while current:
-            current.index = idx
-            ordered_days.append(current)
-            current = days_map.get(current.next_plan_day_id)
-            idx += 1
-
-        return ordered_days
+        return ordered_chain(self, "unordered_days", "next_plan_day_id")
 
 
 user_saved_plans = Table(
@@ -0,0 +1,75 @@
+from typing import Dict, List, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.utils.linked_list import seed_chain
+
+# Upper bound on chain length, protects the recursive CTE against cycles in corrupted chains
+MAX_CHAIN_DEPTH = 10000
+
+ORDERED_CHAIN_QUERY = text("""
+WITH RECURSIVE day_chain AS (
+    SELECT d.id, d.plan_id, d.next_plan_day_id, 0 AS position
+    FROM plan_days d
+    WHERE d.plan_id = ANY(:plan_ids)
+      AND NOT EXISTS (SELECT 1 FROM plan_days p WHERE p.next_plan_day_id = d.id)
+    UNION ALL
+    SELECT d.id, d.plan_id, d.next_plan_day_id, c.position + 1
+    FROM day_chain c
+    JOIN plan_days d ON d.id = c.next_plan_day_id
+    WHERE c.position < :max_depth
+),
+step_chain AS (
+    SELECT s.id, s.plan_day_id, s.next_plan_day_step_id, 0 AS position
+    FROM plan_day_steps s
+    JOIN plan_days d ON d.id = s.plan_day_id
+    WHERE d.plan_id = ANY(:plan_ids)
+      AND NOT EXISTS (SELECT 1 FROM plan_day_steps p WHERE p.next_plan_day_step_id = s.id)
+    UNION ALL
+    SELECT s.id, s.plan_day_id, s.next_plan_day_step_id, c.position + 1
+    FROM step_chain c
+    JOIN plan_day_steps s ON s.id = c.next_plan_day_step_id
+    WHERE c.position < :max_depth
+),
+days AS (
+    SELECT DISTINCT ON (id) id, plan_id, position FROM day_chain ORDER BY id, position
+),
+steps AS (
+    SELECT DISTINCT ON (id) id, plan_day_id, position FROM step_chain ORDER BY id, position
+)
+SELECT 'day' AS kind, id, plan_id AS parent_id, position FROM days
+UNION ALL
+SELECT 'step' AS kind, id, plan_day_id AS parent_id, position FROM steps
+ORDER BY kind, parent_id, position
+""")
+
+
+async def load_plan_order(db: AsyncSession, plan_ids: List[int]) -> Tuple[Dict[int, List[int]], Dict[int, List[int]]]:
+    """
+    Resolve the day and step chains of the given plans with a single query.
+    Returns ({plan_id: [day_id, ...]}, {plan_day_id: [step_id, ...]}) in chain order.
+    """
+    day_order: Dict[int, List[int]] = {plan_id: [] for plan_id in plan_ids}
+    step_order: Dict[int, List[int]] = {}
+    if not plan_ids:
+        return day_order, step_order
+
+    result = await db.execute(ORDERED_CHAIN_QUERY, {"plan_ids": list(plan_ids), "max_depth": MAX_CHAIN_DEPTH})
+    for kind, item_id, parent_id, _ in result.all():
+        if kind == "day":
+            day_order.setdefault(parent_id, []).append(item_id)
+        else:
+            step_order.setdefault(parent_id, []).append(item_id)
+    return day_order, step_order
+
+
+async def apply_plan_order(db: AsyncSession, plan) -> None:
+    """
+    Order an already loaded plan (with unordered_days and unordered_steps) in SQL and seed
+    the `Plan.days` / `PlanDay.steps` memos so later accesses don't walk the chains again.
+    """
+    day_order, step_order = await load_plan_order(db, [plan.id])
+    seed_chain(plan, "unordered_days", "next_plan_day_id", day_order.get(plan.id, []))
+    for day in plan.unordered_days:
+        seed_chain(day, "unordered_steps", "next_plan_day_step_id", step_order.get(day.id, []))
@@ -0,0 +1,105 @@
+from typing import Any, Dict, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database.redis_cache import RedisCache, get_redis_cache_instance
+from app.modules.plans.materializer import PlanMaterializer
+from app.modules.plans.models import Plan
+from app.modules.plans.schema import PlanRead
+from app.utils.lru_cache import LRUCache
+
+PLAN_READ_TTL = 600
+VIEWER_FIELDS = ("is_saved", "self_rating")
+
+# Bodies are immutable per (plan_id, version), so they can be shared by every request in the process
+_local_plans = LRUCache(maxsize=256, ttl=PLAN_READ_TTL)
+
+
+class PlanReadCache:
+    """
+    Serialized PlanRead per plan, stored in Redis and in a small in-process LRU.
+
+    Each plan has a version counter in Redis, every mutation bumps it through `refresh` or `invalidate`
+    so all workers stop serving the old body, a profile update bumps every plan of its owner through
+    `invalidate_user`. The body is viewer independent, `is_saved` and `self_rating` are overlaid per
+    request. Derived data that changes outside the plan (routes, accommodation prices) is picked up
+    once the body expires.
+    """
+
+    def __init__(self, db: AsyncSession, redis_cache: Optional[RedisCache] = None):
+        self.db = db
+        self.cache = redis_cache if redis_cache is not None else get_redis_cache_instance("plan_read")
+        self.materializer = PlanMaterializer(db)
+
+    async def get(self, plan_id: int, user_id: Optional[int]) -> Optional[Dict[str, Any]]:
+        """Get the serialized plan for a viewer, building it on a miss"""
+        from app.modules.plans.repository import PlanRepository  # To avoid circular import
+
+        version = await self._version(plan_id)
+        body = _local_plans.get((plan_id, version))
+        if body is None and self.cache:
+            body = await self.cache.get(self._body_key(plan_id, version))
+            if body is not None:
+                _local_plans.set((plan_id, version), body)
+
+        if body is None:
+            plan_data = await self.materializer.build(plan_id, user_id)
+            if not plan_data:
+                return None
+            await self._store(plan_id, version, plan_data)
+            return plan_data.model_dump(mode="json")
+
+        flags = await PlanRepository(self.db).get_viewer_flags(user_id, [plan_id])
+        is_saved, self_rating = flags.get(plan_id, (False, None))
+        return {**body, "is_saved": is_saved, "self_rating": self_rating}
+
+    async def refresh(self, plan_id: int, user_id: Optional[int]) -> Optional[PlanRead]:
+        """
+        Invalidate after a mutation and rebuild the plan, the new body is cached for other viewers.
+        This is the only place the derived columns of the plan are written back.
+        """
+        version = await self.invalidate(plan_id)
+        plan_data = await self.materializer.build(plan_id, user_id, write_back=True)
+        if plan_data:
+            await self._store(plan_id, version, plan_data)
+        return plan_data
+
+    async def invalidate(self, plan_id: int) -> Optional[int]:
+        if not self.cache:
+            return None
+        return await self.cache.incr(self._version_key(plan_id))
+
+    async def invalidate_user(self, user_id: int):
+        """Retire the bodies of every plan of a user, they embed the owner's profile"""
+        if not self.cache:
+            return
+        result = await self.db.execute(select(Plan.id).where(Plan.user_id == user_id))
+        plan_ids = result.scalars().all()
+        if not plan_ids:
+            return
+        async with self.cache.client.pipeline(transaction=False) as pipe:
+            for plan_id in plan_ids:
+                pipe.incr(f"{self.cache.namespace}{self._version_key(plan_id)}")
+            await pipe.execute()
+
+    async def _version(self, plan_id: int) -> Optional[int]:
+        if not self.cache:
+            return None
+        version = await self.cache.get(self._version_key(plan_id))
+        return int(version) if version is not None else 0
+
+    async def _store(self, plan_id: int, version: Optional[int], plan_data: PlanRead):
+        if not self.cache or version is None:
+            return
+        body = plan_data.model_dump(mode="json", exclude=set(VIEWER_FIELDS))
+        _local_plans.set((plan_id, version), body)
+        await self.cache.set(self._body_key(plan_id, version), body, ex=PLAN_READ_TTL)
+
+    @staticmethod
+    def _version_key(plan_id: int) -> str:
+        return f"{plan_id}:version"
+
+    @staticmethod
+    def _body_key(plan_id: int, version: int) -> str:
+        return f"{plan_id}:v{version}"
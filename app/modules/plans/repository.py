@@ -1,6 +1,6 @@
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 from fastapi import HTTPException
-from sqlalchemy import delete, insert, select, or_, asc, desc
+from sqlalchemy import and_, delete, insert, select, or_, asc, desc
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload , joinedload
 from sqlalchemy.orm import joinedload, selectinload
@@ -9,10 +9,12 @@ from fastapi_pagination.ext.sqlalchemy import paginate
 from fastapi_pagination import Params, Page
 from app.modules.accommodation_services.repository import AccomodationServiceRepository
 from app.core.repository import BaseRepository
+from app.database.unit_of_work import unit_of_work
 from app.modules.plan_day.models import PlanDay
 from app.modules.plan_day_steps.models import PlanDayStep
 from app.modules.plan_route_hops.models import PlanRouteHop
 from app.modules.plans.models import Plan, UserPlanRating, user_saved_plans
+from app.modules.plans.ordering import apply_plan_order
 from app.modules.plans.schema import PlanBase, PlanRead
 from app.modules.users.repository import UserRepository
 
@@ -21,8 +23,19 @@ class PlanRepository(BaseRepository[Plan, PlanBase]):
         super().__init__(Plan, db)
         self.user_repository = UserRepository(self.db)
 
+    async def get_ordered(self, plan_id: int, load_relations: list[str] = None) -> Optional[Plan]:
+        """Get a plan with `days` and `steps` ordered in SQL. load_relations must include unordered_days.unordered_steps"""
+        plan = await self.get(plan_id, load_relations=load_relations)
+        if plan:
+            await apply_plan_order(self.db, plan)
+        return plan
+
     async def duplicate_plan(self, plan_id: int, new_user_id: int) -> Plan:
-        original_plan = await self.get(plan_id, load_relations=["unordered_days.unordered_steps.route_hops"])
+        async with unit_of_work(self.db):
+            return await self._duplicate_plan(plan_id, new_user_id)
+
+    async def _duplicate_plan(self, plan_id: int, new_user_id: int) -> Plan:
+        original_plan = await self.get_ordered(plan_id, load_relations=["unordered_days.unordered_steps.route_hops"])
         if not original_plan:
             return None
         
@@ -118,7 +131,7 @@ class PlanRepository(BaseRepository[Plan, PlanBase]):
             new_rating = UserPlanRating(user_id=user_id, plan_id=plan_id, rating=rating)
             self.db.add(new_rating)
 
-        await self.db.commit()
+        await self._commit()
         return round(total_rating / plan.vote_count, 2)
     
     async def remove_plan_rating(self, user_id: int, plan_id: int) -> Optional[float]:
@@ -146,7 +159,7 @@ class PlanRepository(BaseRepository[Plan, PlanBase]):
             total_rating = 0
 
         await self.db.delete(rating_row)
-        await self.db.commit()
+        await self._commit()
         if plan.vote_count == 0:
             return 0
         return round(total_rating / plan.vote_count, 2)
@@ -161,14 +174,14 @@ class PlanRepository(BaseRepository[Plan, PlanBase]):
                 user_saved_plans.c.plan_id == plan_id
             )
             await self.db.execute(delete_stmt)
-            await self.db.commit()
+            await self._commit()
             return False
         else:
             insert_stmt = insert(user_saved_plans).values(
                 user_id=user_id, plan_id=plan_id
             )
             await self.db.execute(insert_stmt)
-            await self.db.commit()
+            await self._commit()
             return True
 
     async def is_saved(self, user_id: int, plan_id: int) -> bool:
@@ -191,94 +204,30 @@ class PlanRepository(BaseRepository[Plan, PlanBase]):
     
     
     async def get_updated_plan(self, plan_id: int, user_id: int) -> Optional[PlanRead]:
-        from app.modules.plan_day_steps.service import PlanDayStepService # To avoid circular import
-
-        load_relations = [
-            "image",
-            "start_city",
-            "unordered_days.unordered_steps.place",
-            "unordered_days.unordered_steps.place_activity.activity.image",
-            "unordered_days.unordered_steps.city",
-            "unordered_days.unordered_steps.image",
-            "unordered_days.unordered_steps.next_plan_day_step",
-            "unordered_days.unordered_steps.route_hops.route.start_city",
-            "unordered_days.unordered_steps.route_hops.route.end_city",
-            "user.image"
-        ]
-        self.db.expire_all()
-        query = select(self.model).filter_by(id=plan_id)
-
-        for relation in load_relations:
-            parts = relation.split(".")
-            current_model = self.model
-            option = None
-
-            for i, part in enumerate(parts):
-                attr = getattr(current_model, part)
-                current_model = attr.property.mapper.class_
-                if i == 0:
-                    option = selectinload(attr)
-                else:
-                    option = option.joinedload(attr)
-
-            query = query.options(option)
-
-        result = await self.db.execute(query)
-        plan = result.unique().scalar_one_or_none()
-
-        if not plan:
-            return None
-        
-        cost = 0
-
-        plan_data = PlanRead.model_validate(plan, from_attributes=True)
-        plan_data.self_rating = await self.get_rating(user_id, plan_id)
-        plan_data.is_saved = await self.is_saved(user_id, plan_id)
-        
-        step_index = 0
-
-        accomodation_repo = AccomodationServiceRepository(self.db)
-        last_city_id = plan.start_city_id
-        
-        for day in plan_data.days:
-            day_can_delete = True
-            for step in day.steps:
-                step.can_delete = await PlanDayStepService._can_delete_step(self.db, step.id)
-                step.cost = step.cost * self._find_cost_multiplier(plan.no_of_people)
-                last_city_id = step.city.id
-                cost += step.cost
-                if not step.can_delete:
-                    day_can_delete = False
-                step.index = step_index
-                
-                step_index += 1
-                if step.route_hops:
-                    step.route = await PlanDayStepService.build_simplified_route(step.route_hops)
-                    step.route_hops = None
-            day.can_delete = day_can_delete
-            city_accomodation_cost = await accomodation_repo.get_city_average(last_city_id)
-            cost += city_accomodation_cost * self._find_cost_multiplier(plan.no_of_people) 
-
-        n_days = len(plan_data.days)
-        image_id = plan_data.image.id if plan_data.image else None
-        if not image_id and len(plan_data.days) > 0:
-            for day in plan_data.days:
-                for step in day.steps:
-                    if step.category == "visit" and step.image:
-                        plan_data.image = step.image
-                        image_id = step.image.id
-                        break
-                day.can_delete = day_can_delete
-                if plan_data.image:
-                    break
+        """Rebuild a plan after a mutation, also refreshes its cached read model"""
+        from app.modules.plans.read_cache import PlanReadCache # To avoid circular import
 
+        return await PlanReadCache(self.db).refresh(plan_id, user_id)
 
-        self.db.expunge(plan)
-        await self.update_from_dict(plan_id, {"estimated_cost": cost, "no_of_days": n_days, "image_id": image_id})
-        plan_data.estimated_cost = cost
-        plan_data.no_of_days = n_days
-        return plan_data
-
+    async def get_viewer_flags(self, user_id: Optional[int], plan_ids: List[int]) -> Dict[int, Tuple[bool, Optional[int]]]:
+        """
+        Get (is_saved, self_rating) of a user for many plans in a single query.
+        Plans the user hasn't saved or rated map to (False, None).
+        """
+        if not plan_ids:
+            return {}
+        if user_id is None:
+            return {plan_id: (False, None) for plan_id in plan_ids}
+
+        stmt = (
+            select(Plan.id, user_saved_plans.c.user_id.is_not(None), UserPlanRating.rating)
+            .select_from(Plan)
+            .outerjoin(user_saved_plans, and_(user_saved_plans.c.plan_id == Plan.id, user_saved_plans.c.user_id == user_id))
+            .outerjoin(UserPlanRating, and_(UserPlanRating.plan_id == Plan.id, UserPlanRating.user_id == user_id))
+            .where(Plan.id.in_(plan_ids))
+        )
+        result = await self.db.execute(stmt)
+        return {plan_id: (is_saved, rating) for plan_id, is_saved, rating in result.all()}
 
     def _find_cost_multiplier(self, no_of_people: int) -> float:
         if no_of_people <= 0:
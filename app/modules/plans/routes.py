@@ -5,9 +5,7 @@ from app.database.database import get_db
 from fastapi_pagination import Params
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.database.graph_database import get_graph_db
 from app.database.redis_cache import RedisCache, get_redis_cache
-from neo4j import AsyncSession as Neo4jSession
 from app.modules.plans.controller import PlanController
 from app.modules.plans.schema import PlanCreate, PlanFilters
 
@@ -146,13 +144,12 @@ async def update_plan(
     plan_id: int, 
     plan: PlanCreate, 
     request: Request, 
-    db: AsyncSession = Depends(get_db),
-    graph_db: Neo4jSession = Depends(get_graph_db)
+    db: AsyncSession = Depends(get_db)
 ):
     try:
         user_id = request.state.user_id
         controller = PlanController(db, user_id)
-        return await controller.update(plan_id, plan, graph_db)
+        return await controller.update(plan_id, plan)
     except HTTPException as e:
         raise e
     except Exception as e:        
@@ -164,13 +161,12 @@ async def partial_update_plan(
     plan_id: int, 
     data: Dict, 
     request: Request, 
-    db: AsyncSession = Depends(get_db),
-    graph_db: Neo4jSession = Depends(get_graph_db)
+    db: AsyncSession = Depends(get_db)
 ):
     try:
         user_id = request.state.user_id
         controller = PlanController(db, user_id)
-        return await controller.partial_update(plan_id, data, graph_db)
+        return await controller.partial_update(plan_id, data)
     except HTTPException as e:
         raise e
     except Exception as e:        
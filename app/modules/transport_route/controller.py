@@ -7,6 +7,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from neo4j import AsyncSession as Neo4jSession
 
 from app.core.schemas import BaseResponse
+from app.modules.transport_route.service import route_graph_store
 from app.modules.transport_route.repository import TransportRouteRepository
 from app.modules.transport_route.schema import RouteCategoryEnum, TransportRouteCreate, TransportRouteRead
 
@@ -24,6 +25,7 @@ class TransportRouteController():
         if does_exist:
             raise HTTPException(status_code=400, detail="Transport route already exists")
         res = await self.repository.create(transport_route)
+        await route_graph_store.invalidate()
         await self.graph_repository.add_edge(TransportRouteEdge(
             id=res.id,
             source_id=transport_route.start_city_id,
@@ -54,6 +56,7 @@ class TransportRouteController():
         res = await self.repository.update(transport_route_id, transport_route)
         if not res:
             raise HTTPException(status_code=404, detail="Transport route not found")
+        await route_graph_store.invalidate()
         await self.graph_repository.update_edge(
             TransportRouteEdge(
                 id=transport_route_id,
@@ -72,6 +75,7 @@ class TransportRouteController():
         delete = await self.repository.delete(transport_route_id)
         if not delete:
             raise HTTPException(status_code=404, detail="Transport route not found")
+        await route_graph_store.invalidate()
         await self.graph_repository.delete_edge(TransportRouteEdge, transport_route_id)
         return BaseResponse(message="Transport route deleted successfully")
     
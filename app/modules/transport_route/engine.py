@@ -0,0 +1,156 @@
+import heapq
+import math
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.modules.cities.models import City
+from app.modules.transport_route.models import TransportRoute
+from app.utils.geo import haversine
+
+WEIGHT_PROPERTIES = ("distance", "average_cost", "average_duration")
+
+
+@dataclass(frozen=True)
+class RouteEdge:
+    id: int
+    start_city_id: int
+    end_city_id: int
+    distance: float
+    average_duration: float
+    average_cost: float
+
+    def other(self, city_id: int) -> int:
+        return self.end_city_id if city_id == self.start_city_id else self.start_city_id
+
+
+class RouteGraph:
+    """
+    In-memory adjacency list of the transport route network.
+    Routes are treated as undirected, same as the Neo4j projection.
+    """
+
+    def __init__(self, edges: List[RouteEdge], coordinates: Optional[Dict[int, Tuple[float, float]]] = None):
+        self.edges: Dict[int, RouteEdge] = {edge.id: edge for edge in edges}
+        self.coordinates = coordinates or {}
+        self.adjacency: Dict[int, List[RouteEdge]] = {}
+        for edge in edges:
+            self.adjacency.setdefault(edge.start_city_id, []).append(edge)
+            self.adjacency.setdefault(edge.end_city_id, []).append(edge)
+        self.heuristic_scale = self._heuristic_scale()
+
+    @classmethod
+    async def load(cls, db: AsyncSession) -> "RouteGraph":
+        routes = (await db.execute(select(
+            TransportRoute.id,
+            TransportRoute.start_city_id,
+            TransportRoute.end_city_id,
+            TransportRoute.distance,
+            TransportRoute.average_duration,
+            TransportRoute.average_cost,
+        ))).all()
+        cities = (await db.execute(
+            select(City.id, City.latitude, City.longitude).where(City.latitude != None, City.longitude != None)
+        )).all()
+
+        edges = [
+            RouteEdge(
+                id=r.id,
+                start_city_id=r.start_city_id,
+                end_city_id=r.end_city_id,
+                distance=r.distance or 0,
+                average_duration=r.average_duration or 0,
+                average_cost=r.average_cost or 0,
+            )
+            for r in routes
+        ]
+        return cls(edges, {c.id: (c.latitude, c.longitude) for c in cities})
+
+    def get_edge(self, route_id: int) -> Optional[RouteEdge]:
+        return self.edges.get(route_id)
+
+    def shortest_path(self, start_city_id: int, end_city_id: int, weight_property: str = "distance") -> List[Tuple[int, int]]:
+        """
+        Find the weighted shortest path between two cities.
+        Uses A* with a great-circle heuristic when weighting by distance and plain Dijkstra otherwise.
+        Returns list of (route_id, next_city_id) for each hop along the path, same as CityGraphRepository.shortest_path.
+        """
+        if weight_property not in WEIGHT_PROPERTIES:
+            raise ValueError(f"Unsupported weight property: {weight_property}")
+        if start_city_id == end_city_id or start_city_id not in self.adjacency or end_city_id not in self.adjacency:
+            return []
+
+        heuristic = self._heuristic(end_city_id) if weight_property == "distance" else (lambda _: 0.0)
+
+        best: Dict[int, float] = {start_city_id: 0.0}
+        came_from: Dict[int, Tuple[int, RouteEdge]] = {}
+        heap = [(heuristic(start_city_id), 0.0, start_city_id)]
+
+        while heap:
+            _, cost, city_id = heapq.heappop(heap)
+            if cost > best.get(city_id, math.inf):
+                continue  # stale heap entry
+            if city_id == end_city_id:
+                break
+
+            for edge in self.adjacency.get(city_id, []):
+                neighbour = edge.other(city_id)
+                new_cost = cost + getattr(edge, weight_property)
+                if new_cost < best.get(neighbour, math.inf):
+                    best[neighbour] = new_cost
+                    came_from[neighbour] = (city_id, edge)
+                    heapq.heappush(heap, (new_cost + heuristic(neighbour), new_cost, neighbour))
+
+        if end_city_id not in came_from:
+            return []
+
+        path = []
+        city_id = end_city_id
+        while city_id != start_city_id:
+            prev_city_id, edge = came_from[city_id]
+            path.append((edge.id, city_id))
+            city_id = prev_city_id
+        path.reverse()
+        return path
+
+    def path_totals(self, path: List[Tuple[int, int]]) -> Dict[str, float]:
+        """Sum distance, duration and cost over a path returned by shortest_path."""
+        totals = {"distance": 0.0, "duration": 0.0, "cost": 0.0}
+        for route_id, _ in path:
+            edge = self.edges[route_id]
+            totals["distance"] += edge.distance
+            totals["duration"] += edge.average_duration
+            totals["cost"] += edge.average_cost
+        return totals
+
+    def _heuristic_scale(self) -> float:
+        """
+        Largest factor that keeps the great-circle heuristic under every route's distance.
+        Route distances aren't always longer than the straight line (rounded or misplaced seed data),
+        scaling by the smallest ratio keeps A* admissible and consistent, 0 makes it plain Dijkstra.
+        A route to a city without coordinates can't be bounded, so it also falls back to Dijkstra.
+        """
+        scale = 1.0
+        for edge in self.edges.values():
+            start, end = self.coordinates.get(edge.start_city_id), self.coordinates.get(edge.end_city_id)
+            if not start or not end:
+                return 0.0
+            straight = haversine(start[0], start[1], end[0], end[1])
+            if straight > 0:
+                scale = min(scale, edge.distance / straight)
+        return max(scale, 0.0)
+
+    def _heuristic(self, end_city_id: int):
+        target = self.coordinates.get(end_city_id)
+        if not target or self.heuristic_scale == 0:
+            return lambda _: 0.0
+
+        def estimate(city_id: int) -> float:
+            coords = self.coordinates.get(city_id)
+            if not coords:
+                return 0.0
+            return haversine(coords[0], coords[1], target[0], target[1]) * self.heuristic_scale
+
+        return estimate
@@ -0,0 +1,93 @@
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from app.modules.transport_route.engine import WEIGHT_PROPERTIES, RouteGraph
+
+NO_HOP = -1
+
+
+class RoutePathTable:
+    """
+    Precomputed all-pairs shortest paths over the route network, one table per weight property.
+    Paths are reconstructed from next-hop matrices so each lookup is O(path length).
+    """
+
+    def __init__(self, graph: RouteGraph, city_ids: List[int], next_hop: Dict[str, np.ndarray], hop_edge: Dict[str, np.ndarray], cost: Dict[str, np.ndarray]):
+        self.graph = graph
+        self.city_ids = city_ids
+        self.city_index = {city_id: i for i, city_id in enumerate(city_ids)}
+        self.next_hop = next_hop
+        self.hop_edge = hop_edge
+        self.cost = cost
+
+    @classmethod
+    def build(cls, graph: RouteGraph, weight_properties: Tuple[str, ...] = WEIGHT_PROPERTIES) -> "RoutePathTable":
+        """Run a vectorised Floyd–Warshall for each weight property. CPU bound, call it off the event loop."""
+        city_ids = sorted(graph.adjacency.keys())
+        index = {city_id: i for i, city_id in enumerate(city_ids)}
+        n = len(city_ids)
+
+        next_hop, hop_edge, cost = {}, {}, {}
+        for weight_property in weight_properties:
+            dist = np.full((n, n), np.inf)
+            np.fill_diagonal(dist, 0)
+            edge_ids = np.full((n, n), NO_HOP, dtype=np.int64)
+
+            # Keep the cheapest direct route between every pair of cities
+            for edge in graph.edges.values():
+                i, j = index[edge.start_city_id], index[edge.end_city_id]
+                if i == j:
+                    continue
+                weight = getattr(edge, weight_property)
+                if weight < dist[i, j]:
+                    dist[i, j] = dist[j, i] = weight
+                    edge_ids[i, j] = edge_ids[j, i] = edge.id
+
+            nxt = np.where(edge_ids != NO_HOP, np.arange(n)[None, :], NO_HOP)
+            for k in range(n):
+                through_k = dist[:, k, None] + dist[None, k, :]
+                improved = through_k < dist
+                if improved.any():
+                    dist = np.where(improved, through_k, dist)
+                    nxt = np.where(improved, nxt[:, k, None], nxt)
+
+            next_hop[weight_property] = nxt
+            hop_edge[weight_property] = edge_ids
+            cost[weight_property] = dist
+
+        return cls(graph, city_ids, next_hop, hop_edge, cost)
+
+    def shortest_path(self, start_city_id: int, end_city_id: int, weight_property: str = "distance") -> List[Tuple[int, int]]:
+        """
+        Returns list of (route_id, next_city_id) for each hop along the path,
+        same shape as RouteGraph.shortest_path.
+        """
+        if weight_property not in self.next_hop:
+            raise ValueError(f"Unsupported weight property: {weight_property}")
+        i = self.city_index.get(start_city_id)
+        j = self.city_index.get(end_city_id)
+        if i is None or j is None or i == j:
+            return []
+
+        nxt = self.next_hop[weight_property]
+        edge_ids = self.hop_edge[weight_property]
+        if nxt[i, j] == NO_HOP:
+            return []
+
+        path = []
+        while i != j:
+            k = int(nxt[i, j])
+            path.append((int(edge_ids[i, k]), self.city_ids[k]))
+            i = k
+        return path
+
+    def path_cost(self, start_city_id: int, end_city_id: int, weight_property: str = "distance") -> float:
+        i = self.city_index.get(start_city_id)
+        j = self.city_index.get(end_city_id)
+        if i is None or j is None:
+            return float("inf")
+        return float(self.cost[weight_property][i, j])
+
+    def path_totals(self, path: List[Tuple[int, int]]) -> Dict[str, float]:
+        return self.graph.path_totals(path)
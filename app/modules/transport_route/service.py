@@ -0,0 +1,83 @@
+import asyncio
+import time
+from typing import Optional, Union
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database.redis_cache import get_redis_cache_instance
+from app.modules.transport_route.engine import RouteGraph
+from app.modules.transport_route.path_table import RoutePathTable
+
+
+class RouteGraphStore:
+    """
+    Process-wide holder of the RouteGraph and its all-pairs RoutePathTable.
+    The graph is loaded lazily and rebuilt once the route version counter in Redis moves, `invalidate`
+    bumps it so every worker reloads on its next query. Without Redis the graph is refreshed after
+    `ttl` seconds. The path table is rebuilt in a background thread and swapped in once ready, until
+    then queries run A* on the graph.
+    """
+
+    def __init__(self, ttl: float = 300):
+        self.ttl = ttl
+        self._graph: Optional[RouteGraph] = None
+        self._table: Optional[RoutePathTable] = None
+        self._loaded_at = 0.0
+        self._version: Optional[int] = None
+        self._build_task: Optional[asyncio.Task] = None
+
+    async def get(self, db: AsyncSession) -> RouteGraph:
+        # Read the version before loading, a change made during the load is picked up by the next query
+        version = await self._shared_version()
+        if not self._is_fresh(version):
+            self._graph = await RouteGraph.load(db)
+            self._loaded_at = time.monotonic()
+            self._version = version
+        return self._graph
+
+    async def get_paths(self, db: AsyncSession) -> Union[RoutePathTable, RouteGraph]:
+        """
+        Get the fastest available path finder for the current graph.
+        Both returned types expose `shortest_path` and `path_totals`.
+        """
+        graph = await self.get(db)
+        table = self._table
+        if table is not None and table.graph is graph:
+            return table
+        if self._build_task is None or self._build_task.done():
+            self._build_task = asyncio.create_task(self._build_table(graph))
+        return graph
+
+    async def invalidate(self):
+        """Drop the graph of this process and bump the shared version so other workers reload theirs"""
+        self._graph = None
+        cache = get_redis_cache_instance("route_graph")
+        if cache:
+            await cache.incr("version")
+
+    async def _build_table(self, graph: RouteGraph):
+        try:
+            table = await asyncio.to_thread(RoutePathTable.build, graph)
+        except Exception as e:
+            print(f"Failed to build route path table: {e}")
+            return
+        # Discard the result if routes changed while building
+        if self._graph is graph:
+            self._table = table
+
+    async def _shared_version(self) -> Optional[int]:
+        cache = get_redis_cache_instance("route_graph")
+        if not cache:
+            return None
+        version = await cache.get("version")
+        return int(version) if version is not None else 0
+
+    def _is_fresh(self, version: Optional[int]) -> bool:
+        return (
+            self._graph is not None
+            and version == self._version
+            and time.monotonic() - self._loaded_at < self.ttl
+        )
+
+
+route_graph_store = RouteGraphStore()
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, Float, Enum, String, Table
+from sqlalchemy import Column, Index, Integer, ForeignKey, Float, Enum, String, Table
 from sqlalchemy.orm import relationship
 
 from app.database.database import Base
@@ -40,6 +40,12 @@ class TransportService(Base):
         order_by='TransportServiceRouteSegment.index',
         cascade='all, delete-orphan'
     )
+    city_coverage = relationship(
+        'TransportServiceCityCoverage',
+        back_populates='service',
+        cascade='all, delete-orphan',
+        passive_deletes=True
+    )
 
 
 class TransportServiceRouteSegment(Base):
@@ -52,3 +58,18 @@ class TransportServiceRouteSegment(Base):
 
     service = relationship('TransportService', back_populates='route_segments')
     route = relationship('TransportRoute')
+
+
+class TransportServiceCityCoverage(Base):
+    """Cities a service passes through, `position` is the order along the service path (0 is the start city)"""
+    __tablename__ = 'transport_service_city_coverage'
+
+    service_id = Column(Integer, ForeignKey('transport_services.id', ondelete='CASCADE'), primary_key=True)
+    position = Column(Integer, primary_key=True)
+    city_id = Column(Integer, ForeignKey('cities.id'), nullable=False)
+
+    __table_args__ = (
+        Index('ix_transport_service_city_coverage_city_service', 'city_id', 'service_id', 'position'),
+    )
+
+    service = relationship('TransportService', back_populates='city_coverage')
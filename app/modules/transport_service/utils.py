@@ -1,3 +1,5 @@
+from typing import List, Sequence, Tuple
+
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.modules.storage.repository import ImageRepository
 from app.modules.storage.schema import ImageRead
@@ -7,4 +9,29 @@ from app.modules.transport_service.schema import TransportServiceCategoryEnum
 async def get_image_from_transport_service_category(db: AsyncSession, category: TransportServiceCategoryEnum):
     image_repo = ImageRepository(db)
     image = await image_repo.get(1)
-    return ImageRead.model_validate(image, from_attributes=True)
\ No newline at end of file
+    return ImageRead.model_validate(image, from_attributes=True)
+
+
+def get_service_path_cities(routes: Sequence[Tuple[int, int]]) -> List[int]:
+    """
+    Cities visited by a service in order, from its routes as (start_city_id, end_city_id) in segment order.
+    Routes are undirected, the first route is oriented towards the second one.
+    Raises ValueError when consecutive routes don't share a city.
+    """
+    if not routes:
+        return []
+
+    first_start, first_end = routes[0]
+    if len(routes) > 1 and first_start in routes[1]:
+        path = [first_end, first_start]
+    else:
+        path = [first_start, first_end]
+
+    for start_city_id, end_city_id in routes[1:]:
+        if path[-1] == start_city_id:
+            path.append(end_city_id)
+        elif path[-1] == end_city_id:
+            path.append(start_city_id)
+        else:
+            raise ValueError("Invalid route index")
+    return path
@@ -27,4 +27,4 @@ class UserRepository(BaseRepository[User, UserCreate]):
         if activities:
             values = [{"user_id": user_id, "activities_id": act_id} for act_id in activities]
             await self.db.execute(insert(user_prefer_place_activities).values(values))
-        await self.db.commit()
\ No newline at end of file
+        await self._commit()
\ No newline at end of file
@@ -0,0 +1,152 @@
+"""
+Keeps place and city embeddings in sync with their content.
+
+A place is embedded from its description, a city is the mean of its places' embeddings (as in the seeder).
+Each row stores the hash of the content its embedding was computed from, rows whose hash didn't change
+are skipped, so running this again is cheap.
+
+    python -m app.utils.embedding_sync                  # re-embed everything that changed
+    python -m app.utils.embedding_sync --batch-size 128 --force
+"""
+import argparse
+import asyncio
+import hashlib
+from typing import Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.all_models import *
+from app.database.database import SessionLocal, engine
+from app.modules.cities.models import City
+from app.modules.places.models import Place
+from app.utils.embeddings import embedding_service, normalize_text
+
+REEMBED_BATCH_SIZE = 64
+
+
+def place_content_hash(description: Optional[str]) -> str:
+    content = f"{embedding_service.model_name}\n{normalize_text(description or '')}"
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def city_content_hash(place_hashes: Iterable[Tuple[int, Optional[str]]]) -> str:
+    content = "\n".join(f"{place_id}:{place_hash or ''}" for place_id, place_hash in sorted(place_hashes))
+    return hashlib.sha256(f"{embedding_service.model_name}\n{content}".encode("utf-8")).hexdigest()
+
+
+async def reembed_places(
+    db: AsyncSession,
+    place_ids: Optional[List[int]] = None,
+    batch_size: int = REEMBED_BATCH_SIZE,
+    force: bool = False,
+) -> Tuple[int, Set[int]]:
+    """
+    Embed places whose description changed, walking the table by id in batches and committing each batch.
+    Returns how many places were updated and the ids of the cities of every place looked at, a place that
+    moved to another city keeps its embedding but the city's mean still changes.
+    """
+    updated, city_ids, last_id = 0, set(), 0
+    while True:
+        query = select(Place.id, Place.city_id, Place.description, Place.embedding_hash).where(Place.id > last_id)
+        if place_ids is not None:
+            query = query.where(Place.id.in_(place_ids))
+        rows = (await db.execute(query.order_by(Place.id).limit(batch_size))).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+        city_ids.update(row.city_id for row in rows)
+
+        changed = [(row, place_content_hash(row.description)) for row in rows]
+        changed = [(row, content_hash) for row, content_hash in changed if force or content_hash != row.embedding_hash]
+        if changed:
+            texts = [normalize_text(row.description or "") for row, _ in changed]
+            vectors = await embedding_service.embed_many(texts)
+            await db.execute(update(Place), [
+                {"id": row.id, "embedding": vector if text else None, "embedding_hash": content_hash}
+                for (row, content_hash), text, vector in zip(changed, texts, vectors)
+            ])
+            await db.commit()
+            updated += len(changed)
+    return updated, city_ids
+
+
+async def reembed_cities(
+    db: AsyncSession,
+    city_ids: Optional[List[int]] = None,
+    batch_size: int = REEMBED_BATCH_SIZE,
+    force: bool = False,
+) -> int:
+    """Recompute city embeddings whose places changed, returns how many cities were updated"""
+    updated, last_id = 0, 0
+    while True:
+        query = select(City.id, City.embedding_hash).where(City.id > last_id)
+        if city_ids is not None:
+            query = query.where(City.id.in_(city_ids))
+        cities = (await db.execute(query.order_by(City.id).limit(batch_size))).all()
+        if not cities:
+            break
+        last_id = cities[-1].id
+
+        places = (await db.execute(
+            select(Place.city_id, Place.id, Place.embedding_hash, Place.embedding)
+            .where(Place.city_id.in_([city.id for city in cities]), Place.embedding.isnot(None))
+        )).all()
+        by_city = {}
+        for place in places:
+            by_city.setdefault(place.city_id, []).append(place)
+
+        changes = []
+        for city in cities:
+            city_places = by_city.get(city.id, [])
+            content_hash = city_content_hash((place.id, place.embedding_hash) for place in city_places)
+            if not force and content_hash == city.embedding_hash:
+                continue
+            embedding = np.mean([np.array(place.embedding) for place in city_places], axis=0).tolist() if city_places else None
+            changes.append({"id": city.id, "embedding": embedding, "embedding_hash": content_hash})
+        if changes:
+            await db.execute(update(City), changes)
+            await db.commit()
+            updated += len(changes)
+    return updated
+
+
+async def run_reembed(place_ids: Optional[List[int]] = None, city_ids: Optional[List[int]] = None):
+    """
+    Body of the `reembed_content` celery task, re-embeds the given places and then their cities together
+    with `city_ids`. Runs on the worker's long-lived loop (app.core.worker_loop), which owns the connections.
+    """
+    async with SessionLocal() as db:
+        city_ids = {city_id for city_id in city_ids or [] if city_id is not None}
+        if place_ids:
+            updated, place_city_ids = await reembed_places(db, place_ids)
+            city_ids |= place_city_ids
+            print(f"Re-embedded {updated} of {len(place_ids)} places")
+        if city_ids:
+            updated = await reembed_cities(db, list(city_ids))
+            print(f"Re-embedded {updated} of {len(city_ids)} cities")
+
+
+async def reembed_all(batch_size: int, force: bool):
+    try:
+        async with SessionLocal() as db:
+            updated, _ = await reembed_places(db, batch_size=batch_size, force=force)
+            print(f"Re-embedded {updated} places")
+            updated = await reembed_cities(db, batch_size=batch_size, force=force)
+            print(f"Re-embedded {updated} cities")
+    finally:
+        await embedding_service.stop()
+        await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=REEMBED_BATCH_SIZE)
+    parser.add_argument("--force", action="store_true", help="Re-embed every row, even unchanged ones")
+    args = parser.parse_args()
+    asyncio.run(reembed_all(args.batch_size, args.force))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,266 @@
+import asyncio
+import base64
+import hashlib
+import threading
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import suppress
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+import numpy as np
 from sentence_transformers import SentenceTransformer
 
-def get_embedding(text: str) -> list[float]:
-    model = SentenceTransformer("all-MiniLM-L6-v2")
+from app.core.config import settings
+from app.database.redis_cache import RedisCache, get_redis_cache_instance
+from app.utils.lru_cache import LRUCache
+
+EMBEDDING_DIMENSION = 384
+
+
+def normalize_text(text: str) -> str:
+    """Unicode and whitespace normalized text, texts that only differ in spacing share an embedding"""
+    return " ".join(unicodedata.normalize("NFKC", text).split())
+
+
+def pack_vector(vector: list[float]) -> str:
+    """float32 bytes of a vector, base64 wrapped since the shared Redis client decodes responses"""
+    return base64.b64encode(np.asarray(vector, dtype=np.float32).tobytes()).decode("ascii")
+
+
+def unpack_vector(value: str) -> list[float]:
+    return np.frombuffer(base64.b64decode(value), dtype=np.float32).tolist()
+
+
+@dataclass
+class EmbeddingCacheMetrics:
+    local_hits: int = 0
+    redis_hits: int = 0
+    misses: int = 0
+    redis_errors: int = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        lookups = self.local_hits + self.redis_hits + self.misses
+        return {
+            "local_hits": self.local_hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "redis_errors": self.redis_errors,
+            "hit_rate": (self.local_hits + self.redis_hits) / lookups if lookups else 0.0,
+        }
+
+
+class EmbeddingService:
+    """
+    Process-wide sentence embedding service.
+
+    The model is loaded once and every encode runs on a dedicated worker thread so the
+    event loop is never blocked. Concurrent `embed` calls are coalesced into micro-batches.
+
+    Embeddings are cached in two levels keyed by model name and the hash of the normalized text:
+    an in-process LRU, then Redis (shared by every worker and kept across restarts) as float32 bytes.
+    The synchronous `encode` helpers only use the in-process level.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        batch_size: int = 32,
+        batch_wait_ms: float = 5,
+        cache_size: int = 1024,
+        redis_ttl: Optional[int] = None,
+    ):
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait_ms / 1000
+        self.cache = LRUCache(maxsize=cache_size)
+        self.redis_ttl = redis_ttl
+        self.metrics = EmbeddingCacheMetrics()
+        self._model: Optional[SentenceTransformer] = None
+        self._model_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="embedding")
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    @property
+    def model(self) -> SentenceTransformer:
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    self._model = SentenceTransformer(self.model_name)
+        return self._model
+
+    async def start(self):
+        """Load the model off the event loop and start the batching worker."""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor, lambda: self.model)
+        self._ensure_worker()
+
+    async def stop(self):
+        """Stop the batching worker, pending requests are cancelled."""
+        if self._worker:
+            self._worker.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._worker
+        self._worker = None
+        self._queue = None
+        self._loop = None
 
-    if not text:
-        return [0.0] * 384  
-    return model.encode(text, convert_to_numpy=True).tolist()
+    async def embed(self, text: str) -> list[float]:
+        """Embed a single text, batched together with other concurrent requests."""
+        return (await self.embed_many([text]))[0]
+
+    async def embed_many(self, texts: List[str]) -> List[list[float]]:
+        """Embed several texts, looking them up in both cache levels before using the model."""
+        results: List[Optional[list[float]]] = [None] * len(texts)
+        missing: dict[str, List[int]] = {}
+        for i, text in enumerate(texts):
+            text = normalize_text(text) if text else ""
+            if not text:
+                results[i] = [0.0] * EMBEDDING_DIMENSION
+                continue
+            cached = self.cache.get(self.cache_key(text))
+            if cached is not None:
+                self.metrics.local_hits += 1
+                results[i] = cached
+            else:
+                missing.setdefault(text, []).append(i)
+        if not missing:
+            return results
+
+        redis = get_redis_cache_instance("embedding")
+        pending = list(missing.keys())
+        stored = await self._redis_get(redis, pending)
+        for text, value in zip(pending, stored):
+            if value is None:
+                continue
+            self.metrics.redis_hits += len(missing[text])
+            vector = unpack_vector(value)
+            self.cache.set(self.cache_key(text), vector)
+            for i in missing.pop(text):
+                results[i] = vector
+        if not missing:
+            return results
+
+        self.metrics.misses += sum(len(indexes) for indexes in missing.values())
+        self._ensure_worker()
+        futures = []
+        for text in missing:
+            future = self._loop.create_future()
+            await self._queue.put((text, future))
+            futures.append(future)
+        vectors = await asyncio.gather(*futures)
+        for text, vector in zip(missing, vectors):
+            for i in missing[text]:
+                results[i] = vector
+        await self._redis_set(redis, dict(zip(missing, vectors)))
+        return results
+
+    def cache_key(self, normalized_text: str) -> str:
+        return f"{self.model_name}:{hashlib.sha256(normalized_text.encode('utf-8')).hexdigest()}"
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return self.metrics.snapshot()
+
+    def reset_metrics(self):
+        self.metrics = EmbeddingCacheMetrics()
+
+    async def _redis_get(self, redis: Optional[RedisCache], texts: List[str]) -> List[Optional[str]]:
+        if not redis:
+            return [None] * len(texts)
+        try:
+            return await redis.client.mget([f"{redis.namespace}{self.cache_key(text)}" for text in texts])
+        except Exception as e:
+            self.metrics.redis_errors += 1
+            print(f"Embedding cache read failed: {e}")
+            return [None] * len(texts)
+
+    async def _redis_set(self, redis: Optional[RedisCache], vectors: Dict[str, list[float]]):
+        if not redis:
+            return
+        try:
+            async with redis.client.pipeline(transaction=False) as pipe:
+                for text, vector in vectors.items():
+                    pipe.set(f"{redis.namespace}{self.cache_key(text)}", pack_vector(vector), ex=self.redis_ttl)
+                await pipe.execute()
+        except Exception as e:
+            self.metrics.redis_errors += 1
+            print(f"Embedding cache write failed: {e}")
+
+    def encode_batch(self, texts: List[str]) -> List[list[float]]:
+        """Encode texts synchronously, only sending uncached, non-empty texts to the model."""
+        results: List[Optional[list[float]]] = [None] * len(texts)
+        missing: dict[str, List[int]] = {}
+        for i, text in enumerate(texts):
+            text = normalize_text(text) if text else ""
+            if not text:
+                results[i] = [0.0] * EMBEDDING_DIMENSION
+                continue
+            cached = self.cache.get(self.cache_key(text))
+            if cached is not None:
+                results[i] = cached
+            else:
+                missing.setdefault(text, []).append(i)
+
+        if missing:
+            pending = list(missing.keys())
+            vectors = self.model.encode(pending, batch_size=self.batch_size, convert_to_numpy=True)
+            for text, vector in zip(pending, vectors):
+                vector = vector.tolist()
+                self.cache.set(self.cache_key(text), vector)
+                for i in missing[text]:
+                    results[i] = vector
+        return results
+
+    def encode(self, text: str) -> list[float]:
+        """Encode a single text synchronously."""
+        return self.encode_batch([text])[0]
+
+    def _ensure_worker(self):
+        loop = asyncio.get_running_loop()
+        if self._worker is None or self._worker.done() or self._loop is not loop:
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run_batches())
+
+    async def _run_batches(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.batch_wait
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            texts = [text for text, _ in batch]
+            try:
+                vectors = await loop.run_in_executor(self._executor, self.encode_batch, texts)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            for (_, future), vector in zip(batch, vectors):
+                if not future.done():
+                    future.set_result(vector)
+
+
+embedding_service = EmbeddingService(
+    model_name=settings.EMBEDDING_MODEL,
+    batch_size=settings.EMBEDDING_BATCH_SIZE,
+    batch_wait_ms=settings.EMBEDDING_BATCH_WAIT_MS,
+    cache_size=settings.EMBEDDING_CACHE_SIZE,
+    redis_ttl=settings.EMBEDDING_REDIS_TTL,
+)
+
+
+def get_embedding(text: str) -> list[float]:
+    """Synchronous embedding helper (used by the seeders), shares the process-wide model."""
+    return embedding_service.encode(text)
@@ -0,0 +1,52 @@
+from typing import Any, Dict, List, Optional
+
+MEMO_ATTR = "_ordered_chain_memo"
+
+
+def _fingerprint(items: List[Any], next_attr: str) -> tuple:
+    return tuple((item.id, getattr(item, next_attr)) for item in items)
+
+
+def ordered_chain(owner: Any, collection_attr: str, next_attr: str) -> List[Any]:
+    """
+    Order a collection linked through `next_attr` pointers and set `.index` on every item.
+    The result is memoized on the owner and reused until an item is added, removed or re-linked.
+    """
+    items = getattr(owner, collection_attr)
+    fingerprint = _fingerprint(items, next_attr)
+    memo: Dict[str, tuple] = owner.__dict__.setdefault(MEMO_ATTR, {})
+    cached = memo.get(collection_attr)
+    if cached and cached[0] == fingerprint:
+        return list(cached[1])
+
+    items_map = {item.id: item for item in items}
+    next_ids = {getattr(item, next_attr) for item in items if getattr(item, next_attr)}
+    current = next((item for item in items if item.id not in next_ids), None)
+
+    ordered = []
+    seen = set()
+    while current and current.id not in seen:
+        seen.add(current.id)
+        current.index = len(ordered)
+        ordered.append(current)
+        current = items_map.get(getattr(current, next_attr))
+
+    memo[collection_attr] = (fingerprint, ordered)
+    return list(ordered)
+
+
+def seed_chain(owner: Any, collection_attr: str, next_attr: str, ordered_ids: List[int]) -> Optional[List[Any]]:
+    """
+    Seed the ordered_chain memo from an order computed elsewhere (e.g. in SQL).
+    Items missing from `ordered_ids` fall back to a regular walk on next access.
+    """
+    items = getattr(owner, collection_attr)
+    items_map = {item.id: item for item in items}
+    if set(ordered_ids) != set(items_map):
+        return None
+
+    ordered = [items_map[item_id] for item_id in ordered_ids]
+    for i, item in enumerate(ordered):
+        item.index = i
+    owner.__dict__.setdefault(MEMO_ATTR, {})[collection_attr] = (_fingerprint(items, next_attr), ordered)
+    return list(ordered)
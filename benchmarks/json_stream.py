@@ -0,0 +1,119 @@
+"""
+Compare the old re-parse-everything structured streaming with IncrementalJSONParser.
+
+    python -m benchmarks.json_stream                          # synthetic city plans of growing size
+    python -m benchmarks.json_stream --file response.txt      # a recorded LLM response (JSON array of days)
+
+Responses are replayed in small chunks, like tokens coming from the provider. Both loops validate
+AgentPlanDay / AgentPlanDayStep the way their callers did.
+"""
+import argparse
+import json
+import random
+import time
+
+from pydantic import ValidationError
+
+from app.core.json_stream import IncrementalJSONParser
+from app.core.llm import LLM
+from app.modules.ai.agent.planner import CITY_PLAN_PATHS
+from app.modules.ai.agent.schema import AgentPlanDay, AgentPlanDayStep
+
+
+def synthetic_response(n_days: int, steps_per_day: int, seed: int) -> str:
+    rng = random.Random(seed)
+    days = []
+    for day in range(1, n_days + 1):
+        steps = []
+        for _ in range(steps_per_day):
+            category = rng.choice(["visit", "activity"])
+            steps.append({
+                "category": category,
+                "place_id": rng.randint(1, 5000),
+                "place": f"Place {rng.randint(1, 5000)} near the old bazaar",
+                "place_activity_id": rng.randint(1, 9000) if category == "activity" else None,
+                "activity": "Boating" if category == "activity" else None,
+            })
+        days.append({"day": day, "title": f"Day {day}: exploring the valley", "steps": steps})
+    return "```json\n" + json.dumps(days, indent=2) + "\n```"
+
+
+def chunked(text: str, seed: int):
+    rng = random.Random(seed)
+    i = 0
+    while i < len(text):
+        n = rng.randint(2, 8)
+        yield text[i:i + n]
+        i += n
+
+
+def old_loop(chunks):
+    """Body of the previous LLM.get_structured_stream"""
+    buffer, last_yielded, yields = "", None, 0
+    for chunk in chunks:
+        buffer += chunk
+        partial_json = LLM._try_make_valid_json(buffer)
+        if partial_json is not None and partial_json != last_yielded:
+            try:
+                if isinstance(partial_json, list):
+                    [AgentPlanDay.model_validate(item) for item in partial_json]
+                else:
+                    AgentPlanDay.model_validate(partial_json)
+            except Exception:
+                continue
+            yields += 1
+            last_yielded = partial_json
+    return yields
+
+
+def new_loop(chunks):
+    parser = IncrementalJSONParser(CITY_PLAN_PATHS)
+    fragments = 0
+    for chunk in chunks:
+        for (_, field, *_), value in parser.feed(chunk):
+            if field == "steps":
+                try:
+                    AgentPlanDayStep.model_validate(value)
+                except ValidationError:
+                    continue
+            fragments += 1
+    return fragments
+
+
+def measure(fn, chunks):
+    t = time.perf_counter()
+    result = fn(chunks)
+    return (time.perf_counter() - t) * 1000, result
+
+
+def run(name: str, text: str, seed: int, skip_old: bool):
+    chunks = list(chunked(text, seed))
+    new_ms, fragments = measure(new_loop, chunks)
+    line = f"{name:<18} {len(text):>8} chars {len(chunks):>6} chunks   incremental {new_ms:9.1f} ms ({fragments} fragments)"
+    if not skip_old:
+        old_ms, yields = measure(old_loop, chunks)
+        line += f"   re-parse {old_ms:9.1f} ms ({yields} yields)   x{old_ms / max(new_ms, 1e-6):.0f}"
+    print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--file", action="append")
+    parser.add_argument("--days", type=int, nargs="+", default=[3, 10, 30])
+    parser.add_argument("--steps", type=int, default=6)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--skip-old", action="store_true", help="only time the incremental parser")
+    args = parser.parse_args()
+
+    if args.file:
+        for path in args.file:
+            with open(path) as f:
+                run(path, f.read(), args.seed, args.skip_old)
+        return
+
+    for n_days in args.days:
+        run(f"{n_days} days", synthetic_response(n_days, args.steps, args.seed), args.seed, args.skip_old)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Latency of the hybrid (trigram + embedding + distance) place search over a synthetic catalogue.
+
+    python -m benchmarks.place_search                       # 100k synthetic places
+    python -m benchmarks.place_search --size 20000 --queries 50
+
+Synthetic places (names, clustered random embeddings, points inside Nepal) are inserted in a transaction
+that is rolled back at the end. Query embeddings are random too, so the sentence model isn't needed.
+Needs the database from docker-compose to be running, with the migrations applied.
+"""
+import argparse
+import asyncio
+import math
+import random
+import statistics
+import time
+
+from sqlalchemy import insert, select, text
+
+from app.core.all_models import *
+from app.database.database import SessionLocal, engine
+from app.modules.places.models import Place
+from app.modules.places.repository import PlaceRepository
+from app.modules.places.schema import PlaceCategoryEnum
+from app.utils.embeddings import EMBEDDING_DIMENSION
+
+from benchmarks.similar_search import synthetic_name, typo
+
+# Rough bounding box of Nepal
+LAT_RANGE = (26.4, 30.4)
+LNG_RANGE = (80.1, 88.2)
+N_CLUSTERS = 200
+
+
+def unit(vector: list[float]) -> list[float]:
+    norm = math.sqrt(sum(x * x for x in vector)) or 1.0
+    return [x / norm for x in vector]
+
+
+def report(name: str, timings: list[float], hits: list[int]):
+    timings = sorted(timings)
+    p95 = timings[max(int(len(timings) * 0.95) - 1, 0)]
+    print(f"  {name:<30} mean {statistics.mean(timings) * 1000:8.2f} ms   p95 {p95 * 1000:8.2f} ms   avg results {statistics.mean(hits):5.1f}")
+
+
+async def run(size: int, n_queries: int, page_size: int, seed: int):
+    rng = random.Random(seed)
+    centers = [unit([rng.gauss(0, 1) for _ in range(EMBEDDING_DIMENSION)]) for _ in range(N_CLUSTERS)]
+    categories = list(PlaceCategoryEnum)
+
+    def embedding():
+        return unit([x + rng.gauss(0, 0.35) for x in rng.choice(centers)])
+
+    async with SessionLocal() as db:
+        city_ids = (await db.execute(select(City.id))).scalars().all()
+        names = [synthetic_name(rng) for _ in range(size)]
+        for i in range(0, size, 2000):
+            await db.execute(insert(Place), [
+                {
+                    "name": name,
+                    "categories": [rng.choice(categories)],
+                    "latitude": rng.uniform(*LAT_RANGE),
+                    "longitude": rng.uniform(*LNG_RANGE),
+                    "city_id": rng.choice(city_ids),
+                    "embedding": embedding(),
+                }
+                for name in names[i:i + 2000]
+            ])
+        # Core inserts skip the ORM listeners that fill in the location
+        await db.execute(text("UPDATE places SET location = ST_SetSRID(ST_MakePoint(longitude, latitude), 4326)::geography WHERE location IS NULL"))
+        print(f"{size} synthetic places, {n_queries} queries, page size {page_size}")
+
+        repository = PlaceRepository(db)
+        queries = [
+            {
+                "query": typo(rng, rng.choice(names)),
+                "embedding": embedding(),
+                "lat": rng.uniform(*LAT_RANGE),
+                "lng": rng.uniform(*LNG_RANGE),
+                "city_id": rng.choice(city_ids),
+                "category": rng.choice(categories),
+            }
+            for _ in range(n_queries)
+        ]
+        scenarios = {
+            "text": lambda q: dict(query=q["query"], embedding=q["embedding"]),
+            "point": lambda q: dict(lat=q["lat"], lng=q["lng"]),
+            "text + point": lambda q: dict(query=q["query"], embedding=q["embedding"], lat=q["lat"], lng=q["lng"]),
+            "text + point within 50 km": lambda q: dict(query=q["query"], embedding=q["embedding"], lat=q["lat"], lng=q["lng"], radius_km=50),
+            "text + city + category": lambda q: dict(query=q["query"], embedding=q["embedding"], city_id=q["city_id"], categories=[q["category"]]),
+            "text + point, page 5": lambda q: dict(query=q["query"], embedding=q["embedding"], lat=q["lat"], lng=q["lng"], offset=4 * page_size),
+        }
+
+        for name, make_kwargs in scenarios.items():
+            timings, hits = [], []
+            for q in queries:
+                kwargs = {"limit": page_size, **make_kwargs(q)}
+                t = time.perf_counter()
+                results, _ = await repository.hybrid_search(**kwargs)
+                timings.append(time.perf_counter() - t)
+                hits.append(len(results))
+                db.expunge_all()
+            report(name, timings, hits)
+
+        await db.rollback()
+    await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=30)
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    asyncio.run(run(args.size, args.queries, args.page_size, args.seed))
+
+
+if __name__ == "__main__":
+    main()
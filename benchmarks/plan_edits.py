@@ -0,0 +1,99 @@
+"""
+Count commits and statements of the multi-row plan edits, with and without the unit of work.
+
+    python -m benchmarks.plan_edits --plan-id 12
+
+Works on a private copy of the plan, which is deleted at the end:
+  duplicate   PlanRepository.duplicate_plan
+  delete      PlanDayStepService.delete of the first visit or activity step
+  undo        PlanCache.pop of a snapshot taken before the delete
+
+"per-call" runs the same code with every repository call committing on its own, as before
+the unit of work was introduced. Needs the database and Redis from docker-compose to be running.
+"""
+import argparse
+import asyncio
+
+from app.core.all_models import *
+from app.modules.places.models import Place
+from app.database.database import SessionLocal, engine
+from app.database.redis_cache import get_redis_cache_instance, redis_lifespan
+from app.modules.plan_day_steps.schema import PlanDayStepCategoryEnum
+from app.modules.plan_day_steps.service import PlanDayStepService
+from app.modules.plans.cache import PlanCache
+from app.modules.plans.repository import PlanRepository
+from benchmarks.utils import count_queries
+
+PLAN_RELATIONS = ["unordered_days.unordered_steps.route_hops"]
+
+
+def report(mode: str, flow: str, counter):
+    print(f"{mode:<14} {flow:<10} {counter.commits:>4} commits {counter.count:>5} statements")
+
+
+async def run_flows(plan_id: int, user_id: int, unit_of_work: bool):
+    mode = "unit of work" if unit_of_work else "per-call"
+    cache = get_redis_cache_instance("plan_edits_benchmark")
+
+    async with SessionLocal() as db:
+        repository = PlanRepository(db)
+        with count_queries(engine) as counter:
+            if unit_of_work:
+                copy = await repository.duplicate_plan(plan_id, user_id)
+            else:
+                copy = await repository._duplicate_plan(plan_id, user_id)
+                await db.commit()
+        report(mode, "duplicate", counter)
+        copy_id = copy.id
+
+    async with SessionLocal() as db:
+        plan_cache = PlanCache(db, cache)
+        await plan_cache.push(copy_id)
+        plan = await PlanRepository(db).get_ordered(copy_id, load_relations=PLAN_RELATIONS)
+        step = next((
+            s for day in plan.days for s in day.steps
+            if s.category != PlanDayStepCategoryEnum.transport
+        ), None)
+        if step:
+            service = PlanDayStepService(db)
+            with count_queries(engine) as counter:
+                if unit_of_work:
+                    await service.delete(step.id)
+                else:
+                    await service._delete(step.id)
+            report(mode, "delete", counter)
+
+    async with SessionLocal() as db:
+        plan_cache = PlanCache(db, cache)
+        plan = await PlanRepository(db).get_ordered(copy_id, load_relations=PLAN_RELATIONS)
+        with count_queries(engine) as counter:
+            if unit_of_work:
+                await plan_cache.pop(plan)
+            else:
+                await plan_cache._restore(plan, await cache.get(f"plan:{copy_id}"))
+        report(mode, "undo", counter)
+        await cache.delete(f"plan:{copy_id}")
+        await PlanRepository(db).delete(copy_id)
+
+
+async def run(plan_id: int):
+    async with redis_lifespan(None):
+        async with SessionLocal() as db:
+            plan = await PlanRepository(db).get(plan_id)
+            if not plan:
+                raise SystemExit(f"plan {plan_id} not found")
+            user_id = plan.user_id
+        for unit_of_work in (False, True):
+            await run_flows(plan_id, user_id, unit_of_work)
+    await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--plan-id", type=int, required=True)
+    args = parser.parse_args()
+    asyncio.run(run(args.plan_id))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Count statements per page of the plan listing endpoints.
+
+    python -m benchmarks.plan_listing --user-id 1
+    python -m benchmarks.plan_listing --user-id 1 --sizes 10 50 100
+
+The number of statements must not grow with the page size (no per-row is_saved / self_rating queries).
+Needs the database from docker-compose to be running.
+"""
+import argparse
+import asyncio
+import time
+
+from fastapi_pagination import Params
+
+from app.core.all_models import *
+from app.modules.places.models import Place
+from app.database.database import SessionLocal, engine
+from app.modules.plans.controller import PlanController
+from app.modules.plans.schema import PlanFilters
+from benchmarks.utils import count_queries
+
+
+async def measure(endpoint: str, user_id: int, size: int):
+    async with SessionLocal() as db:
+        controller = PlanController(db, user_id)
+        params = Params(page=1, size=size)
+        with count_queries(engine) as counter:
+            t = time.perf_counter()
+            if endpoint == "index":
+                response = await controller.index(params=params, filters=PlanFilters())
+            elif endpoint == "my_plans":
+                response = await controller.my_plans(params=params, filters=PlanFilters())
+            else:
+                response = await controller.saved_plans(params=params, filters=PlanFilters())
+            elapsed = (time.perf_counter() - t) * 1000
+    return len(response.data), counter.count, elapsed
+
+
+async def run(user_id: int, sizes: list[int]):
+    failures = 0
+    for endpoint in ("index", "my_plans", "saved_plans"):
+        counts = set()
+        for size in sizes:
+            rows, statements, elapsed = await measure(endpoint, user_id, size)
+            counts.add(statements)
+            print(f"{endpoint:<12} size {size:>4}: {rows:>4} rows -> {statements:>3} statements, {elapsed:7.1f} ms")
+        if len(counts) > 1:
+            failures += 1
+            print(f"{endpoint}: statement count grows with page size")
+    await engine.dispose()
+    if failures:
+        raise SystemExit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--user-id", type=int, required=True)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 50, 100])
+    args = parser.parse_args()
+    asyncio.run(run(args.user_id, args.sizes))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Count the round trips of PlanRepository.get_updated_plan.
+
+    python -m benchmarks.plan_materializer                # every plan in the database
+    python -m benchmarks.plan_materializer --plan-id 12   # a single plan
+
+The read path must stay at PlanMaterializer's fixed query budget whatever the plan size,
+plus one UPDATE when the derived fields (estimated cost, number of days, image) changed.
+Needs the database from docker-compose to be running.
+"""
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import func, select
+
+from app.core.all_models import *
+from app.modules.places.models import Place
+from app.database.database import SessionLocal, engine
+from app.modules.plan_day.models import PlanDay
+from app.modules.plan_day_steps.models import PlanDayStep
+from app.modules.plans.materializer import MAX_READ_QUERIES
+from app.modules.plans.repository import PlanRepository
+from benchmarks.utils import count_queries
+
+
+async def plan_sizes(plan_ids):
+    async with SessionLocal() as db:
+        stmt = (
+            select(Plan.id, func.count(func.distinct(PlanDay.id)), func.count(PlanDayStep.id))
+            .outerjoin(PlanDay, PlanDay.plan_id == Plan.id)
+            .outerjoin(PlanDayStep, PlanDayStep.plan_day_id == PlanDay.id)
+            .group_by(Plan.id)
+            .order_by(Plan.id)
+        )
+        if plan_ids:
+            stmt = stmt.where(Plan.id.in_(plan_ids))
+        return (await db.execute(stmt)).all()
+
+
+async def run(plan_ids):
+    failures = 0
+    for plan_id, n_days, n_steps in await plan_sizes(plan_ids):
+        async with SessionLocal() as db:
+            repository = PlanRepository(db)
+            # First build may write back stale derived fields, the second one is the steady state
+            await repository.get_updated_plan(plan_id, user_id=None)
+            with count_queries(engine) as counter:
+                t = time.perf_counter()
+                await repository.get_updated_plan(plan_id, user_id=None)
+                elapsed = (time.perf_counter() - t) * 1000
+
+        ok = counter.count <= MAX_READ_QUERIES
+        failures += not ok
+        print(f"plan {plan_id:>5}: {n_days:>3} days {n_steps:>4} steps -> {counter.count:>2} queries, {counter.commits} commits, {elapsed:7.1f} ms {'' if ok else 'FAIL'}")
+
+    await engine.dispose()
+    if failures:
+        raise SystemExit(f"{failures} plan(s) exceeded {MAX_READ_QUERIES} queries")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--plan-id", type=int, action="append")
+    args = parser.parse_args()
+    asyncio.run(run(args.plan_id))
+
+
+if __name__ == "__main__":
+    main()
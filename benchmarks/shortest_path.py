@@ -0,0 +1,115 @@
+"""
+Compare city-to-city shortest path lookups.
+
+    python -m benchmarks.shortest_path                 # synthetic network, in-memory engines only
+    python -m benchmarks.shortest_path --cities 500    # bigger synthetic network
+    python -m benchmarks.shortest_path --live          # routes from Postgres, also times Neo4j GDS
+
+--live needs the database and Neo4j from docker-compose to be running.
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+from app.modules.transport_route.engine import RouteEdge, RouteGraph
+from app.utils.geo import haversine
+from app.modules.transport_route.path_table import RoutePathTable
+
+WEIGHT_PROPERTY = "distance"
+
+
+def synthetic_graph(n_cities: int, degree: int, seed: int) -> RouteGraph:
+    rng = random.Random(seed)
+    coordinates = {i: (26.5 + rng.random() * 3.5, 80.0 + rng.random() * 8.0) for i in range(1, n_cities + 1)}
+    edges = []
+    for city_id in range(2, n_cities + 1):
+        for other_id in rng.sample(range(1, city_id), min(degree, city_id - 1)):
+            distance = haversine(*coordinates[city_id], *coordinates[other_id]) * rng.uniform(1.1, 1.6)
+            edges.append(RouteEdge(
+                id=len(edges) + 1,
+                start_city_id=city_id,
+                end_city_id=other_id,
+                distance=distance,
+                average_duration=distance / rng.uniform(20, 60),
+                average_cost=distance * rng.uniform(5, 20),
+            ))
+    return RouteGraph(edges, coordinates)
+
+
+def report(name: str, timings: list[float]):
+    timings = sorted(timings)
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(f"{name:<28} mean {statistics.mean(timings) * 1000:9.3f} ms   p95 {p95 * 1000:9.3f} ms")
+
+
+def time_sync(fn, pairs):
+    timings = []
+    for start, end in pairs:
+        t = time.perf_counter()
+        fn(start, end, WEIGHT_PROPERTY)
+        timings.append(time.perf_counter() - t)
+    return timings
+
+
+async def time_neo4j(pairs):
+    from app.database.graph_database import graph_db
+    from app.modules.cities.graph import CityGraphRepository
+    from app.modules.transport_route.graph import TransportRouteEdge
+
+    timings = []
+    async with graph_db.get_session() as session:
+        repository = CityGraphRepository(session)
+        # Warm up the GDS projection so it is not counted
+        await repository.shortest_path(*pairs[0], edge_type=TransportRouteEdge, weight_property=WEIGHT_PROPERTY)
+        for start, end in pairs:
+            t = time.perf_counter()
+            await repository.shortest_path(start, end, edge_type=TransportRouteEdge, weight_property=WEIGHT_PROPERTY)
+            timings.append(time.perf_counter() - t)
+    await graph_db.close()
+    return timings
+
+
+async def load_live_graph() -> RouteGraph:
+    from app.database.database import SessionLocal
+
+    async with SessionLocal() as db:
+        return await RouteGraph.load(db)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cities", type=int, default=300)
+    parser.add_argument("--degree", type=int, default=3)
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--live", action="store_true")
+    args = parser.parse_args()
+
+    graph = asyncio.run(load_live_graph()) if args.live else synthetic_graph(args.cities, args.degree, args.seed)
+    city_ids = list(graph.adjacency.keys())
+    print(f"{len(city_ids)} cities, {len(graph.edges)} routes")
+
+    t = time.perf_counter()
+    table = RoutePathTable.build(graph)
+    print(f"{'table build (3 weights)':<28} {(time.perf_counter() - t) * 1000:9.1f} ms")
+
+    rng = random.Random(args.seed)
+    pairs = [tuple(rng.sample(city_ids, 2)) for _ in range(args.queries)]
+
+    report("RoutePathTable", time_sync(table.shortest_path, pairs))
+    report("RouteGraph (A*)", time_sync(graph.shortest_path, pairs))
+    if args.live:
+        report("Neo4j GDS Dijkstra", asyncio.run(time_neo4j(pairs[:200])))
+
+    mismatches = 0
+    for start, end in pairs:
+        table_cost = graph.path_totals(table.shortest_path(start, end, WEIGHT_PROPERTY))["distance"]
+        graph_cost = graph.path_totals(graph.shortest_path(start, end, WEIGHT_PROPERTY))["distance"]
+        mismatches += abs(table_cost - graph_cost) > 1e-6
+    print(f"path cost mismatches: {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
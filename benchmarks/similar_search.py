@@ -0,0 +1,109 @@
+"""
+Compare fuzzy name lookups: loading every row into rapidfuzz vs. the pg_trgm backed get_similar.
+
+    python -m benchmarks.similar_search                      # 10k and 100k synthetic places
+    python -m benchmarks.similar_search --sizes 1000 50000
+
+Synthetic places are inserted in a transaction that is rolled back at the end, the GiST trigram
+index from the migrations must exist. Needs the database from docker-compose to be running.
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+from rapidfuzz import fuzz, process
+from sqlalchemy import insert, select
+
+from app.core.all_models import *
+from app.database.database import SessionLocal, engine
+from app.modules.places.models import Place
+from app.modules.places.repository import PlaceRepository
+from app.modules.places.schema import PlaceCategoryEnum
+
+SYLLABLES = ["ka", "tha", "man", "du", "pok", "ha", "ra", "lum", "bi", "ni", "gor", "kha", "chit", "wan", "jan", "akp", "ur", "bhak", "ta", "pur", "nag", "kot", "dha", "ran"]
+SUFFIXES = ["Temple", "Lake", "Stupa", "Durbar Square", "View Point", "Museum", "Park", "Falls", "Gumba", "Bazaar"]
+LOAD_RELATIONS = ["place_activities.activity"]
+
+
+def synthetic_name(rng: random.Random) -> str:
+    word = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).capitalize()
+    return f"{word} {rng.choice(SUFFIXES)}"
+
+
+def typo(rng: random.Random, name: str) -> str:
+    i = rng.randrange(len(name))
+    return name[:i] + name[i + 1:] if rng.random() < 0.5 else name[:i] + rng.choice("aeiou") + name[i:]
+
+
+async def rapidfuzz_all_rows(repository: PlaceRepository, query_string: str, limit: int):
+    """What get_similar used to do: load every row with its relations, match in Python"""
+    rows = await repository.get_all(load_relations=LOAD_RELATIONS)
+    choices = {row.name: row for row in rows if row.name}
+    return [choices[name] for name, _, _ in process.extract(query_string, choices.keys(), scorer=fuzz.ratio, limit=limit)]
+
+
+def report(name: str, timings: list[float]):
+    timings = sorted(timings)
+    p95 = timings[max(int(len(timings) * 0.95) - 1, 0)]
+    print(f"  {name:<22} mean {statistics.mean(timings) * 1000:9.2f} ms   p95 {p95 * 1000:9.2f} ms")
+
+
+async def run_size(size: int, n_queries: int, rng: random.Random):
+    async with SessionLocal() as db:
+        city_id = (await db.execute(select(City.id).limit(1))).scalar_one()
+        names = [synthetic_name(rng) for _ in range(size)]
+        for i in range(0, size, 5000):
+            await db.execute(insert(Place), [
+                {
+                    "name": name,
+                    "categories": [PlaceCategoryEnum.natural],
+                    "latitude": 27.7,
+                    "longitude": 85.3,
+                    "city_id": city_id,
+                }
+                for name in names[i:i + 5000]
+            ])
+
+        repository = PlaceRepository(db)
+        queries = [typo(rng, rng.choice(names)) for _ in range(n_queries)]
+
+        old_timings, new_timings, agree = [], [], 0
+        for query_string in queries:
+            t = time.perf_counter()
+            old = await rapidfuzz_all_rows(repository, query_string, limit=1)
+            old_timings.append(time.perf_counter() - t)
+            db.expunge_all()
+
+            t = time.perf_counter()
+            new = await repository.get_similar(query_string, limit=1, load_relations=LOAD_RELATIONS)
+            new_timings.append(time.perf_counter() - t)
+            db.expunge_all()
+            agree += bool(old and new and old[0].name == new[0].name)
+
+        print(f"{size} synthetic places, {n_queries} queries")
+        report("rapidfuzz over rows", old_timings)
+        report("pg_trgm get_similar", new_timings)
+        print(f"  top-1 agreement       {agree}/{n_queries}")
+        await db.rollback()
+
+
+async def run(sizes: list[int], n_queries: int, seed: int):
+    rng = random.Random(seed)
+    for size in sizes:
+        await run_size(size, n_queries, rng)
+    await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    asyncio.run(run(args.sizes, args.queries, args.seed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Recall and latency of the HNSW backed vector_search against exact search.
+
+    python -m benchmarks.vector_search                         # 100k synthetic places
+    python -m benchmarks.vector_search --size 20000 --ef-search 10 40 200
+
+Synthetic places get clustered random unit embeddings (real sentence embeddings are clustered too) and
+are inserted in a transaction that is rolled back at the end. The HNSW indexes from the migrations must
+exist. Needs the database from docker-compose to be running.
+"""
+import argparse
+import asyncio
+import math
+import random
+import statistics
+import time
+
+from sqlalchemy import insert, select, text
+
+from app.core.all_models import *
+from app.database.database import SessionLocal, engine
+from app.modules.places.models import Place
+from app.modules.places.repository import PlaceRepository
+from app.modules.places.schema import PlaceCategoryEnum
+from app.utils.embeddings import EMBEDDING_DIMENSION
+
+N_CLUSTERS = 200
+
+
+def unit(vector: list[float]) -> list[float]:
+    norm = math.sqrt(sum(x * x for x in vector)) or 1.0
+    return [x / norm for x in vector]
+
+
+def near(rng: random.Random, center: list[float], noise: float) -> list[float]:
+    return unit([x + rng.gauss(0, noise) for x in center])
+
+
+def report(name: str, timings: list[float], recalls: list[float]):
+    timings = sorted(timings)
+    p95 = timings[max(int(len(timings) * 0.95) - 1, 0)]
+    recall = f"recall@k {statistics.mean(recalls):.3f}" if recalls else ""
+    print(f"  {name:<22} mean {statistics.mean(timings) * 1000:8.2f} ms   p95 {p95 * 1000:8.2f} ms   {recall}")
+
+
+async def timed(fn):
+    t = time.perf_counter()
+    result = await fn()
+    return time.perf_counter() - t, [record.id for record in result]
+
+
+async def run(size: int, n_queries: int, k: int, ef_searches: list[int], seed: int):
+    rng = random.Random(seed)
+    centers = [unit([rng.gauss(0, 1) for _ in range(EMBEDDING_DIMENSION)]) for _ in range(N_CLUSTERS)]
+    categories = list(PlaceCategoryEnum)
+
+    async with SessionLocal() as db:
+        city_ids = (await db.execute(select(City.id))).scalars().all()
+        for i in range(0, size, 2000):
+            await db.execute(insert(Place), [
+                {
+                    "name": f"Synthetic place {j}",
+                    "categories": [rng.choice(categories)],
+                    "latitude": 27.7,
+                    "longitude": 85.3,
+                    "city_id": rng.choice(city_ids),
+                    "embedding": near(rng, rng.choice(centers), 0.35),
+                }
+                for j in range(i, min(i + 2000, size))
+            ])
+        # Core inserts skip the ORM listeners that fill in the location
+        await db.execute(text("UPDATE places SET location = ST_SetSRID(ST_MakePoint(longitude, latitude), 4326)::geography WHERE location IS NULL"))
+        print(f"{size} synthetic places, {len(city_ids)} cities, {n_queries} queries, k={k}")
+
+        repository = PlaceRepository(db)
+        queries = [near(rng, rng.choice(centers), 0.35) for _ in range(n_queries)]
+        scenarios = {
+            "no filter": lambda: [],
+            "city (pre-filter)": lambda: [Place.city_id == rng.choice(city_ids)],
+            "category (post-filter)": lambda: [Place.categories.contains([rng.choice(categories)])],
+        }
+
+        for scenario, make_conditions in scenarios.items():
+            print(scenario)
+            cases = [(query, make_conditions()) for query in queries]
+            exact_timings, truth = [], []
+            for query, conditions in cases:
+                elapsed, ids = await timed(lambda: repository.nearest_by_embedding(query, k, extra_conditions=conditions, exact=True))
+                exact_timings.append(elapsed)
+                truth.append(set(ids))
+            report("exact", exact_timings, [])
+
+            for ef_search in ef_searches:
+                timings, recalls = [], []
+                for (query, conditions), expected in zip(cases, truth):
+                    elapsed, ids = await timed(lambda: repository.nearest_by_embedding(query, k, extra_conditions=conditions, ef_search=ef_search))
+                    timings.append(elapsed)
+                    recalls.append(len(expected & set(ids)) / max(len(expected), 1))
+                report(f"hnsw ef_search={ef_search}", timings, recalls)
+
+        await db.rollback()
+    await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--ef-search", type=int, nargs="+", default=[20, 40, 100, 200])
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    asyncio.run(run(args.size, args.queries, args.k, args.ef_search, args.seed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+import json
+import random
+
+import pytest
+
+from app.core.json_stream import IncrementalJSONParser
+
+
+PLAN = {
+    "title": "Pokhara \"lakeside\" \\ weekend",
+    "note": "Café, मन्दिर and 🏔️ views\n\ttabbed é",
+    "days": [
+        {
+            "title": "Day 1",
+            "steps": [
+                {"place": "Phewa Lake", "cost": 500, "rating": 4.5, "open": True},
+                {"place": "Sarangkot {sunrise} [view]", "cost": 0, "rating": None, "open": False},
+            ],
+            "paths": [[1, 2], [2, 3, [4, 5]], []],
+        },
+        {"title": "Day 2", "steps": [], "paths": [{"from": "a", "to": "b"}]},
+    ],
+}
+
+
+def feed_chunks(parser, chunks):
+    fragments = []
+    for chunk in chunks:
+        fragments.extend(parser.feed(chunk))
+    return fragments
+
+
+def split_at(text, cuts):
+    bounds = [0, *sorted(cuts), len(text)]
+    return [text[a:b] for a, b in zip(bounds, bounds[1:])]
+
+
+def test_default_paths_emit_root_children():
+    text = json.dumps(PLAN)
+    fragments = feed_chunks(IncrementalJSONParser(), [text])
+    assert fragments == [((key,), value) for key, value in PLAN.items()]
+
+
+@pytest.mark.parametrize("ensure_ascii", [True, False])
+def test_every_single_chunk_boundary(ensure_ascii):
+    text = json.dumps(PLAN, ensure_ascii=ensure_ascii)
+    paths = [("days", "*", "steps", "*"), ("days", "*", "paths")]
+    expected = feed_chunks(IncrementalJSONParser(paths), [text])
+    assert len(expected) == 4
+    for cut in range(1, len(text)):
+        assert feed_chunks(IncrementalJSONParser(paths), split_at(text, [cut])) == expected
+
+
+def test_random_chunk_boundaries():
+    text = json.dumps(PLAN, ensure_ascii=False, indent=2)
+    expected = [((key,), value) for key, value in PLAN.items()]
+    rng = random.Random(7)
+    for _ in range(200):
+        cuts = rng.sample(range(1, len(text)), rng.randint(1, 40))
+        assert feed_chunks(IncrementalJSONParser(), split_at(text, cuts)) == expected
+
+
+def test_one_character_at_a_time():
+    text = json.dumps(PLAN)
+    fragments = feed_chunks(IncrementalJSONParser([("title",), ("note",)]), list(text))
+    assert fragments == [(("title",), PLAN["title"]), (("note",), PLAN["note"])]
+
+
+def test_escapes_split_across_chunks():
+    text = json.dumps({"a": "quote \" backslash \\ unicode é 🏔"})
+    for i, ch in enumerate(text):
+        if ch == "\\":
+            parser = IncrementalJSONParser()
+            assert feed_chunks(parser, [text[:i + 1], text[i + 1:]]) == [(("a",), json.loads(text)["a"])]
+
+
+def test_brackets_inside_strings_are_ignored():
+    parser = IncrementalJSONParser([("*",)])
+    fragments = feed_chunks(parser, ['["{not", "an] obj}", "\\"[", ', '"x"]'])
+    assert [value for _, value in fragments] == ["{not", "an] obj}", '"[', "x"]
+    assert parser.done
+
+
+def test_code_fences_and_prose_are_skipped():
+    body = json.dumps([{"place": "Phewa Lake"}, {"place": "Sarangkot"}], indent=2)
+    text = f"Here is your plan:\n```json\n{body}\n```\nEnjoy the trip!"
+    parser = IncrementalJSONParser([("*", "place")])
+    fragments = feed_chunks(parser, split_at(text, [5, 20, 40]))
+    assert fragments == [((0, "place"), "Phewa Lake"), ((1, "place"), "Sarangkot")]
+    assert parser.done
+    assert parser.feed("{\"ignored\": 1}") == []
+
+
+def test_nested_paths_with_wildcards():
+    parser = IncrementalJSONParser([("days", "*", "paths", "*"), ("days", "*", "paths", "*", "*")])
+    fragments = feed_chunks(parser, [json.dumps(PLAN)])
+    assert fragments == [
+        (("days", 0, "paths", 0, 0), 1),
+        (("days", 0, "paths", 0, 1), 2),
+        (("days", 0, "paths", 0), [1, 2]),
+        (("days", 0, "paths", 1, 0), 2),
+        (("days", 0, "paths", 1, 1), 3),
+        (("days", 0, "paths", 1, 2), [4, 5]),
+        (("days", 0, "paths", 1), [2, 3, [4, 5]]),
+        (("days", 0, "paths", 2), []),
+        (("days", 1, "paths", 0, "from"), "a"),
+        (("days", 1, "paths", 0, "to"), "b"),
+        (("days", 1, "paths", 0), {"from": "a", "to": "b"}),
+    ]
+
+
+def test_scalars_split_across_chunks():
+    parser = IncrementalJSONParser([("*",)])
+    fragments = feed_chunks(parser, ['[tr', 'ue, nu', 'll, -1', '2.5e', '3, fal', 'se]'])
+    assert [value for _, value in fragments] == [True, None, -12500.0, False]
+
+
+def test_trailing_commas_are_tolerated():
+    parser = IncrementalJSONParser([("*",)])
+    fragments = feed_chunks(parser, ['[{"a": 1,}, ', '[1, 2,], "x"]'])
+    assert [value for _, value in fragments] == [{"a": 1}, [1, 2], "x"]
+
+
+def test_completed_text_is_dropped_from_the_buffer():
+    parser = IncrementalJSONParser([("*",)])
+    parser.feed("[")
+    for i in range(100):
+        parser.feed(json.dumps({"place": f"place {i}", "cost": i}) + ", ")
+        assert len(parser.buffer) < 64
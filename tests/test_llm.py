@@ -0,0 +1,134 @@
+import asyncio
+
+import pytest
+from pydantic import BaseModel
+
+from app.core.llm import LLM
+
+
+class FakeMessage:
+    def __init__(self, content):
+        self.content = content
+
+
+class FakeChatModel:
+    """Local stand-in for a langchain chat model"""
+    instances = 0
+
+    def __init__(self, model, api_key, delay=0.01, chunks=None, fail=False):
+        FakeChatModel.instances += 1
+        self.model = model
+        self.delay = delay
+        self.chunks = chunks or []
+        self.fail = fail
+        self.active = 0
+        self.max_active = 0
+
+    async def ainvoke(self, prompt):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+            if self.fail:
+                raise RuntimeError("provider error")
+            return FakeMessage(f"echo: {prompt}")
+        finally:
+            self.active -= 1
+
+    async def astream(self, messages):
+        for chunk in self.chunks:
+            await asyncio.sleep(0)
+            yield FakeMessage(chunk)
+
+
+class Step(BaseModel):
+    place: str
+
+
+@pytest.fixture(autouse=True)
+def fake_provider():
+    FakeChatModel.instances = 0
+    LLM.reset_metrics()
+    yield
+    LLM.MODEL_MAP.pop("fake", None)
+    LLM.reset_clients("fake")
+    LLM.reset_metrics()
+
+
+def register_fake(max_concurrency=None, **kwargs):
+    LLM.register_provider(
+        "fake",
+        lambda model, api_key: FakeChatModel(model, api_key, **kwargs),
+        model="fake-model",
+        max_concurrency=max_concurrency,
+    )
+
+
+def test_client_is_reused_across_calls():
+    register_fake()
+
+    async def run():
+        first = await LLM.get_response("hello", llm="fake")
+        second = await LLM.get_response("again", llm="fake")
+        return first, second, LLM._get_model_instance("fake")
+
+    first, second, model = asyncio.run(run())
+    assert first == "echo: hello"
+    assert second == "echo: again"
+    assert FakeChatModel.instances == 1
+    assert model.model == "fake-model"
+
+
+def test_in_flight_requests_are_capped_per_provider():
+    register_fake(max_concurrency=2, delay=0.02)
+
+    async def run():
+        await asyncio.gather(*(LLM.get_response(str(i), llm="fake") for i in range(6)))
+        return LLM._get_model_instance("fake")
+
+    model = asyncio.run(run())
+    metrics = LLM.get_metrics("fake")["fake"]
+    assert model.max_active == 2
+    assert metrics["requests"] == 6
+    assert metrics["in_flight"] == 0
+    assert metrics["queued"] == 0
+    assert metrics["max_queued"] >= 4
+    assert metrics["avg_latency_ms"] > 0
+
+
+def test_errors_are_counted_and_slot_released():
+    register_fake(max_concurrency=1, fail=True)
+
+    async def run():
+        for _ in range(2):
+            with pytest.raises(RuntimeError):
+                await LLM.get_response("boom", llm="fake")
+
+    asyncio.run(run())
+    metrics = LLM.get_metrics("fake")["fake"]
+    assert metrics["errors"] == 2
+    assert metrics["in_flight"] == 0
+
+
+def test_structured_stream_uses_pooled_client():
+    register_fake(chunks=['[{"place": "Phewa', ' Lake"}, {"pla', 'ce": "Sarangkot"}]'])
+
+    async def run():
+        return [r async for r in LLM.get_structured_stream("plan", Step, llm="fake")]
+
+    results = asyncio.run(run())
+    assert [s.place for s in results[-1]] == ["Phewa Lake", "Sarangkot"]
+    assert FakeChatModel.instances == 1
+    assert LLM.get_metrics("fake")["fake"]["avg_first_token_ms"] >= 0
+
+
+def test_register_provider_replaces_pooled_clients():
+    register_fake()
+
+    async def run():
+        await LLM.get_response("one", llm="fake")
+        register_fake()
+        await LLM.get_response("two", llm="fake")
+
+    asyncio.run(run())
+    assert FakeChatModel.instances == 2
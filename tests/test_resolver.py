@@ -0,0 +1,51 @@
+from types import SimpleNamespace
+
+from app.modules.ai.agent.resolver import PlaceResolver
+from app.modules.ai.agent.schema import AgentPlanDayStep
+
+
+def make_place(place_id, name, city_id, activities=()):
+    place_activities = [
+        SimpleNamespace(id=place_id * 100 + i, activity=SimpleNamespace(name=activity))
+        for i, activity in enumerate(activities)
+    ]
+    return SimpleNamespace(id=place_id, name=name, city_id=city_id, place_activities=place_activities)
+
+
+def make_resolver():
+    resolver = PlaceResolver()
+    resolver.add([
+        make_place(1, "Phewa Lake", 10, ["Boating", "Kayaking"]),
+        make_place(2, "World Peace Pagoda", 10, ["Hiking"]),
+        make_place(3, "Boudhanath Stupa", 20),
+    ])
+    return resolver
+
+
+def test_resolves_by_id():
+    place, activity = make_resolver().resolve(AgentPlanDayStep(category="activity", place="anything", place_activity_id=101))
+    assert place.id == 1
+    assert activity.id == 101
+
+
+def test_resolves_misspelled_name():
+    place, activity = make_resolver().resolve(AgentPlanDayStep(category="activity", place="Phewa Lak", activity="Boatng"), city_id=10)
+    assert place.id == 1
+    assert activity.activity.name == "Boating"
+
+
+def test_unseen_place_is_not_matched():
+    place, activity = make_resolver().resolve(AgentPlanDayStep(category="visit", place="Davis Falls"), city_id=10)
+    assert place is None
+    assert activity is None
+
+
+def test_place_in_another_city_is_not_matched():
+    place, _ = make_resolver().resolve(AgentPlanDayStep(category="visit", place="Boudhanath Stupa"), city_id=10)
+    assert place is None
+
+
+def test_unknown_activity_falls_back_to_place():
+    place, activity = make_resolver().resolve(AgentPlanDayStep(category="activity", place="Phewa Lake", activity="Paragliding"), city_id=10)
+    assert place.id == 1
+    assert activity is None
@@ -0,0 +1,53 @@
+import math
+
+import pytest
+
+from app.database.seeder.utils import load_data
+from app.modules.transport_route.engine import RouteEdge, RouteGraph
+from app.modules.transport_route.path_table import RoutePathTable
+
+
+@pytest.fixture(scope="module")
+def seeded_graph():
+    cities = load_data("files/default_cities.json")
+    city_ids = {city["name"]: i for i, city in enumerate(cities, start=1)}
+    coordinates = {city_ids[city["name"]]: tuple(city["location"]) for city in cities}
+
+    edges = []
+    for i, route in enumerate(load_data("files/default_transport_routes.json"), start=1):
+        if route["start_city"] not in city_ids or route["end_city"] not in city_ids:
+            continue
+        edges.append(RouteEdge(
+            id=i,
+            start_city_id=city_ids[route["start_city"]],
+            end_city_id=city_ids[route["end_city"]],
+            distance=route["distance"],
+            average_duration=route["average_duration"],
+            average_cost=route["average_cost"],
+        ))
+    return RouteGraph(edges, coordinates)
+
+
+def test_heuristic_scale_is_admissible(seeded_graph):
+    assert 0 <= seeded_graph.heuristic_scale <= 1
+    # Some seeded routes are shorter than the straight line between their cities
+    assert seeded_graph.heuristic_scale < 0.9
+
+
+@pytest.mark.parametrize("weight_property", ["distance", "average_duration", "average_cost"])
+def test_astar_matches_floyd_warshall_on_seeded_routes(seeded_graph, weight_property):
+    table = RoutePathTable.build(seeded_graph, (weight_property,))
+    city_ids = sorted(seeded_graph.adjacency)
+    totals_key = {"distance": "distance", "average_duration": "duration", "average_cost": "cost"}[weight_property]
+
+    for start in city_ids:
+        for end in city_ids:
+            if start == end:
+                continue
+            expected = table.path_cost(start, end, weight_property)
+            path = seeded_graph.shortest_path(start, end, weight_property)
+            if math.isinf(expected):
+                assert path == []
+                continue
+            assert path and path[-1][1] == end
+            assert seeded_graph.path_totals(path)[totals_key] == pytest.approx(expected)